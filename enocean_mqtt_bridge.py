@@ -5,7 +5,8 @@ import sys
 import logging.handlers
 
 from src.config import Config, CONFKEY_LOG_FILE, CONFKEY_SYSTEMD, CONFKEY_LOG_PRINT, CONFKEY_LOG_LEVEL, CONFKEY_LOG_MAX_BYTES, \
-    CONFKEY_LOG_MAX_COUNT, CONFKEY_MAIN
+    CONFKEY_LOG_MAX_COUNT, CONFKEY_MAIN, CONFKEY_ASYNCIO
+from src.runner.async_runner import AsyncRunner
 from src.runner.runner import Runner
 
 
@@ -60,7 +61,10 @@ def main():
 
         init_logging(config)
 
-        runner = Runner()
+        if Config.get_bool(config.get(CONFKEY_MAIN), CONFKEY_ASYNCIO, False):
+            runner = AsyncRunner()
+        else:
+            runner = Runner()
         runner.open(config)
         runner.run()
 
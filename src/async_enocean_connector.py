@@ -0,0 +1,106 @@
+import asyncio
+import datetime
+import logging
+from typing import Optional
+
+import serial
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import Packet
+
+from src.enocean_connector import EnoceanConnector
+
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncEnoceanConnector(EnoceanConnector):
+    """
+    Reads the serial port via the asyncio event loop (`add_reader`) instead of the `Esp3Communicator` thread.
+    All callbacks run within the event loop thread.
+    """
+
+    BAUDRATE = 57600
+    BASE_ID_TIMEOUT = 1.0  # in seconds
+
+    def __init__(self, port, loop: asyncio.AbstractEventLoop):
+        super().__init__(port)
+        self._loop = loop
+        self._serial: Optional[serial.Serial] = None
+        self._base_id_future: Optional[asyncio.Future] = None
+
+    def open(self):
+        self._framer.reset()
+        self._serial = serial.Serial(self._port, self.BAUDRATE, timeout=0)
+        self._loop.add_reader(self._serial.fileno(), self._on_readable)
+        _logger.debug("open")
+
+    def close(self):
+        if self._serial is not None:
+            if not self._loop.is_closed():
+                self._loop.remove_reader(self._serial.fileno())
+            self._serial.close()
+            self._serial = None
+            self._log_receive_stats()
+
+    def is_alive(self):
+        return self._serial is not None and self._serial.is_open
+
+    def assure_connection(self):
+        if not self.is_alive():
+            _logger.warning("enocean is not alive - try to reopen! (may crash, restart via systemd)")
+            self.close()
+            self.open()
+
+    def _on_readable(self):
+        try:
+            data = self._serial.read(self._serial.in_waiting or 1)
+        except serial.SerialException:
+            _logger.error("serial port exception! (device disconnected or multiple access on port?)")
+            self.close()
+            return
+
+        frames = self._framer.feed(data, datetime.datetime.now())
+        for frame in frames:
+            if self._base_id_future is not None and not self._base_id_future.done():
+                response_data = frame.response_data
+                if response_data is not None and len(response_data) == 4:
+                    self._base_id_future.set_result(list(response_data))
+
+            if frame.is_teach_in and self._cached_base_id is not None:
+                _logger.info("sending response to UTE teach-in.")
+                self._transmit(frame.to_packet().create_response_packet(self._cached_base_id))
+
+        if frames:
+            self._on_frames(frames)
+
+    async def request_base_id(self):
+        """asks the gateway for its base id (CO_RD_IDBASE); returns None on timeout"""
+        if self._cached_base_id is None:
+            self._base_id_future = self._loop.create_future()
+            self._transmit(Packet(PACKET.COMMON_COMMAND, data=[0x08]))  # not paced
+            try:
+                self._cached_base_id = await asyncio.wait_for(self._base_id_future, self.BASE_ID_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._base_id_future = None
+
+        return self._cached_base_id
+
+    @property
+    def base_id(self):
+        return self._cached_base_id
+
+    def _transmit(self, packet):
+        if self._serial is not None:
+            data = bytearray(packet.build())
+            self._loop.call_soon_threadsafe(self._write, data)
+
+    def _write(self, data: bytearray):
+        if self._serial is None:
+            return
+        try:
+            self._serial.write(data)
+        except serial.SerialException:
+            _logger.error("serial port exception! (device disconnected or multiple access on port?)")
+            self.close()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import socket
+from typing import Optional
+
+import paho.mqtt.client as mqtt
+
+from src.mqtt_connector import MqttConnector, CONFKEY_MQTT_QUEUE_FULL, CONFKEY_MQTT_QUEUE_SIZE
+from src.mqtt_publish_queue import MqttPublishQueue, QueueFullPolicy
+
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncMqttConnector(MqttConnector):
+    """
+    Drives the paho client by the asyncio event loop (socket callbacks + `loop_read`/`loop_write`/`loop_misc`) instead of the
+    paho network thread. So all MQTT callbacks are called within the event loop thread.
+
+    The publish queue gets flushed by the event loop too (after the current dispatch cycle), so there is no publisher
+    thread. The "block" policy would block the event loop itself and is therefore replaced by "drop".
+
+    Lost connections get re-established by a task with exponential backoff (paho's automatic reconnect is part of
+    its network thread). The TCP connect itself is blocking, as for the first connect.
+    """
+
+    MISC_LOOP_INTERVAL = 1.0  # in seconds
+
+    def __init__(self, publisher, loop: asyncio.AbstractEventLoop):
+        super().__init__(publisher)
+        self._loop = loop
+        self._misc_task: Optional[asyncio.Task] = None
+        self._flush_scheduled = False
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    def _create_publish_queue(self, config) -> MqttPublishQueue:
+        if config.get(CONFKEY_MQTT_QUEUE_FULL) == QueueFullPolicy.BLOCK.value:
+            _logger.warning("'%s: %s' is not supported with asyncio, messages get dropped instead!",
+                            CONFKEY_MQTT_QUEUE_FULL, QueueFullPolicy.BLOCK.value)
+        return MqttPublishQueue(
+            max_size=config.get(CONFKEY_MQTT_QUEUE_SIZE, MqttPublishQueue.DEFAULT_MAX_SIZE),
+            policy=QueueFullPolicy.DROP
+        )
+
+    def _start_network(self, host, port, keepalive):
+        self._mqtt.on_socket_open = self._on_socket_open
+        self._mqtt.on_socket_close = self._on_socket_close
+        self._mqtt.on_socket_register_write = self._on_socket_register_write
+        self._mqtt.on_socket_unregister_write = self._on_socket_unregister_write
+
+        self._mqtt.connect(host, port=port, keepalive=keepalive)
+        self._mqtt.socket().setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 2048)
+
+    def _on_disconnect(self, mqtt_client, userdata, rc, properties=None):
+        super()._on_disconnect(mqtt_client, userdata, rc, properties)
+        if getattr(rc, "value", rc) != 0 and self._reconnect_task is None and self._mqtt is not None and not self._loop.is_closed():
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = self.DEFAULT_MQTT_RECONNECT_DELAY_MIN
+        try:
+            while self._mqtt is not None:
+                await asyncio.sleep(delay)
+                try:
+                    self._mqtt.reconnect()
+                    self._mqtt.socket().setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 2048)
+                    break
+                except OSError as ex:
+                    delay = min(delay * 2, self._reconnect_delay_max)
+                    _logger.warning("MQTT reconnect failed (%s), next try in %.0fs.", ex, delay)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._reconnect_task = None
+
+    def _notify_publish(self):
+        if not self._flush_scheduled and not self._loop.is_closed():
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush_scheduled_publishes)
+
+    def _flush_scheduled_publishes(self):
+        self._flush_scheduled = False
+        if self._mqtt is not None:
+            self._flush_publish_queue()
+
+    def close(self):
+        if self._mqtt is not None:
+            # the event loop may be gone already, so let paho handle the last packets (last wills, disconnect) by itself
+            self._detach_loop()
+        super().close()
+
+    def _detach_loop(self):
+        self._mqtt.on_socket_open = None
+        self._mqtt.on_socket_close = None
+        self._mqtt.on_socket_register_write = None
+        self._mqtt.on_socket_unregister_write = None
+
+        sock = self._mqtt.socket()
+        if sock is not None and not self._loop.is_closed():
+            self._loop.remove_reader(sock)
+            self._loop.remove_writer(sock)
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            self._misc_task = None
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+
+    def _on_socket_open(self, client, _userdata, sock):
+        self._loop.add_reader(sock, client.loop_read)
+        self._misc_task = self._loop.create_task(self._misc_loop(client))
+
+    def _on_socket_close(self, _client, _userdata, sock):
+        self._loop.remove_reader(sock)
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            self._misc_task = None
+
+    def _on_socket_register_write(self, client, _userdata, sock):
+        self._loop.add_writer(sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, _client, _userdata, sock):
+        self._loop.remove_writer(sock)
+
+    async def _misc_loop(self, client):
+        """keepalive handling"""
+        while client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            try:
+                await asyncio.sleep(self.MISC_LOOP_INTERVAL)
+            except asyncio.CancelledError:
+                break
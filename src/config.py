@@ -7,23 +7,35 @@ from jsonschema import validate
 
 DEFAULT_CONFFILE = "/etc/enocean_mqtt_bridge.conf"
 
+CONFKEY_ASYNCIO = "asyncio"
 CONFKEY_CONF_FILE = "conf_file"
 CONFKEY_DEVICES = "devices"
 CONFKEY_DEVICE_TYPE = "device_type"
+CONFKEY_ENOCEAN_DEDUPLICATION_WINDOW = "enocean_deduplication_window"
+CONFKEY_ENOCEAN_GATEWAYS = "enocean_gateways"
 CONFKEY_ENOCEAN_PORT = "enocean_port"
+CONFKEY_ENOCEAN_PROCESSES = "enocean_processes"
+CONFKEY_ENOCEAN_TRANSMIT_BURST = "enocean_transmit_burst"
+CONFKEY_ENOCEAN_TRANSMIT_RATE = "enocean_transmit_rate"
 CONFKEY_LOG_FILE = "log_file"
 CONFKEY_LOG_LEVEL = "log_level"
 CONFKEY_LOG_MAX_BYTES = "log_max_bytes"
 CONFKEY_LOG_MAX_COUNT = "log_max_count"
 CONFKEY_LOG_PRINT = "log_print"
 CONFKEY_MAIN = "main"
+CONFKEY_STORAGE_DATABASE = "storage_database"
+CONFKEY_STORAGE_FLUSH_INTERVAL = "storage_flush_interval"
+CONFKEY_STORAGE_FSYNC = "storage_fsync"
+CONFKEY_STORAGE_JOURNAL = "storage_journal"
 CONFKEY_SYSTEMD = "systemd"
 
 
-CONFIG_MAIN_JSONSCHEMA = {
+CONFIG_GATEWAY_JSONSCHEMA = {
     "type": "object",
     "properties": {
         CONFKEY_ENOCEAN_PORT: {"type": "string", "minLength": 1},
+        CONFKEY_ENOCEAN_TRANSMIT_BURST: {"type": "integer", "minimum": 1, "description": "packets, which may be sent back-to-back"},
+        CONFKEY_ENOCEAN_TRANSMIT_RATE: {"type": "number", "minimum": 0, "description": "packets per second; 0 disables pacing"},
     },
     "required": [
         CONFKEY_ENOCEAN_PORT
@@ -31,6 +43,35 @@ CONFIG_MAIN_JSONSCHEMA = {
 }
 
 
+CONFIG_MAIN_JSONSCHEMA = {
+    "type": "object",
+    "properties": {
+        CONFKEY_ASYNCIO: {"type": "boolean", "description": "run serial port, MQTT and device tasks in one asyncio event loop"},
+        CONFKEY_ENOCEAN_DEDUPLICATION_WINDOW: {"type": "number", "minimum": 0,
+                                               "description": "seconds; telegrams received by several gateways are processed once"},
+        CONFKEY_ENOCEAN_GATEWAYS: {"type": "object", "minProperties": 1, "additionalProperties": CONFIG_GATEWAY_JSONSCHEMA,
+                                   "description": "named gateways (instead of 'enocean_port'); the first one is the default"},
+        CONFKEY_ENOCEAN_PORT: {"type": "string", "minLength": 1},
+        CONFKEY_ENOCEAN_PROCESSES: {"type": "boolean",
+                                    "description": "read, frame and decode the telegrams of each gateway in a worker process "
+                                                   "(offloads the main process, no higher throughput)"},
+        CONFKEY_ENOCEAN_TRANSMIT_BURST: {"type": "integer", "minimum": 1, "description": "packets, which may be sent back-to-back"},
+        CONFKEY_ENOCEAN_TRANSMIT_RATE: {"type": "number", "minimum": 0, "description": "packets per second; 0 disables pacing"},
+        CONFKEY_STORAGE_DATABASE: {"type": "string", "minLength": 1,
+                                   "description": "SQLite file for the state of all devices (instead of the storage files)"},
+        CONFKEY_STORAGE_FLUSH_INTERVAL: {"type": "number", "minimum": 0,
+                                         "description": "seconds between writes of changed storage files; 0 writes immediately"},
+        CONFKEY_STORAGE_FSYNC: {"type": "boolean", "description": "fsync storage files after writing"},
+        CONFKEY_STORAGE_JOURNAL: {"type": "boolean",
+                                  "description": "append changes to a journal instead of rewriting the storage files (implies fsync)"},
+    },
+    "anyOf": [
+        {"required": [CONFKEY_ENOCEAN_PORT]},
+        {"required": [CONFKEY_ENOCEAN_GATEWAYS]},
+    ],
+}
+
+
 class Config:
 
     def __init__(self):
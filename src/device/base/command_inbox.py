@@ -0,0 +1,113 @@
+import abc
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.common.device_exception import DeviceException
+from src.enocean_send_scheduler import ScheduledPacket
+
+
+CONFKEY_COMMAND_MERGE = "command_merge"
+
+
+COMMAND_INBOX_JSONSCHEMA = {
+    "type": "object",
+    "properties": {
+        CONFKEY_COMMAND_MERGE: {
+            "type": "object",
+            "additionalProperties": {"type": "number", "minimum": 0, "maximum": 60},
+            "description": "Merge window in seconds per command type (e.g. DIM, POSITION); 0 disables merging.",
+        },
+    },
+}
+
+
+class CommandInbox:
+    """
+    Merges bursts of MQTT commands (e.g. a UI slider) into the latest command, so only settled values are sent.
+
+    The first command of a mergeable type is executed immediately. Further commands of the same type within the merge
+    window replace each other; only the latest one is executed when the window has passed (via the send scheduler).
+    Any other command type discards a pending command and is executed immediately.
+    """
+
+    MERGEABLE_COMMAND_TYPES = []  # type names, overwrite in subclasses
+
+    def __init__(self):
+        self._command_merge_windows: Dict[str, float] = {}
+
+        self._pending_command = None
+        self._pending_command_type: Optional[str] = None
+        self._pending_command_entry: Optional[ScheduledPacket] = None
+        self._last_merged_command_time: Dict[str, datetime] = {}
+
+        self._count_merged_commands = 0
+
+    def _set_command_inbox_config(self, config):
+        self.validate_config(config, COMMAND_INBOX_JSONSCHEMA)
+        windows = config.get(CONFKEY_COMMAND_MERGE) or {}
+
+        unknown = [t for t in windows if t not in self.MERGEABLE_COMMAND_TYPES]
+        if unknown:
+            raise DeviceException("{}: cannot merge command types {} (supported: {})!".format(
+                CONFKEY_COMMAND_MERGE, unknown, self.MERGEABLE_COMMAND_TYPES
+            ))
+
+        self._command_merge_windows = {t: w for t, w in windows.items() if w > 0}
+
+    @property
+    def count_merged_commands(self) -> int:
+        return self._count_merged_commands
+
+    def _receive_command(self, command, command_type: str):
+        """execute the command immediately or defer it (see class doc)"""
+        window = self._command_merge_windows.get(command_type)
+
+        if self._pending_command is not None:
+            if window and command_type == self._pending_command_type:
+                self._logger.debug("merged command: %s", repr(self._pending_command))
+                self._pending_command = command
+                self._count_merged_commands += 1
+                return
+            self._discard_pending_command()
+
+        if window:
+            now = self._now()
+            last_time = self._last_merged_command_time.get(command_type)
+            wait_time = window - (now - last_time).total_seconds() if last_time is not None else 0
+            if wait_time > 0 and self._send_scheduler is not None:
+                entry = self._send_scheduler.schedule(wait_time, self._execute_pending_command, owner=self._name)
+                if entry is not None:
+                    self._pending_command = command
+                    self._pending_command_type = command_type
+                    self._pending_command_entry = entry
+                    return
+
+            self._last_merged_command_time[command_type] = now
+
+        self._execute_command(command)
+
+    def _execute_pending_command(self):
+        command, command_type = self._pending_command, self._pending_command_type
+        self._pending_command = None
+        self._pending_command_type = None
+        self._pending_command_entry = None
+        if command is None:
+            return
+
+        self._last_merged_command_time[command_type] = self._now()
+        try:
+            self._execute_command(command)
+        except ValueError as ex:
+            self._logger.error("cannot execute command ({})! command: {}".format(ex, repr(command)))
+
+    def _discard_pending_command(self):
+        if self._pending_command is not None:
+            self._logger.debug("discarded pending command: %s", repr(self._pending_command))
+            self._send_scheduler.cancel(self._pending_command_entry)
+            self._pending_command = None
+            self._pending_command_type = None
+            self._pending_command_entry = None
+
+    @abc.abstractmethod
+    def _execute_command(self, command):
+        raise NotImplementedError
@@ -3,21 +3,24 @@ import copy
 import datetime
 import json
 import logging
-from threading import Timer
-from typing import Optional, Dict, Union
+from typing import Optional, Dict, List, Union
 
 from jsonschema import validate, ValidationError
 from paho.mqtt.client import MQTTMessage
 
+from src.common.eep import Eep
 from src.common.json_attributes import JsonAttributes
 from src.common.device_exception import DeviceException
 from src.enocean_connector import EnoceanMessage
+from src.enocean_send_scheduler import EnoceanSendScheduler, ScheduledPacket
+from src.enocean_transmit_pacer import TransmitPriority
 from src.mqtt_publisher import MqttPublisher
 from src.tools.time_tools import TimeTools
 
 _class_logger = logging.getLogger(__name__)
 
 
+CONFKEY_ENOCEAN_GATEWAY = "enocean_gateway"
 CONFKEY_ENOCEAN_SENDER = "enocean_sender"
 CONFKEY_ENOCEAN_TARGET = "enocean_target"
 CONFKEY_LOG_SENT_PACKETS = "log_sent_packets"
@@ -33,6 +36,7 @@ CONFKEY_MQTT_TIME_OFFLINE = "mqtt_time_offline"
 DEVICE_JSONSCHEMA = {
     "type": "object",
     "properties": {
+        CONFKEY_ENOCEAN_GATEWAY: {"type": "string", "minLength": 1, "description": "name of the sending gateway (default: first)"},
         CONFKEY_ENOCEAN_SENDER: {"type": "integer"},
         CONFKEY_ENOCEAN_TARGET: {"type": "integer"},
         CONFKEY_LOG_SENT_PACKETS: {"type": "boolean"},
@@ -71,9 +75,11 @@ class Device:
 
         self._log_sent_packets = False
         self._enocean_connector = None
+        self._send_scheduler: Optional[EnoceanSendScheduler] = None
 
         self._enocean_target: Optional[int] = None
         self._enocean_sender: Optional[int] = None  # to distinguish between different actors
+        self._enocean_gateway: Optional[str] = None  # None: default gateway
 
         self._mqtt_channel_cmd: Optional[str] = None
         self._mqtt_channel_state: Optional[str] = None
@@ -111,6 +117,7 @@ class Device:
 
         self._enocean_target = config.get(CONFKEY_ENOCEAN_TARGET)
         self._enocean_sender = config.get(CONFKEY_ENOCEAN_SENDER)
+        self._enocean_gateway = config.get(CONFKEY_ENOCEAN_GATEWAY)
         self._log_sent_packets = config.get(CONFKEY_LOG_SENT_PACKETS, False)
 
         self._mqtt_channel_cmd = config.get(CONFKEY_MQTT_CHANNEL_CMD)  # may be optional
@@ -120,14 +127,36 @@ class Device:
         self._mqtt_retain = config.get(CONFKEY_MQTT_RETAIN, False)
         self._mqtt_time_offline = config.get(CONFKEY_MQTT_TIME_OFFLINE)
 
+    @property
+    def enocean_target(self) -> Optional[int]:
+        return self._enocean_target
+
     @property
     def enocean_targets(self):
         return [self._enocean_target] if self._enocean_target else []
 
+    @property
+    def enocean_eeps(self) -> List[Eep]:
+        """EEPs of the received telegrams (of `enocean_targets`), decoded by the worker processes already"""
+        return []
+
+    @property
+    def enocean_gateway(self) -> Optional[str]:
+        return self._enocean_gateway
+
     def set_enocean_connector(self, enocean):
         self._enocean_connector = enocean
 
-    def _send_enocean_packet(self, packet, delay=0):
+    def set_default_enocean_sender(self, sender: int):
+        """base ID of the gateway (other than the default gateway), used if no sender is configured"""
+        if self._enocean_sender is None:
+            self._enocean_sender = sender
+
+    def set_send_scheduler(self, send_scheduler: EnoceanSendScheduler):
+        self._send_scheduler = send_scheduler
+
+    def _send_enocean_packet(self, packet, delay=0, priority=TransmitPriority.COMMAND) -> Optional[ScheduledPacket]:
+        """Sends immediately or (delay > 0) via the send scheduler. Returns a handle for cancellation, if scheduled."""
         instance = self
 
         def do_send():
@@ -136,15 +165,17 @@ class Device:
                 if self._log_sent_packets:
                     instance._logger.debug("packet is being sent: %s", packet)
 
-                instance._enocean_connector.send(packet)
+                instance._enocean_connector.send(packet, priority)
             except Exception as ex:
                 instance._logger.exception(ex)
 
         if delay < 0.001:
             do_send()
-        else:
-            t = Timer(delay, do_send)
-            t.start()
+            return None
+
+        if self._send_scheduler is None:
+            raise DeviceException("no send scheduler set, cannot send delayed packets!")
+        return self._send_scheduler.schedule(delay, do_send, owner=self._name)
 
     @abc.abstractmethod
     def process_enocean_message(self, message: EnoceanMessage):
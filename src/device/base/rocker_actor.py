@@ -1,5 +1,4 @@
 import json
-import time
 from enum import Enum
 from typing import Optional
 
@@ -72,10 +71,9 @@ class RockerActor(Device):
             packet = self._create_switch_packet(action, destination=destination, learn=learn)
             self._send_enocean_packet(packet)
 
-            time.sleep(self._time_between_rocker_commands)
-
+            # the release is sent by the scheduler, no blocking of the main loop
             packet = self._create_switch_packet(RockerSwitchAction.RELEASE, destination=destination)
-            self._send_enocean_packet(packet)
+            self._send_enocean_packet(packet, delay=self._time_between_rocker_commands)
         else:
             self._logger.info("command '{}' not supported!".format(command))
 
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Dict, List, Optional, Set, Tuple
 
 import attr
 from paho.mqtt.client import MQTTMessage
@@ -8,6 +8,7 @@ from enocean.protocol.packet import RadioPacket
 
 from src.device.base.device import Device
 from src.common.device_exception import DeviceException
+from src.common.eep_prop_exception import EepPropException
 from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools
 from src.tools.enocean_tools import EnoceanTools
 
@@ -51,6 +52,8 @@ class SceneActor(Device):
         super().__init__(name)
 
         self._scenes: List[RockerScene] = []
+        self._scenes_by_key: Dict[Tuple[int, int], RockerScene] = {}  # (rocker_id, rocker_key); first configured wins
+        self._scene_rocker_ids: Set[int] = set()
 
     def _set_config(self, config, skip_require_fields: [str]):
         super()._set_config(config, skip_require_fields)
@@ -59,25 +62,29 @@ class SceneActor(Device):
 
         rocker_scenes = config.get(CONFKEY_ROCKER_SCENES, [])
         for scene in rocker_scenes:
-            self._scenes.append(RockerScene(**scene))
+            scene = RockerScene(**scene)
+            self._scenes.append(scene)
+            self._scenes_by_key.setdefault((scene.rocker_id, scene.rocker_key), scene)
+            self._scene_rocker_ids.add(scene.rocker_id)
+
+    @property
+    def rocker_scenes(self) -> List[RockerScene]:
+        return self._scenes
 
     @property
     def enocean_targets(self):
-        return list({self._enocean_target, *[s.rocker_id for s in self._scenes]})
+        return list({self._enocean_target, *self._scene_rocker_ids})
 
     def find_rocker_scene(self, packet: RadioPacket) -> Optional[RockerScene]:
         if packet.packet_type == PACKET.RADIO and packet.rorg == RockerSwitchTools.DEFAULT_EEP.rorg:
-            scenes = [s for s in self._scenes if s.rocker_id == packet.sender_int]
-            if scenes:
+            if packet.sender_int in self._scene_rocker_ids:
                 try:
                     rocker_action = RockerSwitchTools.extract_action_from_packet(packet)
-                    scenes = [s for s in scenes if s.rocker_key == rocker_action.button]
-                except DeviceException:
-                    scenes = None
+                except (DeviceException, EepPropException):
                     EnoceanTools.log_pickled_enocean_packet(self._logger.warning, packet, "find_rocker_scene - cannot extract")
+                    return None
 
-                if scenes:
-                    return scenes[0]
+                return self._scenes_by_key.get((packet.sender_int, rocker_action.button))
 
         return None
 
@@ -0,0 +1,52 @@
+import abc
+from datetime import datetime
+from typing import Optional
+
+
+CONFKEY_REFRESH_RATE = "refresh_rate"
+
+
+STATUS_POLLING_JSONSCHEMA = {
+    "type": "object",
+    "properties": {
+        CONFKEY_REFRESH_RATE: {"type": "number", "minimum": 10, "description": "Status request interval in seconds."},
+    },
+}
+
+
+class StatusPolling:
+    """
+    Actors, which request their status cyclically. The requests are triggered by the `PollScheduler` of the runner,
+    which spreads the requests of all actors evenly over time.
+    """
+
+    DEFAULT_REFRESH_RATE = 300  # in seconds
+
+    def __init__(self):
+        self._refresh_rate = self.DEFAULT_REFRESH_RATE
+        self._last_status_request: Optional[datetime] = None  # set by requests and status telegrams too
+
+    def _set_status_polling_config(self, config):
+        self.validate_config(config, STATUS_POLLING_JSONSCHEMA)
+        self._refresh_rate = config.get(CONFKEY_REFRESH_RATE, self.DEFAULT_REFRESH_RATE)
+
+    @property
+    def refresh_rate(self) -> float:
+        return self._refresh_rate
+
+    def poll_status(self, skip_age: float) -> bool:
+        """
+        Request the status, unless the device has reported (or was requested) within the last `skip_age` seconds.
+        Returns True if the status was requested.
+        """
+        now = self._now()
+        if self._last_status_request is not None and (now - self._last_status_request).total_seconds() < skip_age:
+            return False
+
+        self._last_status_request = now
+        self._request_update()
+        return True
+
+    @abc.abstractmethod
+    def _request_update(self):
+        raise NotImplementedError
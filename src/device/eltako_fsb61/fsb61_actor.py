@@ -1,5 +1,4 @@
 import json
-import random
 from datetime import datetime
 from enum import Enum
 from math import isclose
@@ -12,14 +11,17 @@ from enocean.protocol.constants import PACKET
 from enocean.protocol.packet import RadioPacket
 from src.command.shutter_command import ShutterCommand, ShutterCommandType
 from src.common.json_attributes import JsonAttributes
+from src.device.base.command_inbox import CommandInbox
 from src.device.base.cyclic_device import CheckCyclicTask
-from src.device.base.scene_actor import SceneActor
+from src.device.base.scene_actor import RockerScene, SceneActor
+from src.device.base.status_polling import StatusPolling
 from src.common.device_exception import DeviceException
 from src.device.eltako_fsb61.fsb61_eep import Fsb61StateConverter, Fsb61Command, Fsb61CommandType, Fsb61CommandConverter, \
     Fsb61StateType, Fsb61State
 from src.device.eltako_fsb61.fsb61_shutter_position import Fsb61ShutterPosition, Fsb61ShutterStatus
 from src.device.eltako_fsb61.fsb61_storage import Fsb61Storage
 from src.enocean_connector import EnoceanMessage
+from src.enocean_transmit_pacer import TransmitPriority
 from src.storage import CONFKEY_STORAGE_FILE, CONFKEY_STORAGE_MAX_AGE_SECS
 from src.tools.enocean_tools import EnoceanTools
 
@@ -57,22 +59,22 @@ class Fsb61Status(Enum):
     ERROR = "error"
 
 
-class Fsb61Actor(SceneActor, CheckCyclicTask):
+class Fsb61Actor(SceneActor, CheckCyclicTask, StatusPolling, CommandInbox):
     """
     Specialized for: Eltako FSB61NB-230V
     """
 
-    DEFAULT_REFRESH_RATE = 300  # in seconds
     DEFAULT_SEQUENCE_DELAY = 0.1
     ROLLING_POS = 90.0  # 90 - 100%, within this range the position is interpreted as shutter gaps only
     POSITION_RESERVE_TIME = 2.0
     CALIBRATION_AFTER_JUMPS = 7
+    MERGEABLE_COMMAND_TYPES = [ShutterCommandType.POSITION.name]
 
     def __init__(self, name):
         SceneActor.__init__(self, name)
         CheckCyclicTask.__init__(self)
-
-        self._last_status_request_time: Optional[datetime] = None
+        StatusPolling.__init__(self)
+        CommandInbox.__init__(self)
 
         self._storage = Fsb61Storage(name)
 
@@ -89,6 +91,8 @@ class Fsb61Actor(SceneActor, CheckCyclicTask):
         super()._set_config(config, skip_require_fields)
 
         self.validate_config(config, FSB61_JSONSCHEMA)
+        self._set_status_polling_config(config)
+        self._set_command_inbox_config(config)
 
         self._shutter_position.time_down_driving = config[CONFKEY_TIME_DOWN_DRIVING]
         self._shutter_position.time_down_rolling = config[CONFKEY_TIME_DOWN_ROLLING]
@@ -110,11 +114,14 @@ class Fsb61Actor(SceneActor, CheckCyclicTask):
 
         rocker_scene = self.find_rocker_scene(packet)
         if rocker_scene:
-            self._reset_stored_device_commands()
             self.process_rocker_scene(rocker_scene)
         else:
             self.process_enocean_fsb61_message(message)
 
+    def process_rocker_scene(self, scene: RockerScene):
+        self._reset_stored_device_commands()
+        super().process_rocker_scene(scene)
+
     def process_enocean_fsb61_message(self, message: EnoceanMessage):
         packet: RadioPacket = message.payload
 
@@ -143,7 +150,7 @@ class Fsb61Actor(SceneActor, CheckCyclicTask):
 
         # prevent offline message
         self._reset_offline_refresh_timer()
-        self._last_status_request_time = self._now()
+        self._last_status_request = self._now()
 
     def _update_position(self, status: Fsb61State):
         update_status = status
@@ -183,18 +190,20 @@ class Fsb61Actor(SceneActor, CheckCyclicTask):
         try:
             shutter_command = ShutterCommand.parse(message.payload)
             self._logger.debug('process_mqtt_message: "%s" => %s', message.payload, repr(shutter_command))
-
-            device_commands = self.create_device_commands(shutter_command)
-            if device_commands:
-                self._process_device_command1(device_commands)
-
+            self._receive_command(shutter_command, shutter_command.type.name)
         except ValueError as ex:
             self._logger.error("cannot execute command ({})! message: {}".format(ex, message.payload))
 
+    def _execute_command(self, shutter_command: ShutterCommand):
+        device_commands = self.create_device_commands(shutter_command)
+        if device_commands:
+            self._process_device_command1(device_commands)
+
     def _process_device_command1(self, device_commands: List[Fsb61Command]):
         device_command1 = device_commands[0]
         packet = Fsb61CommandConverter.create_packet(device_command1)
-        self._send_enocean_packet(packet)
+        is_status_request = device_command1.type == Fsb61CommandType.STATUS_REQUEST
+        self._send_enocean_packet(packet, priority=TransmitPriority.STATUS if is_status_request else TransmitPriority.COMMAND)
 
         self._logger.debug('process_device_command1: "%s"', device_commands)
 
@@ -333,23 +342,10 @@ class Fsb61Actor(SceneActor, CheckCyclicTask):
 
     def check_cyclic_tasks(self):
         self._check_and_send_offline()
-        self._request_update()
 
     def _request_update(self):
-        now = self._now()
-        refresh_rate = self._randomized_refresh_rate
-
-        request_time = self._last_status_request_time
-        last_status_request_before = (now - request_time).total_seconds() if request_time is not None else None
-
-        if last_status_request_before is None or last_status_request_before >= refresh_rate:
-            self._last_status_request_time = now
-            device_commands = self.create_device_commands(ShutterCommand(ShutterCommandType.UPDATE))
-            self._process_device_command1(device_commands)
-
-    @property
-    def _randomized_refresh_rate(self) -> int:
-        return self.DEFAULT_REFRESH_RATE + random.randint(0, int(self.DEFAULT_REFRESH_RATE * 0.1))
+        device_commands = self.create_device_commands(ShutterCommand(ShutterCommandType.UPDATE))
+        self._process_device_command1(device_commands)
 
     def _now(self):
         """overwrite in test to simulate different times"""
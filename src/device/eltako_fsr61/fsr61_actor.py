@@ -1,7 +1,5 @@
 import json
 import logging
-import random
-from datetime import datetime
 from typing import Optional
 
 from paho.mqtt.client import MQTTMessage
@@ -13,26 +11,30 @@ from src.common.json_attributes import JsonAttributes
 from src.common.switch_status import SwitchStatus
 from src.device.base.cyclic_device import CheckCyclicTask
 from src.device.base.scene_actor import SceneActor
+from src.device.base.status_polling import StatusPolling
 from src.device.eltako_fsr61.fsr61_eep import Fsr61Eep, Fsr61Action, Fsr61Command
 from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerButton
 from src.enocean_connector import EnoceanMessage
+from src.enocean_transmit_pacer import TransmitPriority
 from src.tools.enocean_tools import EnoceanTools
 from src.tools.pickle_tools import PickleTools
 
 
-class Fsr61Actor(SceneActor, CheckCyclicTask):
+class Fsr61Actor(SceneActor, CheckCyclicTask, StatusPolling):
     """
     Specialized for: Eltako FSR61-230V (an ON/OFF relay switch)
     """
 
-    DEFAULT_REFRESH_RATE = 300  # in seconds
-
     def __init__(self, name):
         SceneActor.__init__(self, name)
         CheckCyclicTask.__init__(self)
+        StatusPolling.__init__(self)
 
         self._current_switch_state: Optional[SwitchStatus] = None
-        self._last_status_request: Optional[datetime] = None
+
+    def _set_config(self, config, skip_require_fields: [str]):
+        super()._set_config(config, skip_require_fields)
+        self._set_status_polling_config(config)
 
     def process_enocean_message(self, message: EnoceanMessage):
         packet: RadioPacket = message.payload
@@ -106,24 +108,10 @@ class Fsr61Actor(SceneActor, CheckCyclicTask):
 
         props, packet = Fsr61Eep.create_props_and_packet(action)
         self._logger.debug("sending '{}' => {}".format(action, props))
-        self._send_enocean_packet(packet)
+        self._send_enocean_packet(packet, priority=TransmitPriority.STATUS if command.is_update else TransmitPriority.COMMAND)
 
     def check_cyclic_tasks(self):
         self._check_and_send_offline()
-        self._request_update()
 
     def _request_update(self):
-        diff_seconds = None
-        now = self._now()
-        refresh_rate = self._randomized_refresh_rate
-
-        if self._last_status_request is not None:
-            diff_seconds = (now - self._last_status_request).total_seconds()
-
-        if diff_seconds is None or diff_seconds >= refresh_rate:
-            self._last_status_request = now
-            self._execute_actor_command(SwitchCommand.UPDATE)
-
-    @property
-    def _randomized_refresh_rate(self) -> int:
-        return self.DEFAULT_REFRESH_RATE + random.randint(0, int(self.DEFAULT_REFRESH_RATE * 0.1))
+        self._execute_actor_command(SwitchCommand.UPDATE)
@@ -1,6 +1,5 @@
 import json
 import logging
-import random
 from datetime import datetime
 from typing import Optional
 
@@ -11,16 +10,19 @@ from enocean.protocol.constants import PACKET
 from enocean.protocol.packet import RadioPacket
 from src.command.dimmer_command import DimmerCommand, DimmerCommandType
 from src.common.json_attributes import JsonAttributes
+from src.device.base.command_inbox import CommandInbox
 from src.device.base.cyclic_device import CheckCyclicTask
 from src.device.base.rocker_actor import SwitchStatus
 from src.device.base.scene_actor import SceneActor
+from src.device.base.status_polling import StatusPolling
 from src.device.eltako_fud61.fud61_eep import Fud61Eep, Fud61Action, Fud61Command
 from src.enocean_connector import EnoceanMessage
+from src.enocean_transmit_pacer import TransmitPriority
 from src.tools.enocean_tools import EnoceanTools
 from src.tools.pickle_tools import PickleTools
 
 
-class Fud61Actor(SceneActor, CheckCyclicTask):
+class Fud61Actor(SceneActor, CheckCyclicTask, StatusPolling, CommandInbox):
     """
     Specialized for: Eltako FUD61NP(N)-230V (dimmer)
 
@@ -43,13 +45,14 @@ class Fud61Actor(SceneActor, CheckCyclicTask):
     - https://github.com/kipe/enocean/blob/master/SUPPORTED_PROFILES.md
     """
 
-    DEFAULT_REFRESH_RATE = 300  # in seconds
-
     MIN_DIM_STATE = 10
+    MERGEABLE_COMMAND_TYPES = [DimmerCommandType.DIM.name]
 
     def __init__(self, name: str):
         SceneActor.__init__(self, name)
         CheckCyclicTask.__init__(self)
+        StatusPolling.__init__(self)
+        CommandInbox.__init__(self)
 
         self._mqtt_channel_cmd = None
 
@@ -57,7 +60,10 @@ class Fud61Actor(SceneActor, CheckCyclicTask):
         self._last_dim_state = Fud61Eep.DEFAULT_DIM_STATE
         self._current_switch_state: Optional[SwitchStatus] = None
 
-        self._last_status_request: Optional[datetime] = None
+    def _set_config(self, config, skip_require_fields: [str]):
+        super()._set_config(config, skip_require_fields)
+        self._set_status_polling_config(config)
+        self._set_command_inbox_config(config)
 
     def process_enocean_message(self, message: EnoceanMessage):
         packet: RadioPacket = message.payload
@@ -113,10 +119,13 @@ class Fud61Actor(SceneActor, CheckCyclicTask):
             self._logger.debug('process_mqtt_message: "%s"', message.payload)
             command = DimmerCommand.parse(message.payload)
             self._logger.debug("mqtt command: '{}'".format(repr(command)))
-            self._execute_actor_command(command)
+            self._receive_command(command, command.type.name)
         except ValueError:
             self._logger.error("cannot execute command! message: {}".format(message.payload))
 
+    def _execute_command(self, command: DimmerCommand):
+        self._execute_actor_command(command)
+
     def _execute_actor_command(self, command: DimmerCommand):
         if command.is_toggle:
             command = DimmerCommand(DimmerCommandType.OFF if self._current_switch_state == SwitchStatus.ON else DimmerCommandType.ON)
@@ -150,27 +159,13 @@ class Fud61Actor(SceneActor, CheckCyclicTask):
 
         props, packet = Fud61Eep.create_props_and_packet(action)
         self._logger.debug("sending '{}' => {}".format(action, props))
-        self._send_enocean_packet(packet)
+        self._send_enocean_packet(packet, priority=TransmitPriority.STATUS if command.is_update else TransmitPriority.COMMAND)
 
     def check_cyclic_tasks(self):
         self._check_and_send_offline()
-        self._request_update()
 
     def _request_update(self):
-        diff_seconds = None
-        now = self._now()
-        refresh_rate = self._randomized_refresh_rate
-
-        if self._last_status_request is not None:
-            diff_seconds = (now - self._last_status_request).total_seconds()
-
-        if diff_seconds is None or diff_seconds >= refresh_rate:
-            self._last_status_request = now
-            self._execute_actor_command(DimmerCommand(DimmerCommandType.UPDATE))
-
-    @property
-    def _randomized_refresh_rate(self) -> int:
-        return self.DEFAULT_REFRESH_RATE + random.randint(0, int(self.DEFAULT_REFRESH_RATE * 0.1))
+        self._execute_actor_command(DimmerCommand(DimmerCommandType.UPDATE))
 
     def _now(self):
         """overwrite in test to simulate different times"""
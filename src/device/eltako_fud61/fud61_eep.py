@@ -193,12 +193,9 @@ class Fud61Eep:
 
         if packet.packet_type == PACKET.RADIO and packet.rorg == eep.rorg:
             if command is None:
-                eep.command = 0
-                try:
-                    tmp_props = EnoceanTools.extract_props(packet=packet, eep=eep)
-                    eep.command = tmp_props[Fud61Prop.CMD.value]
-                except AttributeError as ex:
-                    raise EepPropException(ex)
+                if len(packet.data) < 2:
+                    raise EepPropException("packet too short ({} bytes)!".format(len(packet.data)))
+                eep.command = packet.data[1]  # CMD is DB3 (first data byte after RORG), no need to decode the packet twice
             else:
                 eep.command = command.value
 
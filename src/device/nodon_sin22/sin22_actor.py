@@ -46,6 +46,10 @@ class Sin22Actor(RockerActor):
         self._eep = self.DEFAULT_EEP.clone()
         self._actor_channel = None
 
+    @property
+    def enocean_eeps(self):
+        return [self._eep]
+
     def _set_config(self, config, skip_require_fields: [str]):
         super()._set_config(config, skip_require_fields)
 
@@ -99,6 +99,10 @@ class OpeningSensor(Device, CheckCyclicTask):
 
         self._storage = Storage()
 
+    @property
+    def enocean_eeps(self):
+        return [h.eep for h in self._eep_handlers]
+
     def _set_config(self, config, skip_require_fields: [str]):
         skip_require_fields = [*skip_require_fields, CONFKEY_ENOCEAN_SENDER, CONFKEY_MQTT_CHANNEL_CMD]
 
@@ -70,6 +70,10 @@ class RockerSwitch(Device):
         self._mqtt_channels = {}
         self._mqtt_channels_long = {}
 
+    @property
+    def enocean_eeps(self):
+        return [self._eep]
+
     def _set_config(self, config, skip_require_fields: [str]):
         skip_require_fields = [*skip_require_fields, CONFKEY_MQTT_CHANNEL_CMD, CONFKEY_MQTT_CHANNEL_STATE, CONFKEY_ENOCEAN_SENDER]
 
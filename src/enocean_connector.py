@@ -1,37 +1,92 @@
 import logging
-# noinspection PyCompatibility
-import queue
-from collections import namedtuple
+import threading
+from collections import deque, namedtuple
+from typing import Deque, Dict, Iterable, List, Optional
 
-from enocean.communicators import SerialCommunicator
+from src.enocean_transmit_pacer import TransmitPacer, TransmitPriority
+from src.esp3_communicator import Esp3Communicator
+from src.esp3_framer import Esp3Frame, Esp3Framer
 
 
 _logger = logging.getLogger(__name__)
 
 
-# disable verbose enocen loggers
-logging.getLogger("enocean.communicators.SerialCommunicator").setLevel(logging.WARNING)
-
-
 EnoceanMessage = namedtuple("EnoceanMessage", ["payload", "enocean_id"])
 
+EnoceanReceiveStats = namedtuple("EnoceanReceiveStats", ["received", "dropped", "dropped_senders", "crc_errors"])
+
 
 class EnoceanConnector:
+    """
+    Connection to the Enocean gateway (ESP3 via serial port). The `Esp3Communicator` thread queues the received frames
+    only; the packet objects get created by `get_messages` (main loop).
+
+    Telegrams of senders, which are not listened (see `set_listened_senders`), are dropped by the framer already,
+    so they neither get queued nor wake up the main loop.
+    """
+
+    STOP_TIMEOUT = 1.0  # in seconds
 
     def __init__(self, port):
         self._port = port
-        self._enocean = None
+        self._enocean: Optional[Esp3Communicator] = None
         self._cached_base_id = None
+        self._wakeup: Optional[threading.Event] = None
+        self._pacer: Optional[TransmitPacer] = None
+
+        self._framer = Esp3Framer()  # kept on reconnects (sender filter, statistics)
+        self._received: Deque[Esp3Frame] = deque()  # appended by the communicator thread
+
+    def set_transmit_pacer(self, pacer: Optional[TransmitPacer]):
+        """Without pacer all packets are transmitted immediately."""
+        self._pacer = pacer
+
+    def set_wakeup(self, wakeup: threading.Event):
+        """The event gets set whenever a packet was received. Has to be called before `open`."""
+        self._wakeup = wakeup
+
+    def set_listened_senders(self, senders: Optional[Iterable[int]]):
+        """Telegrams of other senders get dropped. None: all senders are listened (no filter)."""
+        self._framer.set_sender_filter(senders)
+
+    @property
+    def receive_stats(self) -> EnoceanReceiveStats:
+        return EnoceanReceiveStats(
+            received=self._framer.count_frames,
+            dropped=self._framer.count_dropped,
+            dropped_senders=len(self._framer.dropped_senders),
+            crc_errors=self._framer.count_crc_errors,
+        )
+
+    @property
+    def dropped_senders(self) -> Dict[int, int]:
+        """number of dropped telegrams per (not listened) sender"""
+        return self._framer.dropped_senders
 
     def open(self):
-        self._enocean = SerialCommunicator(self._port)
+        self._framer.reset()
+        self._enocean = self._create_communicator()
         self._enocean.start()
         _logger.debug("open")
 
+    def _create_communicator(self) -> Esp3Communicator:
+        return Esp3Communicator(self._port, self._on_frames, self._framer)
+
     def close(self):
-        if self._enocean is not None:  # and self._enocean.is_alive():
+        if self._enocean is not None:
             self._enocean.stop()
+            self._enocean.join(self.STOP_TIMEOUT)
             self._enocean = None
+            self._log_receive_stats()
+        if self._pacer is not None:
+            _logger.debug("transmit pacer: %s", self._pacer.stats)
+
+    def _log_receive_stats(self):
+        _logger.debug("receive: %s", self.receive_stats)
+        if _logger.isEnabledFor(logging.DEBUG) and self._framer.count_dropped:
+            dropped = sorted(self.dropped_senders.items(), key=lambda i: i[1], reverse=True)[:10]
+            _logger.debug("dropped telegrams of not listened senders (top 10): %s",
+                          ", ".join("{}: {}".format(hex(sender), count) for sender, count in dropped))
 
     def is_alive(self):
         if not self._enocean:
@@ -47,30 +102,52 @@ class EnoceanConnector:
                 self.close()
                 self.open()
 
+    def _on_frames(self, frames: List[Esp3Frame]):
+        self._received.extend(frames)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
     def get_messages(self) -> [EnoceanMessage]:
+        """radio packets received since the last call"""
         messages = []  # type[EnoceanMessage]
-        loop = 0
-        while self._enocean.is_alive() and loop < 50:
-            loop += 1
-
-            try:
-                packet = self._enocean.receive.get(block=False)
-            except queue.Empty:
-                break  # loop untile the queue is empty...
-
-            if hasattr(packet, "sender_int"):
-                message = EnoceanMessage(payload=packet, enocean_id=packet.sender_int)
-                messages.append(message)
+        for _ in range(len(self._received)):
+            frame = self._received.popleft()
+            sender = frame.sender_int
+            if sender is None:
+                continue  # responses, events
+            messages.append(EnoceanMessage(payload=self._to_packet(frame), enocean_id=sender))
 
         return messages
 
+    def _to_packet(self, frame: Esp3Frame):
+        return frame.to_packet()
+
     @property
     def base_id(self):
         if self._cached_base_id is None and self._enocean is not None:
             self._cached_base_id = self._enocean.base_id
         return self._cached_base_id
 
-    def send(self, packet):
+    def send(self, packet, priority: TransmitPriority = TransmitPriority.COMMAND):
+        if self._pacer is None:
+            self._transmit(packet)
+        else:
+            self._pacer.submit(packet, priority)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def transmit_due(self) -> bool:
+        """transmit the paced packets, which are allowed to be sent now (to be called by the main loop)"""
+        if self._pacer is None:
+            return False
+        return self._pacer.transmit_due(self._transmit)
+
+    def time_to_next_transmit(self) -> Optional[float]:
+        """None if no paced packets are waiting"""
+        if self._pacer is None:
+            return None
+        return self._pacer.time_to_next()
+
+    def _transmit(self, packet):
         if self._enocean is not None:
             self._enocean.send(packet)
-            pass
@@ -1,5 +1,8 @@
 import copy
+import threading
+from collections import OrderedDict
 
+from enocean.protocol.constants import PACKET
 from enocean.protocol.packet import RadioPacket
 
 from src.common.eep import Eep
@@ -10,6 +13,13 @@ class EnoceanPacketFactory:
 
     _sender_id = None
 
+    # `RadioPacket.create` resolves the EEP via the XML definitions and encodes every field. The encoded telegrams
+    # are cached as templates (keyed by EEP, learn flag and props); only sender and destination get patched in.
+    # The profile and the parsed props are part of the template too (logging of sent packets).
+    TEMPLATE_CACHE_SIZE = 256
+    _templates = OrderedDict()
+    _templates_lock = threading.Lock()
+
     @classmethod
     def set_sender_id(cls, sender_id):
         if type(sender_id) == int:
@@ -28,6 +38,41 @@ class EnoceanPacketFactory:
         if type(sender_id) == int:
             sender_id = EnoceanTools.int_to_byte_list(sender_id)
 
+        try:
+            key = (eep.rorg, eep.func, eep.type, eep.direction, eep.command, bool(learn), frozenset(kwargs.items()))
+            hash(key)
+        except TypeError:
+            key = None  # unhashable prop values, don't cache
+
+        if key is not None and cls._is_valid_id(sender_id) and cls._is_valid_id(destination_id):
+            with cls._templates_lock:
+                template = cls._templates.get(key)
+                if template is not None:
+                    cls._templates.move_to_end(key)
+
+            if template is None:
+                packet = cls._create_packet(eep, destination_id, sender_id, learn, **kwargs)
+                with cls._templates_lock:
+                    cls._templates[key] = (list(packet.data), list(packet.optional), packet._profile,  # noqa
+                                           cls._copy_parsed(packet.parsed))
+                    while len(cls._templates) > cls.TEMPLATE_CACHE_SIZE:
+                        cls._templates.popitem(last=False)
+                return packet
+
+            data, optional = list(template[0]), list(template[1])
+            data[-5:-1] = sender_id
+            optional[1:5] = destination_id
+            packet = RadioPacket(PACKET.RADIO_ERP1, data=data, optional=optional)
+            packet.rorg_func = eep.func
+            packet.rorg_type = eep.type
+            packet._profile = template[2]  # noqa
+            packet.parsed = cls._copy_parsed(template[3])
+            return packet
+
+        return cls._create_packet(eep, destination_id, sender_id, learn, **kwargs)
+
+    @classmethod
+    def _create_packet(cls, eep: Eep, destination_id, sender_id, learn, **kwargs):
         return RadioPacket.create(
             eep.rorg, eep.func, eep.type, direction=eep.direction, command=eep.command,
             destination=destination_id,
@@ -35,3 +80,18 @@ class EnoceanPacketFactory:
             learn=learn,
             **kwargs
         )
+
+    @classmethod
+    def _copy_parsed(cls, parsed):
+        """the values of the props are dicts of simple values"""
+        return OrderedDict((name, dict(prop)) for name, prop in parsed.items())
+
+    @classmethod
+    def _is_valid_id(cls, enocean_id) -> bool:
+        """let the library handle (and complain about) unusual IDs"""
+        return isinstance(enocean_id, list) and len(enocean_id) == 4
+
+    @classmethod
+    def clear_templates(cls):
+        with cls._templates_lock:
+            cls._templates.clear()
@@ -0,0 +1,169 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional
+
+
+_logger = logging.getLogger(__name__)
+
+
+SendSchedulerStats = namedtuple("SendSchedulerStats", ["queued", "sent", "dropped", "cancelled", "pending"])
+
+
+class ScheduledPacket:
+    """Handle of a scheduled packet; can be passed to `EnoceanSendScheduler.cancel`."""
+
+    def __init__(self, due: float, sequence: int, send_func: Callable[[], None], owner: Optional[str]):
+        self.due = due
+        self.sequence = sequence  # keeps the order of packets with the same due time
+        self.send_func = send_func
+        self.owner = owner
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.due, self.sequence) < (other.due, other.sequence)
+
+
+class EnoceanSendScheduler:
+    """
+    Queue of outbound Enocean packets, which have to be sent later (e.g. the release packet after a rocker press).
+    The packets are sent by the main loop (`send_due`), which wakes up at the time of the next due packet. So nobody
+    has to sleep or to start a timer thread, and all packets are sent by one thread.
+
+    The number of pending packets per owner (device) is limited; further packets get dropped.
+    """
+
+    DEFAULT_MAX_PENDING_PER_OWNER = 16
+
+    def __init__(self, max_pending_per_owner: int = DEFAULT_MAX_PENDING_PER_OWNER):
+        self._max_pending_per_owner = max_pending_per_owner
+
+        self._heap: List[ScheduledPacket] = []  # cancelled entries are removed lazily
+        self._sequence = itertools.count()
+        self._pending_by_owner: Dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+        self._wakeup: Optional[threading.Event] = None
+
+        self._count_queued = 0
+        self._count_sent = 0
+        self._count_dropped = 0
+        self._count_cancelled = 0
+
+    def set_wakeup(self, wakeup: threading.Event):
+        """The event gets set whenever a packet was scheduled, so the main loop can adapt its waiting time."""
+        self._wakeup = wakeup
+
+    def schedule(self, delay: float, send_func: Callable[[], None], owner: Optional[str] = None) -> Optional[ScheduledPacket]:
+        """returns a handle for cancellation or None if the packet was dropped (too many pending packets of the owner)"""
+        with self._lock:
+            pending = self._pending_by_owner.get(owner, 0)
+            if pending >= self._max_pending_per_owner:
+                self._count_dropped += 1
+                _logger.warning("too many pending packets (%d) of '%s' => packet dropped!", pending, owner)
+                return None
+
+            entry = ScheduledPacket(self._now() + delay, next(self._sequence), send_func, owner)
+            heapq.heappush(self._heap, entry)
+            self._pending_by_owner[owner] = pending + 1
+            self._count_queued += 1
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        return entry
+
+    def cancel(self, entry: Optional[ScheduledPacket]) -> bool:
+        """returns True if the packet was still pending"""
+        if entry is None:
+            return False
+        with self._lock:
+            return self._cancel_entry(entry)
+
+    def cancel_owner(self, owner: Optional[str]) -> int:
+        """cancel all pending packets of an owner; returns the number of cancelled packets"""
+        with self._lock:
+            entries = [e for e in self._heap if e.owner == owner and not e.cancelled]
+            for entry in entries:
+                self._cancel_entry(entry)
+            return len(entries)
+
+    def clear(self) -> int:
+        """cancel all pending packets; returns the number of cancelled packets"""
+        with self._lock:
+            entries = [e for e in self._heap if not e.cancelled]
+            for entry in entries:
+                self._cancel_entry(entry)
+            self._heap = []
+            return len(entries)
+
+    def _cancel_entry(self, entry: ScheduledPacket) -> bool:
+        if entry.cancelled or entry.send_func is None:
+            return False  # already cancelled or sent
+        entry.cancelled = True
+        self._release_entry(entry)
+        self._count_cancelled += 1
+        return True
+
+    def _release_entry(self, entry: ScheduledPacket):
+        entry.send_func = None
+        pending = self._pending_by_owner.get(entry.owner, 0) - 1
+        if pending > 0:
+            self._pending_by_owner[entry.owner] = pending
+        else:
+            self._pending_by_owner.pop(entry.owner, None)
+
+    def time_to_next(self) -> Optional[float]:
+        """seconds until the next packet is due (0 if overdue); None if nothing is scheduled"""
+        with self._lock:
+            self._drop_cancelled_head()
+            if not self._heap:
+                return None
+            due = self._heap[0].due
+        return max(0.0, due - self._now())
+
+    def send_due(self) -> bool:
+        """send all due packets; returns True if anything was sent"""
+        sent = False
+        while True:
+            with self._lock:
+                self._drop_cancelled_head()
+                if not self._heap or self._heap[0].due > self._now():
+                    break
+                entry = heapq.heappop(self._heap)
+                send_func = entry.send_func
+                self._release_entry(entry)
+                self._count_sent += 1
+
+            try:
+                send_func()
+            except Exception as ex:
+                _logger.exception(ex)
+            sent = True
+
+        return sent
+
+    def _drop_cancelled_head(self):
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+
+    @property
+    def stats(self) -> SendSchedulerStats:
+        with self._lock:
+            return SendSchedulerStats(
+                queued=self._count_queued,
+                sent=self._count_sent,
+                dropped=self._count_dropped,
+                cancelled=self._count_cancelled,
+                pending=sum(self._pending_by_owner.values()),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return sum(self._pending_by_owner.values())
+
+    @classmethod
+    def _now(cls) -> float:
+        return time.monotonic()
@@ -0,0 +1,98 @@
+import time
+from collections import deque, namedtuple
+from enum import IntEnum
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+class TransmitPriority(IntEnum):
+    COMMAND = 0  # user commands (MQTT, rocker scenes)
+    STATUS = 1  # status requests (cyclic polling)
+
+
+TransmitPacerStats = namedtuple("TransmitPacerStats", ["transmitted", "queued", "max_queued", "wait_time_avg", "wait_time_max"])
+
+
+class TransmitPacer:
+    """
+    Token bucket, which paces the packets sent to the Enocean gateway. Sending packets back-to-back leads to collisions
+    on air (lost telegrams, repeated status requests). Up to `burst` packets are sent immediately, afterwards
+    `rate` packets per second. Status requests get transmitted only if no command packets are waiting.
+    """
+
+    DEFAULT_RATE = 10.0  # packets per second
+    DEFAULT_BURST = 5
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        if rate <= 0 or burst < 1:
+            raise ValueError("invalid transmit pacing (rate={}, burst={})!".format(rate, burst))
+
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._last_refill = self._now()
+
+        self._lanes: Dict[TransmitPriority, Deque[Tuple[float, object]]] = {p: deque() for p in TransmitPriority}
+
+        self._count_transmitted = 0
+        self._max_queued = 0
+        self._wait_time_sum = 0.0
+        self._wait_time_max = 0.0
+
+    def submit(self, packet, priority: TransmitPriority = TransmitPriority.COMMAND):
+        self._lanes[priority].append((self._now(), packet))
+        self._max_queued = max(self._max_queued, self.queued)
+
+    def transmit_due(self, transmit_func: Callable[[object], None]) -> bool:
+        """transmit as many packets as the budget allows (command lane first); returns True if anything was transmitted"""
+        transmitted = False
+        self._refill()
+
+        while self._tokens >= 1.0:
+            lane = next((q for _, q in sorted(self._lanes.items()) if q), None)
+            if lane is None:
+                break
+
+            queued_time, packet = lane.popleft()
+            self._tokens -= 1.0
+
+            wait_time = self._now() - queued_time
+            self._wait_time_sum += wait_time
+            self._wait_time_max = max(self._wait_time_max, wait_time)
+            self._count_transmitted += 1
+
+            transmit_func(packet)
+            transmitted = True
+
+        return transmitted
+
+    def time_to_next(self) -> Optional[float]:
+        """seconds until the next packet can be transmitted; None if nothing is queued"""
+        if not self.queued:
+            return None
+        self._refill()
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self._rate
+
+    def _refill(self):
+        now = self._now()
+        self._tokens = min(float(self._burst), self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._lanes.values())
+
+    @property
+    def stats(self) -> TransmitPacerStats:
+        return TransmitPacerStats(
+            transmitted=self._count_transmitted,
+            queued=self.queued,
+            max_queued=self._max_queued,
+            wait_time_avg=self._wait_time_sum / self._count_transmitted if self._count_transmitted else 0.0,
+            wait_time_max=self._wait_time_max,
+        )
+
+    @classmethod
+    def _now(cls) -> float:
+        return time.monotonic()
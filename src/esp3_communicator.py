@@ -0,0 +1,98 @@
+import datetime
+import logging
+import threading
+from typing import Callable, List, Optional
+
+import serial
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import Packet
+
+from src.esp3_framer import Esp3Frame, Esp3Framer
+
+
+_logger = logging.getLogger(__name__)
+
+
+class Esp3Communicator(threading.Thread):
+    """
+    Serial ESP3 transport (replaces the `SerialCommunicator` of the `enocean` package). The thread reads whatever is
+    waiting at the serial port, cuts it into frames by an `Esp3Framer` and hands them over to `on_frames` in chunks.
+    No packet objects are created here, except for UTE teach-in responses.
+
+    Packets are written directly by the calling thread.
+    """
+
+    BAUDRATE = 57600
+    READ_TIMEOUT = 0.1  # in seconds; max. delay to recognize `stop`
+    BASE_ID_TIMEOUT = 1.0  # in seconds
+
+    def __init__(self, port, on_frames: Callable[[List[Esp3Frame]], None], framer: Optional[Esp3Framer] = None):
+        super().__init__(name="esp3-communicator", daemon=True)
+        self._on_frames = on_frames
+        self._serial = serial.Serial(port, self.BAUDRATE, timeout=self.READ_TIMEOUT)
+        self._framer = framer if framer is not None else Esp3Framer()
+        self._stop_flag = threading.Event()
+        self._write_lock = threading.Lock()
+
+        self._base_id: Optional[List[int]] = None
+        self._base_id_event = threading.Event()
+
+    @property
+    def framer(self) -> Esp3Framer:
+        return self._framer
+
+    def stop(self):
+        self._stop_flag.set()
+
+    def run(self):
+        _logger.debug("started")
+        try:
+            while not self._stop_flag.is_set():
+                try:
+                    data = self._serial.read(self._serial.in_waiting or 1)
+                except serial.SerialException:
+                    _logger.error("serial port exception! (device disconnected or multiple access on port?)")
+                    break
+                if data:
+                    self._handle_frames(self._framer.feed(data, datetime.datetime.now()))
+        finally:
+            self._stop_flag.set()
+            self._serial.close()
+            _logger.debug("stopped")
+
+    def _handle_frames(self, frames: List[Esp3Frame]):
+        for frame in frames:
+            if self._base_id is None:
+                response_data = frame.response_data
+                if response_data is not None and len(response_data) == 4:
+                    self._base_id = list(response_data)
+                    self._base_id_event.set()
+
+            if frame.is_teach_in and self._base_id is not None:
+                _logger.info("sending response to UTE teach-in.")
+                self.send(frame.to_packet().create_response_packet(self._base_id))
+
+        if frames:
+            self._on_frames(frames)
+
+    def send(self, packet: Packet) -> bool:
+        if self._stop_flag.is_set():
+            return False
+        try:
+            data = bytes(packet.build())
+            with self._write_lock:
+                self._serial.write(data)
+            return True
+        except serial.SerialException:
+            _logger.error("serial port exception! (device disconnected or multiple access on port?)")
+            self.stop()
+            return False
+
+    @property
+    def base_id(self) -> Optional[List[int]]:
+        """requests the base ID from the gateway (blocks up to `BASE_ID_TIMEOUT`), if not yet known"""
+        if self._base_id is None and self.is_alive():
+            self._base_id_event.clear()
+            self.send(Packet(PACKET.COMMON_COMMAND, data=[0x08]))  # CO_RD_IDBASE
+            self._base_id_event.wait(self.BASE_ID_TIMEOUT)
+        return self._base_id
@@ -0,0 +1,239 @@
+import datetime
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from enocean.protocol.constants import PACKET, RORG
+from enocean.protocol.packet import EventPacket, Packet, RadioPacket, ResponsePacket, UTETeachInPacket
+
+
+_logger = logging.getLogger(__name__)
+
+
+def _create_crc8_table(polynomial=0x07):
+    table = []
+    for value in range(256):
+        crc = value
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) & 0xff if crc & 0x80 else (crc << 1) & 0xff
+        table.append(crc)
+    return bytes(table)
+
+
+CRC8_TABLE = _create_crc8_table()
+
+
+def crc8(data) -> int:
+    """ESP3 checksum (CRC8, polynomial 0x07) of a byte sequence (bytes, bytearray or memoryview)"""
+    crc = 0
+    for byte in data:
+        crc = CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+class Esp3Frame:
+    """
+    One checked ESP3 packet (packet type, data, optional data). The `enocean` packet object gets created on demand
+    only (`to_packet`), as its constructor parses the whole telegram.
+
+    `decoded_props` (EEP key => props) are decoded by a worker process already (see `Esp3ProcessCommunicator`).
+    """
+
+    __slots__ = ("packet_type", "data", "optional", "received", "decoded_props")
+
+    def __init__(self, packet_type: int, data: bytes, optional: bytes, received: Optional[datetime.datetime] = None,
+                 decoded_props: Optional[Dict[Tuple, Dict[str, int]]] = None):
+        self.packet_type = packet_type
+        self.data = data
+        self.optional = optional
+        self.received = received
+        self.decoded_props = decoded_props
+
+    def __repr__(self):
+        return "{}(0x{:02x}, {}, {})".format(type(self).__name__, self.packet_type, self.data.hex(), self.optional.hex())
+
+    @property
+    def is_radio(self) -> bool:
+        return self.packet_type == PACKET.RADIO_ERP1 and len(self.data) >= 6
+
+    @property
+    def is_teach_in(self) -> bool:
+        return self.is_radio and self.data[0] == RORG.UTE
+
+    @property
+    def sender_int(self) -> Optional[int]:
+        """sender ID of radio telegrams (data[-5:-1]), None otherwise"""
+        if not self.is_radio:
+            return None
+        return int.from_bytes(self.data[-5:-1], "big")
+
+    @property
+    def response_data(self) -> Optional[bytes]:
+        """data of successful responses (RET_OK), None otherwise"""
+        if self.packet_type != PACKET.RESPONSE or not self.data or self.data[0] != 0:
+            return None
+        return self.data[1:]
+
+    def to_packet(self) -> Packet:
+        """creates the same packet object as `Packet.parse_msg` does"""
+        data = list(self.data)
+        optional = list(self.optional)
+
+        if self.packet_type == PACKET.RADIO_ERP1:
+            packet_class = UTETeachInPacket if data and data[0] == RORG.UTE else RadioPacket
+        elif self.packet_type == PACKET.RESPONSE:
+            packet_class = ResponsePacket
+        elif self.packet_type == PACKET.EVENT:
+            packet_class = EventPacket
+        else:
+            packet_class = Packet
+
+        packet = packet_class(self.packet_type, data, optional)
+        packet.received = self.received
+        return packet
+
+
+class Esp3Framer:
+    """
+    Splits the serial byte stream into ESP3 frames:
+        0x55 | data length (2) | optional length (1) | packet type (1) | CRC8 header | data | optional | CRC8 data
+
+    The bytes are collected in one preallocated `bytearray`; consumed bytes are not removed but skipped by a read
+    index, the rest gets moved to the front only if the buffer runs full. Frames are checked and cut via `memoryview`
+    slices, so there are no per-byte Python lists. On checksum errors the framer resyncs at the next sync byte.
+
+    With a sender filter (see `set_sender_filter`) radio telegrams of other senders are dropped right after the
+    checksum test, before any object is created. UTE teach-in telegrams and non-radio packets always pass.
+    """
+
+    SYNC_BYTE = 0x55
+    HEADER_SIZE = 6  # sync byte, header (4), header CRC
+    DEFAULT_CAPACITY = 4096
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # read index
+        self._end = 0  # write index
+
+        self._senders: Optional[FrozenSet[int]] = None
+        self._dropped_senders: Dict[int, int] = {}  # sender => count
+
+        self.count_frames = 0
+        self.count_crc_errors = 0
+        self.count_skipped_bytes = 0
+        self.count_dropped = 0
+
+    def __len__(self):
+        """number of buffered (not yet framed) bytes"""
+        return self._end - self._start
+
+    def set_sender_filter(self, senders: Optional[Iterable[int]]):
+        """None: no filter"""
+        self._senders = frozenset(senders) if senders is not None else None
+
+    @property
+    def sender_filter(self) -> Optional[FrozenSet[int]]:
+        return self._senders
+
+    @property
+    def dropped_senders(self) -> Dict[int, int]:
+        """number of dropped telegrams per sender"""
+        return dict(self._dropped_senders)
+
+    def set_stats(self, count_frames: int, count_crc_errors: int, count_dropped: int, dropped_senders: Dict[int, int]):
+        """takes over the counters of a framer, which runs elsewhere (see `Esp3ProcessCommunicator`)"""
+        self.count_frames = count_frames
+        self.count_crc_errors = count_crc_errors
+        self.count_dropped = count_dropped
+        self._dropped_senders = dict(dropped_senders)
+
+    def reset(self):
+        self._start = 0
+        self._end = 0
+
+    def feed(self, data, received: Optional[datetime.datetime] = None) -> List[Esp3Frame]:
+        """adds received bytes and returns all completed frames"""
+        frames = []
+        source = memoryview(data)
+        while source:
+            room = self._make_room()
+            count = min(room, len(source))
+            self._buffer[self._end:self._end + count] = source[:count]
+            self._end += count
+            source = source[count:]
+            self._parse(frames, received)
+        return frames
+
+    def _make_room(self) -> int:
+        capacity = len(self._buffer)
+        if self._end == capacity:
+            unread = self._end - self._start
+            if unread == capacity:
+                # cannot happen with valid frames, see `_parse`
+                self.count_skipped_bytes += unread
+                unread = 0
+            else:
+                self._buffer[0:unread] = bytes(self._view[self._start:self._end])  # no overlapping copy
+            self._start = 0
+            self._end = unread
+        return capacity - self._end
+
+    def _parse(self, frames: List[Esp3Frame], received: Optional[datetime.datetime]):
+        buffer = self._buffer
+        view = self._view
+        capacity = len(buffer)
+
+        while self._end - self._start >= self.HEADER_SIZE:
+            start = self._start
+            if buffer[start] != self.SYNC_BYTE:
+                index = buffer.find(self.SYNC_BYTE, start, self._end)
+                next_start = self._end if index < 0 else index
+                self.count_skipped_bytes += next_start - start
+                self._start = next_start
+                continue
+
+            if crc8(view[start + 1:start + 5]) != buffer[start + 5]:
+                self._resync()
+                continue
+
+            data_length = (buffer[start + 1] << 8) | buffer[start + 2]
+            data_start = start + self.HEADER_SIZE
+            optional_start = data_start + data_length
+            optional_end = optional_start + buffer[start + 3]
+            frame_length = optional_end + 1 - start
+            if frame_length > capacity:
+                self._resync()  # no real frame is that long, but a sync byte within the data with a matching CRC
+                continue
+            if optional_end >= self._end:
+                break  # incomplete
+
+            if crc8(view[data_start:optional_end]) != buffer[optional_end]:
+                self._resync()
+                continue
+
+            self._start = optional_end + 1
+
+            senders = self._senders
+            if senders is not None and buffer[start + 4] == PACKET.RADIO_ERP1 and data_length >= 6 \
+                    and buffer[data_start] != RORG.UTE:
+                sender = int.from_bytes(view[optional_start - 5:optional_start - 1], "big")
+                if sender not in senders:
+                    self.count_dropped += 1
+                    self._dropped_senders[sender] = self._dropped_senders.get(sender, 0) + 1
+                    continue
+
+            frames.append(Esp3Frame(
+                buffer[start + 4], bytes(view[data_start:optional_start]), bytes(view[optional_start:optional_end]),
+                received
+            ))
+            self.count_frames += 1
+
+        if self._start == self._end:
+            self._start = 0
+            self._end = 0
+
+    def _resync(self):
+        self.count_crc_errors += 1
+        self.count_skipped_bytes += 1
+        self._start += 1
+        _logger.debug("ESP3 CRC error => resync.")
@@ -0,0 +1,332 @@
+import datetime
+import logging
+import multiprocessing
+import select
+import signal
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import serial
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import Packet
+
+from src.common.eep import Eep
+from src.esp3_framer import Esp3Frame, Esp3Framer
+from src.shared_ring import SharedRing
+from src.tools.eep_decoder import EepDecoders
+from src.tools.enocean_tools import EnoceanTools
+
+
+_logger = logging.getLogger(__name__)
+
+
+# records of the receive ring (worker => main process): type (1) + content
+_RECORD_FRAME = 1  # received timestamp, packet type, data length, optional length | data | optional | decoded EEPs
+_RECORD_STATS = 2  # framer counters | (sender, count) of dropped senders
+# pipe messages (both directions): write counter of the own ring, read counter of the ring of the other side
+_COUNTERS = struct.Struct("<QQ")
+_FRAME_HEADER = struct.Struct("<dBHH")
+_DECODED_HEADER = struct.Struct("<BB")  # index of the EEP of the sender, number of values (8 bytes each)
+_STATS_HEADER = struct.Struct("<QQQQ")
+_DROPPED_SENDER = struct.Struct("<IQ")
+_MAX_DROPPED_SENDERS = 1000  # reported
+
+
+def _decode_frame(frame: Esp3Frame, eeps: Dict[int, List[Eep]]) -> bytes:
+    """
+    raw values of the EEPs of the sender (compiled decoders only, see `EepDecoders`); packets, which have to be
+    decoded by the library, are left to the main process
+    """
+    sender_eeps = eeps.get(frame.sender_int)
+    if not sender_eeps:
+        return b""
+    data = frame.data
+    decoded = []
+    for index, eep in enumerate(sender_eeps):
+        if data[0] != eep.rorg:
+            continue
+        decoder = EepDecoders.get_decoder(eep)
+        if decoder is None or not decoder.can_decode_data(data[0], data):
+            continue
+        values = decoder.decode_values(data, data[-1])
+        if values is not None:
+            decoded.append(_DECODED_HEADER.pack(index, len(values)) + struct.pack("<{}Q".format(len(values)), *values))
+    return b"".join(decoded)
+
+
+def _pack_frame(frame: Esp3Frame, received: float, decoded: bytes = b"") -> bytes:
+    return bytes([_RECORD_FRAME]) \
+        + _FRAME_HEADER.pack(received, frame.packet_type, len(frame.data), len(frame.optional)) \
+        + frame.data + frame.optional + decoded
+
+
+def _unpack_frame(record: bytes, eeps: Dict[int, List[Eep]]) -> Esp3Frame:
+    received, packet_type, data_length, optional_length = _FRAME_HEADER.unpack_from(record, 1)
+    data_start = 1 + _FRAME_HEADER.size
+    position = data_start + data_length + optional_length
+    frame = Esp3Frame(
+        packet_type, record[data_start:data_start + data_length], record[data_start + data_length:position],
+        datetime.datetime.fromtimestamp(received)
+    )
+
+    if position < len(record):
+        sender_eeps = eeps[frame.sender_int]
+        decoded_props = {}
+        while position < len(record):
+            index, count = _DECODED_HEADER.unpack_from(record, position)
+            position += _DECODED_HEADER.size
+            values = struct.unpack_from("<{}Q".format(count), record, position)
+            position += 8 * count
+            eep = sender_eeps[index]
+            decoded_props[EnoceanTools.eep_key(eep)] = EepDecoders.get_decoder(eep).to_props(values)
+        frame.decoded_props = decoded_props
+    return frame
+
+
+def _pack_stats(framer: Esp3Framer, overflows: int) -> bytes:
+    dropped = sorted(framer.dropped_senders.items(), key=lambda i: i[1], reverse=True)[:_MAX_DROPPED_SENDERS]
+    return bytes([_RECORD_STATS]) \
+        + _STATS_HEADER.pack(framer.count_frames, framer.count_crc_errors, framer.count_dropped, overflows) \
+        + b"".join(_DROPPED_SENDER.pack(sender, count) for sender, count in dropped)
+
+
+def _apply_stats(record: bytes, framer: Esp3Framer) -> int:
+    """copies the counters of the worker into the framer of the main process; returns the ring overflows"""
+    count_frames, count_crc_errors, count_dropped, overflows = _STATS_HEADER.unpack_from(record, 1)
+    dropped_senders = dict(_DROPPED_SENDER.iter_unpack(record[1 + _STATS_HEADER.size:]))
+    framer.set_stats(count_frames, count_crc_errors, count_dropped, dropped_senders)
+    return overflows
+
+
+def run_gateway_process(port, receive_ring_name: str, transmit_ring_name: str, notify, commands, senders,
+                        eeps: Dict[int, List[Eep]]):
+    """
+    Worker process: reads the serial port, frames and filters the telegrams, decodes the props of the EEPs of the
+    senders (`eeps`) and puts them into the receive ring; writes the packets of the transmit ring. Ends if the main
+    process closes the `commands` pipe.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # shutdown is up to the main process
+
+    receive_ring = SharedRing.attach(receive_ring_name)
+    transmit_ring = SharedRing.attach(transmit_ring_name)
+    framer = Esp3Framer()
+    framer.set_sender_filter(senders)
+    base_id = None
+    serial_port = None
+    receive_released = 0  # read counter of the main process
+
+    def notify_main():
+        notify.send_bytes(_COUNTERS.pack(receive_ring.written, transmit_ring.read))
+
+    def send_stats():
+        receive_ring.put(_pack_stats(framer, receive_ring.count_overflows), receive_released)
+        notify_main()
+
+    try:
+        serial_port = serial.Serial(port, Esp3ProcessCommunicator.BAUDRATE, timeout=0)
+        notify_main()  # ready
+        time_stats = time.monotonic() + Esp3ProcessCommunicator.STATS_INTERVAL
+        while True:
+            readable, _, _ = select.select([serial_port, commands], [], [], Esp3ProcessCommunicator.STATS_INTERVAL)
+
+            if commands in readable:
+                try:
+                    transmit_written, receive_released = _COUNTERS.unpack(commands.recv_bytes())
+                except EOFError:
+                    break
+                transmitted = False
+                while True:
+                    data = transmit_ring.get(transmit_written)
+                    if data is None:
+                        break
+                    serial_port.write(data)
+                    transmitted = True
+                if transmitted:
+                    notify_main()  # releases the space of the transmit ring
+
+            if serial_port in readable:
+                data = serial_port.read(serial_port.in_waiting or 1)
+                now = time.time()
+                frames = framer.feed(data)
+                for frame in frames:
+                    if base_id is None:
+                        response_data = frame.response_data
+                        if response_data is not None and len(response_data) == 4:
+                            base_id = list(response_data)
+                    if frame.is_teach_in and base_id is not None:
+                        serial_port.write(bytes(frame.to_packet().create_response_packet(base_id).build()))
+                    receive_ring.put(_pack_frame(frame, now, _decode_frame(frame, eeps)), receive_released)
+                if frames:
+                    notify_main()
+
+            if time.monotonic() >= time_stats:
+                time_stats = time.monotonic() + Esp3ProcessCommunicator.STATS_INTERVAL
+                send_stats()
+
+    except serial.SerialException:
+        _logger.error("serial port exception! (device disconnected or multiple access on port?)")
+    except OSError:
+        pass  # main process gone
+    finally:
+        try:
+            send_stats()
+        except OSError:
+            pass
+        if serial_port is not None:
+            serial_port.close()
+        receive_ring.close()
+        transmit_ring.close()
+
+
+class Esp3ProcessCommunicator(threading.Thread):
+    """
+    Serial ESP3 transport within a worker process (same interface as `Esp3Communicator`). Reading, framing, the
+    sender filter and decoding the props of the EEPs of the senders (`eeps`, see `Esp3Frame.decoded_props`) run in
+    the worker, so they don't compete for the GIL with MQTT and the devices, and a hanging serial port doesn't block
+    the main process (`join` kills the worker).
+
+    Frames come back through a `SharedRing` (shared memory); a pipe wakes up this receiver thread and hands over the
+    ring counters (memory barrier, see `SharedRing`). Packets to send go the other way through a second ring and pipe.
+    If the worker does not get ready within `START_TIMEOUT`, it gets killed and the communicator is not alive.
+
+    The counters of `framer` are updated by statistic records of the worker (every `STATS_INTERVAL` seconds and at
+    the end). POSIX only (`select` on the serial port and pipe).
+    """
+
+    BAUDRATE = 57600
+    BASE_ID_TIMEOUT = 1.0  # in seconds
+    STATS_INTERVAL = 5.0  # in seconds
+    START_TIMEOUT = 30.0  # in seconds; the worker imports the modules again (spawn)
+
+    def __init__(self, port, on_frames: Callable[[List[Esp3Frame]], None], framer: Optional[Esp3Framer] = None,
+                 ring_capacity: int = SharedRing.DEFAULT_CAPACITY, eeps: Optional[Dict[int, List[Eep]]] = None):
+        super().__init__(name="esp3-process-receiver", daemon=True)
+        self._on_frames = on_frames
+        self._framer = framer if framer is not None else Esp3Framer()
+        self._stop_flag = threading.Event()
+        self._write_lock = threading.Lock()
+        self.count_overflows = 0  # frames lost, as the receive ring was full
+
+        self._base_id: Optional[List[int]] = None
+        self._base_id_event = threading.Event()
+
+        self._transmit_released = 0  # read counter of the worker
+        self._eeps = eeps or {}  # sender => EEPs, decoded by the worker
+
+        context = multiprocessing.get_context("spawn")  # no fork of the threads of the main process
+        self._receive_ring = SharedRing.create(ring_capacity)
+        self._transmit_ring = SharedRing.create(ring_capacity)
+        self._notify, notify_child = context.Pipe(duplex=False)
+        commands_child, self._commands = context.Pipe(duplex=False)
+        self._child_connections = [notify_child, commands_child]
+        self._process = context.Process(
+            target=run_gateway_process, name="esp3-gateway-{}".format(port), daemon=True,
+            args=(port, self._receive_ring.name, self._transmit_ring.name, notify_child, commands_child,
+                  self._framer.sender_filter, self._eeps)
+        )
+
+    @property
+    def framer(self) -> Esp3Framer:
+        return self._framer
+
+    def start(self):
+        self._process.start()
+        for connection in self._child_connections:
+            connection.close()  # the worker has its own copies; EOF gets recognized only without these
+        if not self._notify.poll(self.START_TIMEOUT):  # until the serial port is open (or the worker failed)
+            _logger.error("gateway process did not start within %ss - kill it!", self.START_TIMEOUT)
+            self._stop_flag.set()
+            self._process.kill()
+            return  # not alive, `EnoceanConnector.assure_connection` starts a new one
+        super().start()
+
+    def stop(self):
+        self._stop_flag.set()
+        with self._write_lock:
+            if not self._commands.closed:
+                self._commands.close()  # ends the worker
+
+    def join(self, timeout=None):
+        self.stop()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            _logger.warning("gateway process does not stop (serial port hangs?) - kill it!")
+            self._process.kill()
+            self._process.join()
+        if self.ident is not None:  # receiver started
+            super().join(timeout)
+        if not super().is_alive():
+            self._notify.close()
+            self._receive_ring.close()
+            self._transmit_ring.close()
+
+    def is_alive(self) -> bool:
+        return super().is_alive() and self._process.is_alive()
+
+    def run(self):
+        _logger.debug("started (pid %s)", self._process.pid)
+        try:
+            while True:
+                try:
+                    receive_written, self._transmit_released = _COUNTERS.unpack(self._notify.recv_bytes())
+                except (EOFError, OSError):
+                    break  # worker ended (the final statistics were announced before)
+                self._handle_records(receive_written)
+        finally:
+            self._stop_flag.set()
+            _logger.debug("stopped")
+
+    def _handle_records(self, receive_written: int):
+        frames = []
+        while True:
+            record = self._receive_ring.get(receive_written)
+            if record is None:
+                break
+            if record[0] == _RECORD_FRAME:
+                frame = _unpack_frame(record, self._eeps)
+                if self._base_id is None:
+                    response_data = frame.response_data
+                    if response_data is not None and len(response_data) == 4:
+                        self._base_id = list(response_data)
+                        self._base_id_event.set()
+                frames.append(frame)
+            elif record[0] == _RECORD_STATS:
+                self.count_overflows = _apply_stats(record, self._framer)
+
+        self._notify_worker()  # releases the space of the receive ring
+        if frames:
+            self._on_frames(frames)
+
+    def _notify_worker(self) -> bool:
+        """hands over the counters (within the lock, so they never go back); False if the worker is gone"""
+        try:
+            with self._write_lock:
+                if self._commands.closed:
+                    return False
+                self._commands.send_bytes(_COUNTERS.pack(self._transmit_ring.written, self._receive_ring.read))
+            return True
+        except OSError:
+            return False
+
+    def send(self, packet: Packet) -> bool:
+        if self._stop_flag.is_set():
+            return False
+        with self._write_lock:
+            if not self._transmit_ring.put(bytes(packet.build()), self._transmit_released):
+                _logger.error("transmit ring is full - packet dropped!")
+                return False
+        if not self._notify_worker():
+            _logger.error("gateway process is gone!")
+            return False
+        return True
+
+    @property
+    def base_id(self) -> Optional[List[int]]:
+        """requests the base ID from the gateway (blocks up to `BASE_ID_TIMEOUT`), if not yet known"""
+        if self._base_id is None and self.is_alive():
+            self._base_id_event.clear()
+            self.send(Packet(PACKET.COMMON_COMMAND, data=[0x08]))  # CO_RD_IDBASE
+            self._base_id_event.wait(self.BASE_ID_TIMEOUT)
+        return self._base_id
@@ -1,24 +1,43 @@
 import logging
 import threading
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional, Set, Tuple
 from queue import Queue, Empty
 
 import paho.mqtt.client as mqtt
 from jsonschema import validate
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+from paho.mqtt.reasoncodes import ReasonCodes
+
+from src.mqtt_publish_queue import MqttPublishQueue, PendingPublish, QueueFullPolicy
+from src.mqtt_spool import MqttSpool, MqttSpoolException
+from src.mqtt_topic_aliases import TopicAliasTable
 
 
 _logger = logging.getLogger(__name__)
 
 
 CONFKEY_MQTT_CLIENT_ID = "mqtt_client_id"
+CONFKEY_MQTT_HEARTBEAT = "mqtt_heartbeat"
 CONFKEY_MQTT_HOST = "mqtt_host"
 CONFKEY_MQTT_KEEPALIVE = "mqtt_keepalive"
+CONFKEY_MQTT_MAX_IN_FLIGHT = "mqtt_max_in_flight"
+CONFKEY_MQTT_MESSAGE_EXPIRY = "mqtt_message_expiry"
 CONFKEY_MQTT_PORT = "mqtt_port"
 CONFKEY_MQTT_PROTOCOL = "mqtt_protocol"
+CONFKEY_MQTT_QUEUE_FULL = "mqtt_queue_full"
+CONFKEY_MQTT_QUEUE_SIZE = "mqtt_queue_size"
+CONFKEY_MQTT_RECONNECT_DELAY_MAX = "mqtt_reconnect_delay_max"
+CONFKEY_MQTT_SHARED_SUBSCRIPTION_GROUP = "mqtt_shared_subscription_group"
+CONFKEY_MQTT_SPOOL_FILE = "mqtt_spool_file"
+CONFKEY_MQTT_SPOOL_SIZE = "mqtt_spool_size"
 CONFKEY_MQTT_SSL_CA_CERTS = "mqtt_ssl_ca_certs"
 CONFKEY_MQTT_SSL_CERTFILE = "mqtt_ssl_certfile"
 CONFKEY_MQTT_SSL_INSECURE = "mqtt_ssl_insecure"
 CONFKEY_MQTT_SSL_KEYFILE = "mqtt_ssl_keyfile"
+CONFKEY_MQTT_SUBSCRIPTIONS = "mqtt_subscriptions"
+CONFKEY_MQTT_TOPIC_ALIAS_MAXIMUM = "mqtt_topic_alias_maximum"
 CONFKEY_MQTT_USER_NAME = "mqtt_user_name"
 CONFKEY_MQTT_USER_PWD = "mqtt_user_pwd"
 CONFKEY_MQTT_DEBUG_SIMULATE_SENDING = "debug_simulate_sending"
@@ -28,14 +47,35 @@ MQTT_MAIN_JSONSCHEMA = {
     "type": "object",
     "properties": {
         CONFKEY_MQTT_CLIENT_ID: {"type": "string", "minLength": 1},
+        CONFKEY_MQTT_HEARTBEAT: {"type": "number", "minimum": 0,
+                                 "description": "seconds; unchanged retained states are republished only after this time; 0 disables"},
         CONFKEY_MQTT_HOST: {"type": "string", "minLength": 1},
         CONFKEY_MQTT_KEEPALIVE: {"type": "integer", "minimum": 1},
         CONFKEY_MQTT_PORT: {"type": "integer"},
+        CONFKEY_MQTT_MAX_IN_FLIGHT: {"type": "integer", "minimum": 0,
+                                     "description": "unacknowledged QoS 1/2 messages; more get queued; 0 == unlimited"},
+        CONFKEY_MQTT_MESSAGE_EXPIRY: {"type": "integer", "minimum": 1,
+                                      "description": "MQTT v5: seconds after which the broker discards retained states"},
         CONFKEY_MQTT_PROTOCOL: {"type": "integer", "enum": [3, 4, 5]},
+        CONFKEY_MQTT_QUEUE_FULL: {"type": "string", "enum": [p.value for p in QueueFullPolicy],
+                                  "description": "if the outbound queue is full: drop the oldest message or block"},
+        CONFKEY_MQTT_QUEUE_SIZE: {"type": "integer", "minimum": 1, "description": "max. number of queued outbound messages"},
+        CONFKEY_MQTT_RECONNECT_DELAY_MAX: {"type": "number", "minimum": 1,
+                                           "description": "seconds; the reconnect delay doubles up to this limit"},
+        CONFKEY_MQTT_SHARED_SUBSCRIPTION_GROUP: {"type": "string", "pattern": "^[^/+#]+$",
+                                                 "description": "MQTT v5: subscribe commands as '$share/<group>/<topic>'"},
+        CONFKEY_MQTT_SPOOL_FILE: {"type": "string", "minLength": 1,
+                                  "description": "messages published while disconnected are kept there until replayed"},
+        CONFKEY_MQTT_SPOOL_SIZE: {"type": "integer", "minimum": 1, "description": "max. number of spooled messages"},
         CONFKEY_MQTT_SSL_CA_CERTS: {"type": "string", "minLength": 1},
         CONFKEY_MQTT_SSL_CERTFILE: {"type": "string", "minLength": 1},
         CONFKEY_MQTT_SSL_INSECURE: {"type": "boolean"},
         CONFKEY_MQTT_SSL_KEYFILE: {"type": "string", "minLength": 1},
+        CONFKEY_MQTT_SUBSCRIPTIONS: {"type": "array", "items": {"type": "string", "minLength": 1},
+                                     "description": "bridge-wide topic filters (e.g. 'smarthome/enocean/+/cmd') "
+                                                    "instead of one subscription per device command channel"},
+        CONFKEY_MQTT_TOPIC_ALIAS_MAXIMUM: {"type": "integer", "minimum": 0,
+                                           "description": "MQTT v5: max. outbound topic aliases (limited by the broker)"},
         CONFKEY_MQTT_USER_NAME: {"type": "string", "minLength": 1},
         CONFKEY_MQTT_USER_PWD: {"type": "string"},
         CONFKEY_MQTT_DEBUG_SIMULATE_SENDING: {"type": "boolean", "description": "it True, no MQTT message is sent out!"},
@@ -52,19 +92,60 @@ class MqttException(Exception):
 
 
 class MqttConnector:
+    """
+    Outbound messages are not published synchronously, but put into a bounded queue (see `MqttPublishQueue`), which gets
+    flushed in batches by a publisher thread. Not more than "mqtt_max_in_flight" QoS 1/2 messages are handed over to
+    paho without acknowledgement; so a slow broker fills the queue instead of stalling the EnOcean processing.
+
+    A lost connection gets re-established with exponential backoff. Meanwhile the queued messages are moved to the spool
+    (see `MqttSpool`, if configured) and replayed in order after the reconnect. Only a refused connection (e.g. wrong
+    credentials) is fatal (see `ensure_connection`).
+    """
 
     DEFAULT_MQTT_KEEPALIVE = 60
+    DEFAULT_MQTT_MAX_IN_FLIGHT = 20
     DEFAULT_MQTT_PORT = 1883
     DEFAULT_MQTT_PORT_SSL = 8883
     DEFAULT_MQTT_PROTOCOL = 4  # 5==MQTTv5, default: 4==MQTTv311, 3==MQTTv31
+    MQTT_PROTOCOL_V5 = 5
+    DEFAULT_MQTT_RECONNECT_DELAY_MIN = 1  # in seconds
+    DEFAULT_MQTT_RECONNECT_DELAY_MAX = 120  # in seconds
+
+    # CONNACK return codes, which will not change by retrying
+    FATAL_CONNECT_RESULTS = [
+        mqtt.CONNACK_REFUSED_PROTOCOL_VERSION,
+        mqtt.CONNACK_REFUSED_IDENTIFIER_REJECTED,
+        mqtt.CONNACK_REFUSED_BAD_USERNAME_PASSWORD,
+        mqtt.CONNACK_REFUSED_NOT_AUTHORIZED,
+        # MQTT v5 reason codes
+        0x84,  # unsupported protocol version
+        0x85,  # client identifier not valid
+        0x86,  # bad user name or password
+        0x87,  # not authorized
+        0x8C,  # bad authentication method
+    ]
+
+    MAX_ACKED_EARLY = 100
+    TIME_ACKED_EARLY = 60  # in seconds
 
     def __init__(self, publisher):
         self._debug_simulate_sending = False
         self._mqtt = None
         self._publisher = publisher
         self._is_connected = False
+        self._was_connected = False
         self._connection_error_info: Optional[str] = None
+        self._subscriptions: List[str] = []
+        self._reconnect_delay_max = self.DEFAULT_MQTT_RECONNECT_DELAY_MAX
+
+        # MQTT v5 features (opt-in)
+        self._protocol = self.DEFAULT_MQTT_PROTOCOL
+        self._topic_aliases: Optional[TopicAliasTable] = None
+        self._topic_alias_maximum = 0  # configured; the broker may allow less
+        self._message_expiry: Optional[int] = None
+        self._shared_subscription_group: Optional[str] = None
         self._lock = threading.Lock()
+        self._wakeup: Optional[threading.Event] = None
 
         # public callbacks
         self.on_connect = None
@@ -72,6 +153,24 @@ class MqttConnector:
 
         self._message_queue = Queue()  # synchronized
 
+        self._publish_queue = MqttPublishQueue()
+        self._max_in_flight = self.DEFAULT_MQTT_MAX_IN_FLIGHT
+        self._in_flight: Set[int] = set()  # message ids of unacknowledged QoS 1/2 messages
+        self._acked_early: Dict[int, float] = {}  # message id => time; acknowledged before the id was registered
+        self._in_flight_lock = threading.Lock()
+        self._publish_wakeup = threading.Event()
+        self._publish_stop = False
+        self._publish_thread: Optional[threading.Thread] = None
+        self._spool: Optional[MqttSpool] = None
+
+    def set_wakeup(self, wakeup: threading.Event):
+        """The event gets set whenever a message was received or the connection state changed."""
+        self._wakeup = wakeup
+
+    def _notify_wakeup(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
     def open(self, config):
         validate(instance=config, schema=MQTT_MAIN_JSONSCHEMA)
 
@@ -89,6 +188,18 @@ class MqttConnector:
         user_pwd = config.get(CONFKEY_MQTT_USER_PWD)
 
         self._debug_simulate_sending = config.get(CONFKEY_MQTT_DEBUG_SIMULATE_SENDING, False)
+        self._max_in_flight = config.get(CONFKEY_MQTT_MAX_IN_FLIGHT, self.DEFAULT_MQTT_MAX_IN_FLIGHT)
+        self._publish_queue = self._create_publish_queue(config)
+        self._reconnect_delay_max = config.get(CONFKEY_MQTT_RECONNECT_DELAY_MAX, self.DEFAULT_MQTT_RECONNECT_DELAY_MAX)
+        self._set_v5_config(config, protocol)
+
+        spool_file = config.get(CONFKEY_MQTT_SPOOL_FILE)
+        if spool_file:
+            self._spool = MqttSpool(spool_file, config.get(CONFKEY_MQTT_SPOOL_SIZE, MqttSpool.DEFAULT_MAX_SIZE))
+            try:
+                self._spool.open()
+            except MqttSpoolException as ex:
+                raise MqttException("cannot open MQTT spool file '{}' ({})!".format(spool_file, ex))
 
         is_ssl = ssl_ca_certs or ssl_certfile or ssl_keyfile
 
@@ -106,37 +217,84 @@ class MqttConnector:
         self._mqtt.on_connect = self._on_connect
         self._mqtt.on_disconnect = self._on_disconnect
         self._mqtt.on_message = self._on_message
+        self._mqtt.on_publish = self._on_publish
+        self._mqtt.reconnect_delay_set(min_delay=self.DEFAULT_MQTT_RECONNECT_DELAY_MIN, max_delay=self._reconnect_delay_max)
 
         self.publish_stored_last_wills()
 
         if user_name or user_pwd:
             self._mqtt.username_pw_set(user_name, user_pwd)
+        self._start_network(host, port, keepalive)
+
+    def _set_v5_config(self, config, protocol):
+        self._protocol = protocol
+        self._topic_alias_maximum = config.get(CONFKEY_MQTT_TOPIC_ALIAS_MAXIMUM, 0)
+        self._message_expiry = config.get(CONFKEY_MQTT_MESSAGE_EXPIRY)
+        self._shared_subscription_group = config.get(CONFKEY_MQTT_SHARED_SUBSCRIPTION_GROUP)
+
+        v5_keys = [k for k in [CONFKEY_MQTT_TOPIC_ALIAS_MAXIMUM, CONFKEY_MQTT_MESSAGE_EXPIRY,
+                               CONFKEY_MQTT_SHARED_SUBSCRIPTION_GROUP] if config.get(k)]
+        if v5_keys and protocol != self.MQTT_PROTOCOL_V5:
+            raise MqttException("{} require(s) '{}: {}'!".format(
+                ", ".join(v5_keys), CONFKEY_MQTT_PROTOCOL, self.MQTT_PROTOCOL_V5))
+
+        if self._topic_alias_maximum:
+            self._topic_aliases = TopicAliasTable()  # enabled by CONNACK
+
+    def _create_publish_queue(self, config) -> MqttPublishQueue:
+        return MqttPublishQueue(
+            max_size=config.get(CONFKEY_MQTT_QUEUE_SIZE, MqttPublishQueue.DEFAULT_MAX_SIZE),
+            policy=QueueFullPolicy(config.get(CONFKEY_MQTT_QUEUE_FULL, QueueFullPolicy.DROP.value))
+        )
+
+    def _start_network(self, host, port, keepalive):
+        """connect and run the paho network thread and the publisher thread"""
         self._mqtt.connect_async(host, port=port, keepalive=keepalive)
         self._mqtt.loop_start()
 
+        self._publish_stop = False
+        self._publish_thread = threading.Thread(target=self._run_publisher, name="mqtt-publisher", daemon=True)
+        self._publish_thread.start()
+
+    def _stop_publisher(self):
+        if self._publish_thread is not None:
+            self._publish_stop = True
+            self._publish_wakeup.set()
+            self._publish_thread.join()
+            self._publish_thread = None
+
     def close(self):
         if self._mqtt is not None:
             self._publisher.close()
 
+            # hand over all pending messages (e.g. the last wills of the devices) to paho, no matter the in-flight limit
+            self._stop_publisher()
+            self._flush_publish_queue(limited=False)
+            _logger.debug("mqtt publish queue: %s; in-flight=%d", self._publish_queue.stats, self.in_flight)
+            if self._spool is not None:
+                _logger.debug("mqtt spool: %s", self._spool.stats)
+
             self._mqtt.loop_stop()
             self._mqtt.disconnect()
             self._mqtt.loop_forever()  # will block until disconnect complete
             self._mqtt = None
             _logger.debug("mqtt closed.")
 
+    @property
+    def is_connected(self) -> bool:
+        with self._lock:
+            return self._is_connected
+
     def ensure_connection(self):
         """
-        Check for rarely unexpected disconnects, but when happens, it's not clear how to heal. At least the loop has to be restarted.
-        Best to restart the whole app. Recognise a stopped service in system log.
+        Lost connections get re-established in background (paho network thread). Only a refused connection (which
+        won't heal by retrying) raises an exception. Recognise a stopped service in system log.
         """
         with self._lock:
-            is_connected = self._is_connected
             connection_error_info = self._connection_error_info
 
         if connection_error_info:
             raise MqttException(connection_error_info)  # leads to exit => restarted by systemd
-        if not is_connected:
-            raise MqttException("MQTT is not connected!")
 
     def get_queued_messages(self) -> List[mqtt.MQTTMessage]:
         messages = []
@@ -150,17 +308,117 @@ class MqttConnector:
 
         return messages
 
+    @property
+    def in_flight(self) -> int:
+        """number of QoS 1/2 messages, which are not acknowledged by the broker yet"""
+        return len(self._in_flight)
+
+    @property
+    def queued(self) -> int:
+        """number of messages waiting in the outbound queue"""
+        return len(self._publish_queue)
+
     def publish(self, channel: str, payload: str, qos: int = 0, retain: bool = False):
+        """queues the message; does not block (except for the "block" policy if the queue is full)"""
         if self._debug_simulate_sending:
             _logger.info("simulated sent: topic='%s'; retain=%s; qos=%d; payload='%s'", channel, retain, qos, payload)
             return
 
-        self._mqtt.publish(
-            topic=channel,
-            payload=payload,
-            qos=qos,
-            retain=retain
-        )
+        if not self._publish_queue.put(PendingPublish(channel=channel, payload=payload, qos=qos, retain=retain)):
+            _logger.warning("MQTT publish queue is full, oldest message dropped (%d dropped in total)!",
+                            self._publish_queue.count_dropped)
+        self._notify_publish()
+
+    def _notify_publish(self):
+        """trigger flushing the publish queue"""
+        self._publish_wakeup.set()
+
+    def _run_publisher(self):
+        while not self._publish_stop:
+            self._publish_wakeup.wait()
+            self._publish_wakeup.clear()
+            if not self._publish_stop:
+                self._flush_publish_queue()
+
+    def _flush_publish_queue(self, limited=True):
+        """
+        hands over the queued messages in one batch to paho (which writes them on its network thread); spooled messages
+        first. While disconnected the messages are moved to the spool.
+        """
+        if not self.is_connected:
+            if self._spool is not None:
+                self._spool.put(self._publish_queue.take())  # also on close, replayed after the next start
+                return
+            if limited:
+                return  # continued after the reconnect (`_on_connect`)
+
+        max_count = None
+        if limited and self._max_in_flight:
+            max_count = self._max_in_flight - len(self._in_flight)
+            if max_count <= 0:
+                return  # continued when messages get acknowledged (`_on_publish`)
+
+        messages = []
+        if self._spool is not None and len(self._spool) > 0:
+            messages = self._spool.take(max_count)
+            if max_count is not None:
+                max_count -= len(messages)
+        messages.extend(self._publish_queue.take(max_count))
+
+        for message in messages:
+            topic, properties = self._prepare_publish(message)
+            info = self._mqtt.publish(
+                topic=topic,
+                payload=message.payload,
+                qos=message.qos,
+                retain=message.retain,
+                properties=properties
+            )
+            if message.qos > 0 and info.rc == mqtt.MQTT_ERR_SUCCESS:
+                with self._in_flight_lock:
+                    if self._acked_early.pop(info.mid, None) is None:
+                        self._in_flight.add(info.mid)
+
+    def _prepare_publish(self, message: PendingPublish) -> Tuple[str, Optional[Properties]]:
+        """
+        MQTT v5: topic alias and message expiry. The topic is left out only for QoS 0 messages, as paho may resend
+        QoS 1/2 messages after a reconnect, when the alias is unknown to the broker.
+        """
+        if self._protocol != self.MQTT_PROTOCOL_V5:
+            return message.channel, None
+
+        topic = message.channel
+        properties = Properties(PacketTypes.PUBLISH)
+        used = False
+
+        if self._message_expiry and message.retain:
+            properties.MessageExpiryInterval = self._message_expiry
+            used = True
+
+        if self._topic_aliases is not None:
+            alias, known = self._topic_aliases.get(message.channel)
+            if alias is not None:
+                properties.TopicAlias = alias
+                used = True
+                if known and message.qos == 0:
+                    topic = ""
+
+        return topic, properties if used else None
+
+    def _on_publish(self, _mqtt_client, _userdata, mid):
+        """MQTT callback: a message was sent (QoS 0) or acknowledged (QoS 1/2)"""
+        with self._in_flight_lock:
+            if mid in self._in_flight:
+                self._in_flight.discard(mid)
+            else:
+                # QoS 0 ids get collected too, they are never looked up => remove them before the ids wrap around
+                now = time.monotonic()
+                self._acked_early[mid] = now
+                if len(self._acked_early) > self.MAX_ACKED_EARLY:
+                    self._acked_early = {m: t for m, t in self._acked_early.items() if now - t < self.TIME_ACKED_EARLY}
+
+        if len(self._publish_queue) > 0:
+            self._notify_publish()
 
     def publish_stored_last_wills(self):
         wills = self._publisher.export_stored_last_wills()
@@ -174,6 +432,14 @@ class MqttConnector:
             )
 
     def subscribe(self, channels):
+        self._subscriptions = list(channels)  # renewed after reconnects
+        self._subscribe(self._subscriptions)
+
+    def _subscribe(self, channels):
+        if self._shared_subscription_group:
+            # MQTT v5: the broker delivers each command to one of the bridges of the group
+            channels = ["$share/{}/{}".format(self._shared_subscription_group, c) for c in channels]
+
         subs_qos = 1  # qos for subscriptions, not used, but neccessary
         subscriptions = [(s, subs_qos) for s in channels]
         if subscriptions:
@@ -184,46 +450,66 @@ class MqttConnector:
 
             _logger.info("subscripted to MQTT channels (%s)", channels)
 
-    def _on_connect(self, _mqtt_client, _userdata, _flags, rc):
-        """MQTT callback is called when client connects to MQTT server."""
+    def _on_connect(self, _mqtt_client, _userdata, _flags, rc, properties=None):
+        """MQTT callback is called when client connects to MQTT server (`properties` and reason code object for MQTT v5)"""
+        rc = getattr(rc, "value", rc)
+
         if rc == 0:
+            if self._topic_aliases is not None:
+                broker_maximum = getattr(properties, "TopicAliasMaximum", 0) if properties is not None else 0
+                self._topic_aliases.reset(min(self._topic_alias_maximum, broker_maximum))
             with self._lock:
                 self._is_connected = True
-            _logger.debug("connected")
+                reconnected = self._was_connected
+                self._was_connected = True
+            if reconnected:
+                _logger.info("reconnected")
+                if self._subscriptions:
+                    self._subscribe(self._subscriptions)  # a clean session lost the subscriptions
+            else:
+                _logger.debug("connected")
+            self._notify_publish()  # replay the spool
         else:
-            connection_error_info = f"MQTT connection failed (#{rc}: {mqtt.error_string(rc)})!"
+            connection_error_info = f"MQTT connection failed (#{rc}: {self._connect_result_string(rc)})!"
             _logger.error(connection_error_info)
             with self._lock:
                 self._is_connected = False
-                self._connection_error_info = connection_error_info
+                if rc in self.FATAL_CONNECT_RESULTS:
+                    self._connection_error_info = connection_error_info
 
         if self.on_connect:
             self.on_connect(rc)
 
-    def _on_disconnect(self, _mqtt_client, _userdata, rc):
+        self._notify_wakeup()
+
+    def _connect_result_string(self, rc) -> str:
+        if self._protocol == self.MQTT_PROTOCOL_V5:
+            return str(ReasonCodes(PacketTypes.CONNACK, identifier=rc))
+        return mqtt.connack_string(rc)
+
+    def _on_disconnect(self, _mqtt_client, _userdata, rc, _properties=None):
         """MQTT callback for when the client disconnects from the MQTT server."""
-        connection_error_info = None
-        if rc != 0:
-            connection_error_info = f"MQTT connection was lost (#{rc}: {mqtt.error_string(rc)}) => abort => restart!"
+        rc = getattr(rc, "value", rc)
 
         with self._lock:
             self._is_connected = False
-            if connection_error_info and not self._connection_error_info:
-                self._connection_error_info = connection_error_info
 
         if rc == 0:
             _logger.debug("disconnected")
         else:
-            _logger.error("unexpectedly disconnected: %s", connection_error_info or "???")
+            _logger.warning("MQTT connection was lost (#%d: %s) => reconnecting...", rc, mqtt.error_string(rc))
 
         if self.on_disconnect:
             self.on_disconnect(rc)
 
+        self._notify_wakeup()
+
     def _on_message(self, _mqtt_client, _userdata, message):
         """MQTT callback when a message is received from MQTT server"""
         try:
             _logger.debug('_on_message: topic="%s" payload="%s"', message.topic, message.payload)
             if message is not None:
                 self._message_queue.put(message)
+                self._notify_wakeup()
         except Exception as ex:
             _logger.exception(ex)
@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from src.common.json_attributes import JsonAttributes
+
+
+class MqttPublishCache:
+    """
+    Remembers the last published state per (retained) topic. A state is redundant, if its payload equals the last
+    published one except for the timestamp attributes (e.g. a status request answered with the same state). Redundant
+    states get republished after `heartbeat` seconds anyway.
+
+    Only retained messages are considered: they are states; not retained messages may be events (e.g. a repeated
+    button press), which must not be suppressed.
+    """
+
+    DEFAULT_IGNORED_ATTRIBUTES = (JsonAttributes.TIMESTAMP, )
+
+    def __init__(self, heartbeat: float, ignored_attributes: Iterable[str] = DEFAULT_IGNORED_ATTRIBUTES):
+        self._heartbeat = heartbeat
+        self._ignored_attributes = frozenset(ignored_attributes)
+
+        self._last: Dict[str, Tuple[object, float]] = {}  # channel => (semantic payload, time published)
+        self._lock = threading.Lock()
+
+        self._count_skipped = 0
+
+    @property
+    def count_skipped(self) -> int:
+        return self._count_skipped
+
+    def clear(self):
+        """after a (re)connect all states have to be published again"""
+        with self._lock:
+            self._last = {}
+
+    def is_redundant(self, channel: str, payload: Union[str, Dict], retain: bool) -> bool:
+        """returns False if the message has to be published; it gets remembered as published then"""
+        if not retain:
+            return False
+
+        semantic = self._semantic_payload(payload)
+        now = self._now()
+
+        with self._lock:
+            last = self._last.get(channel)
+            if last is not None and last[0] == semantic and now - last[1] < self._heartbeat:
+                self._count_skipped += 1
+                return True
+
+            self._last[channel] = (semantic, now)
+            return False
+
+    def _semantic_payload(self, payload: Union[str, Dict]) -> object:
+        data: Optional[Dict] = None
+        if isinstance(payload, dict):
+            data = payload
+        elif payload.startswith("{"):
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                pass
+
+        if not isinstance(data, dict):
+            return payload
+        return {k: v for k, v in data.items() if k not in self._ignored_attributes}
+
+    @classmethod
+    def _now(cls):
+        return time.monotonic()
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from enum import Enum
+from typing import List, Optional
+
+
+PendingPublish = namedtuple("PendingPublish", ["channel", "payload", "qos", "retain"])
+
+
+class QueueFullPolicy(Enum):
+    DROP = "drop"  # drop the oldest message
+    BLOCK = "block"  # block the publishing thread (at most `block_timeout` seconds, then drop)
+
+
+class MqttPublishQueue:
+    """
+    Bounded, thread-safe queue of outbound MQTT messages. Retained messages get conflated per topic: while a message of
+    a retained topic is still queued (the broker is slow or not reachable), a newer one replaces it (keeping the queue
+    position). Only the newest state is of interest for retained topics.
+    """
+
+    DEFAULT_MAX_SIZE = 1000
+    DEFAULT_BLOCK_TIMEOUT = 1.0  # in seconds
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, policy: QueueFullPolicy = QueueFullPolicy.DROP,
+                 block_timeout: float = DEFAULT_BLOCK_TIMEOUT):
+        self._max_size = max_size
+        self._policy = policy
+        self._block_timeout = block_timeout
+
+        # key: channel for retained messages (conflation), a unique number otherwise
+        self._messages: OrderedDict = OrderedDict()
+        self._counter = 0
+        self._condition = threading.Condition()
+
+        self._count_put = 0
+        self._count_conflated = 0
+        self._count_dropped = 0
+
+    def __len__(self):
+        return len(self._messages)
+
+    @property
+    def stats(self) -> str:
+        return "put={}, conflated={}, dropped={}, queued={}".format(
+            self._count_put, self._count_conflated, self._count_dropped, len(self._messages))
+
+    @property
+    def count_dropped(self) -> int:
+        return self._count_dropped
+
+    def put(self, message: PendingPublish) -> bool:
+        """returns False if a message had to be dropped (the oldest one)"""
+        with self._condition:
+            self._count_put += 1
+
+            if message.retain and message.channel in self._messages:
+                self._messages[message.channel] = message
+                self._count_conflated += 1
+                return True
+
+            dropped = False
+            if len(self._messages) >= self._max_size and self._policy == QueueFullPolicy.BLOCK:
+                time_limit = time.monotonic() + self._block_timeout
+                while len(self._messages) >= self._max_size:
+                    time_left = time_limit - time.monotonic()
+                    if time_left <= 0:
+                        break
+                    self._condition.wait(time_left)
+
+            while len(self._messages) >= self._max_size:
+                self._messages.popitem(last=False)
+                self._count_dropped += 1
+                dropped = True
+
+            if message.retain:
+                key = message.channel
+            else:
+                self._counter += 1
+                key = self._counter
+            self._messages[key] = message
+            return not dropped
+
+    def take(self, max_count: Optional[int] = None) -> List[PendingPublish]:
+        """removes and returns the oldest messages (all if `max_count` is None)"""
+        with self._condition:
+            if max_count is None or max_count >= len(self._messages):
+                messages = list(self._messages.values())
+                self._messages.clear()
+            else:
+                messages = [self._messages.popitem(last=False)[1] for _ in range(max_count)]
+
+            if messages:
+                self._condition.notify_all()  # blocked publishers
+            return messages
+
+    def clear(self) -> int:
+        with self._condition:
+            count = len(self._messages)
+            self._messages.clear()
+            self._condition.notify_all()
+            return count
@@ -3,6 +3,7 @@ from collections import namedtuple
 from typing import Optional, Dict, Union
 
 from src.mqtt_connector import MqttConnector
+from src.mqtt_publish_cache import MqttPublishCache
 from src.tools.json_tools import JsonTools
 
 _logger = logging.getLogger(__name__)
@@ -15,15 +16,32 @@ class MqttPublisher:
 
     def __init__(self):
         self._mqtt: Optional[MqttConnector] = None
+        self._cache: Optional[MqttPublishCache] = None
         self.stored_last_wills = []
 
+    def set_cache(self, cache: Optional[MqttPublishCache]):
+        """None: publish every state, even if it didn't change"""
+        self._cache = cache
+
     def open(self, mqtt: MqttConnector):
         self._mqtt = mqtt
+        self.clear_cache()
+
+    def clear_cache(self):
+        """after a (re)connect all states have to be published again"""
+        if self._cache is not None:
+            self._cache.clear()
 
     def close(self):
         self._mqtt = None
+        if self._cache is not None:
+            _logger.debug("%d unchanged states not published.", self._cache.count_skipped)
 
     def publish(self, channel: str, payload: Union[str, Dict], qos: int = 0, retain: bool = False):
+        if self._cache is not None and self._mqtt and self._cache.is_redundant(channel, payload, retain):
+            _logger.debug("unchanged state not published: %s=%s", channel, payload)
+            return
+
         if isinstance(payload, dict):
             payload = JsonTools.dumps(payload)
 
@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+from typing import List, Optional
+
+from src.mqtt_publish_queue import MqttPublishQueue, PendingPublish, QueueFullPolicy
+
+
+_logger = logging.getLogger(__name__)
+
+
+class MqttSpoolException(Exception):
+    pass
+
+
+class MqttSpool:
+    """
+    Bounded, disk backed store of outbound messages, which could not be handed over to the broker (not connected).
+    They get replayed in order after the (re)connect; also after a restart of the process.
+
+    The file contains one JSON record per message (appended). As in `MqttPublishQueue`, retained messages are conflated
+    per topic; if the spool is full, the oldest messages get dropped. The file gets rewritten from time to time
+    (conflated messages are obsolete) and removed when all messages are replayed.
+    """
+
+    DEFAULT_MAX_SIZE = 10000
+    TEMP_SUFFIX = ".tmp"
+
+    def __init__(self, file: str, max_size: int = DEFAULT_MAX_SIZE):
+        self._file = file
+        self._messages = MqttPublishQueue(max_size=max_size, policy=QueueFullPolicy.DROP)
+        self._file_records = 0
+
+    def __len__(self):
+        return len(self._messages)
+
+    @property
+    def stats(self) -> str:
+        return self._messages.stats
+
+    def open(self):
+        """load the messages left by the former process"""
+        if not os.path.isfile(self._file):
+            return
+
+        try:
+            with open(self._file, 'r') as stream:
+                for line in stream:
+                    try:
+                        record = json.loads(line)
+                        message = PendingPublish(channel=record["channel"], payload=record["payload"],
+                                                 qos=record["qos"], retain=record["retain"])
+                    except (ValueError, KeyError, TypeError):
+                        _logger.warning("MQTT spool '%s': broken record ignored.", self._file)
+                        break
+                    self._messages.put(message)
+                    self._file_records += 1
+        except OSError as ex:
+            raise MqttSpoolException(ex)
+
+        if len(self._messages) > 0:
+            _logger.info("MQTT spool '%s': %d messages to be replayed.", self._file, len(self._messages))
+
+    def put(self, messages: List[PendingPublish]):
+        if not messages:
+            return
+
+        for message in messages:
+            self._messages.put(message)
+
+        if self._file_records > 2 * len(self._messages) + 100:
+            self._rewrite()  # contains the new messages
+            return
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self._file)), exist_ok=True)
+            with open(self._file, 'a') as stream:
+                stream.write("".join(self._record(m) for m in messages))
+            self._file_records += len(messages)
+        except OSError as ex:
+            _logger.error("MQTT spool '%s': cannot write messages (%s)! They are kept in memory only.", self._file, ex)
+
+    def take(self, max_count: Optional[int] = None) -> List[PendingPublish]:
+        """the oldest messages; the file gets removed if the spool is empty"""
+        messages = self._messages.take(max_count)
+        if messages and len(self._messages) == 0:
+            self._remove_file()
+        return messages
+
+    def _remove_file(self):
+        try:
+            if os.path.exists(self._file):
+                os.remove(self._file)
+        except OSError as ex:
+            _logger.error("MQTT spool '%s': cannot remove file (%s)!", self._file, ex)
+        self._file_records = 0
+
+    def _rewrite(self):
+        messages = self._messages.take()
+        for message in messages:
+            self._messages.put(message)
+
+        temp_file = self._file + self.TEMP_SUFFIX
+        try:
+            with open(temp_file, 'w') as stream:
+                stream.write("".join(self._record(m) for m in messages))
+            os.replace(temp_file, self._file)
+            self._file_records = len(messages)
+        except OSError as ex:
+            _logger.error("MQTT spool '%s': cannot rewrite file (%s)!", self._file, ex)
+
+    @classmethod
+    def _record(cls, message: PendingPublish) -> str:
+        payload = message.payload
+        if isinstance(payload, bytes):
+            payload = payload.decode()
+        return json.dumps({
+            "channel": message.channel,
+            "payload": payload,
+            "qos": message.qos,
+            "retain": message.retain,
+        }, separators=(",", ":")) + "\n"
@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class TopicAliasTable:
+    """
+    Outbound MQTT v5 topic aliases of one connection. The number of aliases is limited by the broker
+    ("Topic Alias Maximum" of CONNACK); if all are in use, the alias of the least recently published topic gets reused.
+    """
+
+    def __init__(self, maximum: int = 0):
+        self._maximum = maximum
+        self._aliases: OrderedDict = OrderedDict()  # topic => alias, least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._aliases)
+
+    @property
+    def maximum(self) -> int:
+        return self._maximum
+
+    def reset(self, maximum: int):
+        """aliases are valid for one connection only"""
+        with self._lock:
+            self._maximum = maximum
+            self._aliases = OrderedDict()
+
+    def get(self, topic: str) -> Tuple[Optional[int], bool]:
+        """
+        returns the alias (None if aliases are not allowed) and whether it was assigned to the topic already; if not,
+        the topic has to be sent with the alias (once) to (re)define it at the broker.
+        """
+        with self._lock:
+            if self._maximum <= 0:
+                return None, False
+
+            alias = self._aliases.get(topic)
+            if alias is not None:
+                self._aliases.move_to_end(topic)
+                return alias, True
+
+            if len(self._aliases) < self._maximum:
+                alias = len(self._aliases) + 1
+            else:
+                _, alias = self._aliases.popitem(last=False)
+            self._aliases[topic] = alias
+            return alias, False
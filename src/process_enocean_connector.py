@@ -0,0 +1,41 @@
+import logging
+from typing import Dict, List, Optional
+
+from src.common.eep import Eep
+from src.enocean_connector import EnoceanConnector
+from src.esp3_framer import Esp3Frame
+from src.esp3_process_communicator import Esp3ProcessCommunicator
+from src.tools.enocean_tools import EnoceanTools
+
+
+_logger = logging.getLogger(__name__)
+
+
+class ProcessEnoceanConnector(EnoceanConnector):
+    """
+    Runs the serial port, framing and sender filter of the gateway in a worker process (`Esp3ProcessCommunicator`).
+    The worker decodes the props of the EEPs of the senders (`eeps`) too; the packet objects still get created by
+    `get_messages` within the main process, with the decoded props put into their cache (see
+    `EnoceanTools.extract_props`), so the devices don't decode them again.
+
+    The listened senders (see `set_listened_senders`) are handed over to the worker by `open`.
+    """
+
+    def __init__(self, port, eeps: Optional[Dict[int, List[Eep]]] = None):
+        super().__init__(port)
+        self._eeps = eeps or {}  # sender => EEPs
+
+    def _create_communicator(self) -> Esp3ProcessCommunicator:
+        return Esp3ProcessCommunicator(self._port, self._on_frames, self._framer, eeps=self._eeps)
+
+    def _to_packet(self, frame: Esp3Frame):
+        packet = frame.to_packet()
+        if frame.decoded_props:
+            EnoceanTools.set_decoded_props(packet, frame.decoded_props)
+        return packet
+
+    def close(self):
+        communicator = self._enocean
+        super().close()
+        if communicator is not None and communicator.count_overflows:
+            _logger.warning("telegrams lost, as the receive ring was full: %d", communicator.count_overflows)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import signal
+import time
+
+from src.async_enocean_connector import AsyncEnoceanConnector
+from src.async_mqtt_connector import AsyncMqttConnector
+from src.config import CONFKEY_MAIN, CONFKEY_ENOCEAN_PROCESSES
+from src.runner.runner import Runner
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncRunner(Runner):
+    """
+    Alternative runner, which drives the serial port, MQTT and the cyclic device tasks by one asyncio event loop.
+    No paho network thread and no `Esp3Communicator` thread is used.
+    """
+
+    TIME_WAIT_FOR_BASE_ID = 30  # in seconds
+    TIME_WAIT_FOR_MQTT = 15  # in seconds
+
+    def __init__(self):
+        super().__init__()
+        self._loop = None
+
+    def open(self, config):
+        # the connectors get opened within the event loop (see `run`)
+        self._config = config
+        if config[CONFKEY_MAIN].get(CONFKEY_ENOCEAN_PROCESSES, False):
+            _logger.warning("'%s' is not supported with asyncio - ignored!", CONFKEY_ENOCEAN_PROCESSES)
+        self._init_storage()
+        self._init_mqtt_publisher()
+        self._init_devices()
+
+    def run(self):
+        """endless loop"""
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            _logger.debug("finishing...")
+        finally:
+            self.close()
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._send_scheduler.set_wakeup(self._wakeup)
+        for sig in [signal.SIGINT, signal.SIGTERM]:
+            self._loop.add_signal_handler(sig, self._shutdown_gracefully, sig, None)
+
+        self._mqtt_connector = AsyncMqttConnector(self._mqtt_publisher, self._loop)
+        self._mqtt_connector.set_wakeup(self._wakeup)
+        self._mqtt_connector.on_connect = self._on_mqtt_connect
+        self._mqtt_connector.on_disconnect = self._on_mqtt_disconnect
+        self._collect_mqtt_subscriptions()
+        self._mqtt_connector.open(self._config[CONFKEY_MAIN])
+
+        self._connect_enocean()
+
+        await self._wait_for_base_id_async()
+        await self._wait_for_mqtt_connection_async()
+        self._poll_scheduler.start()
+
+        tasks = [
+            asyncio.create_task(self._dispatch_messages()),
+            asyncio.create_task(self._run_periodically(self.TIME_ASSURE_CONNECTION, self._assure_enocean_connections)),
+            asyncio.create_task(self._run_periodically(self.TIME_CHECK_CYCLIC, self._check_cyclic_tasks)),
+            asyncio.create_task(self._poll_devices()),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()  # re-raises exceptions (e.g. MqttException)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _create_enocean_connector(self, port) -> AsyncEnoceanConnector:
+        return AsyncEnoceanConnector(port, self._loop)
+
+    async def _wait_for_base_id_async(self):
+        time_limit = time.monotonic() + self.TIME_WAIT_FOR_BASE_ID
+        pending = list(self._enocean_connectors)
+
+        while not self._shutdown and pending:
+            for name in list(pending):
+                base_id = await self._enocean_connectors[name].request_base_id()
+                if base_id:
+                    self._apply_base_id(base_id, name)
+                    pending.remove(name)
+            if pending and time.monotonic() > time_limit:
+                raise RuntimeError("Couldn't get my own Enocean ID ({})!?".format(", ".join(pending)))
+
+    async def _wait_for_mqtt_connection_async(self):
+        try:
+            await asyncio.wait_for(self._wait_for_mqtt_initialisation(), self.TIME_WAIT_FOR_MQTT)
+        except asyncio.TimeoutError:
+            raise RuntimeError("Couldn't connect to MQTT, callback was not called!?")
+
+    async def _wait_for_mqtt_initialisation(self):
+        while not self._shutdown:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._init_mqtt_connection():
+                break
+
+    async def _dispatch_messages(self):
+        while not self._shutdown:
+            self._wakeup.clear()
+
+            self._process_enocean_messages()
+            self._process_mqtt_messages()
+            self._reinit_mqtt_connection()
+            self._send_scheduler.send_due()
+            for connector in self._enocean_connectors.values():
+                connector.transmit_due()
+            self._mqtt_connector.ensure_connection()
+
+            if not self._shutdown:
+                timeout = self._min_timeout(
+                    self._send_scheduler.time_to_next(),
+                    *(c.time_to_next_transmit() for c in self._enocean_connectors.values())
+                )
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass  # next scheduled or paced packet is due
+
+    async def _run_periodically(self, interval, func):
+        while not self._shutdown:
+            await asyncio.sleep(interval)
+            func()
+
+    async def _poll_devices(self):
+        while not self._shutdown:
+            timeout = self._poll_scheduler.time_to_next()
+            # the task must not finish (see `asyncio.wait`), so idle if there are no polling devices
+            await asyncio.sleep(self.TIME_CHECK_CYCLIC if timeout is None else timeout)
+            self._poll_scheduler.run_due()
@@ -0,0 +1,66 @@
+import heapq
+import itertools
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from src.device.base.status_polling import StatusPolling
+
+
+_logger = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """
+    Triggers the cyclic status requests of all polling actors. The first requests are spread evenly over the refresh
+    window, each actor keeps its phase afterwards. So the radio never gets all requests at once, no matter how many
+    actors are configured (costs O(log n) per request).
+    """
+
+    SKIP_FACTOR = 0.5  # skip a request if the device reported within this part of its refresh rate
+
+    def __init__(self):
+        self._devices: List[StatusPolling] = []
+        self._heap: List[Tuple[float, int, StatusPolling]] = []
+        self._sequence = itertools.count()
+
+    def add(self, device: StatusPolling):
+        self._devices.append(device)
+
+    def start(self):
+        """schedule the first requests; spread over the refresh window of each device"""
+        now = self._now()
+        count = len(self._devices)
+        self._heap = []
+        for index, device in enumerate(self._devices):
+            due = now + device.refresh_rate * index / count
+            heapq.heappush(self._heap, (due, next(self._sequence), device))
+
+    def time_to_next(self) -> Optional[float]:
+        """seconds until the next request is due (0 if overdue); None if nothing is scheduled"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._now())
+
+    def run_due(self) -> bool:
+        """request the status of all due devices; returns True if any device was due"""
+        executed = False
+        now = self._now()
+        while self._heap and self._heap[0][0] <= now:
+            due, _, device = heapq.heappop(self._heap)
+            try:
+                device.poll_status(device.refresh_rate * self.SKIP_FACTOR)
+            except Exception as ex:
+                _logger.exception(ex)
+
+            due += device.refresh_rate
+            if due <= now:
+                due = now + device.refresh_rate  # fell behind, don't catch up
+            heapq.heappush(self._heap, (due, next(self._sequence), device))
+            executed = True
+
+        return executed
+
+    @classmethod
+    def _now(cls) -> float:
+        return time.monotonic()
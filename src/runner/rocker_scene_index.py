@@ -0,0 +1,68 @@
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from enocean.protocol.constants import PACKET
+
+from src.common.device_exception import DeviceException
+from src.common.eep_prop_exception import EepPropException
+from src.device.base.scene_actor import RockerScene, SceneActor
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools
+from src.enocean_connector import EnoceanMessage
+from src.tools.enocean_tools import EnoceanTools
+
+
+_logger = logging.getLogger(__name__)
+
+
+class RockerSceneIndex:
+    """
+    Dispatch table of all rocker scenes keyed by (rocker_id, rocker_key). A rocker packet gets decoded only once and is
+    dispatched to the subscribed actors directly, so the effort per packet doesn't depend on the number of scenes.
+    """
+
+    def __init__(self):
+        self._scenes: Dict[Tuple[int, int], List[Tuple[SceneActor, RockerScene]]] = {}
+        # actors, which listen to a rocker only because of their scenes; they don't get the rocker packets themselves
+        self._scene_listeners: Dict[int, Set[SceneActor]] = {}
+
+    def add(self, device: SceneActor):
+        for scene in device.rocker_scenes:
+            if scene.rocker_id == device.enocean_target:
+                continue  # the actor gets the packets anyway and handles the scene by itself
+
+            entries = self._scenes.setdefault((scene.rocker_id, scene.rocker_key), [])
+            if any(d is device for d, _ in entries):
+                continue  # first configured scene wins (see `SceneActor.find_rocker_scene`)
+            entries.append((device, scene))
+            self._scene_listeners.setdefault(scene.rocker_id, set()).add(device)
+
+    @property
+    def rocker_ids(self) -> Set[int]:
+        return set(self._scene_listeners)
+
+    def dispatch(self, message: EnoceanMessage) -> Optional[Set[SceneActor]]:
+        """
+        Triggers the scenes of a rocker packet. Returns the actors, which must not get the packet anymore
+        or None if the message is no packet of an indexed rocker switch.
+        """
+        listeners = self._scene_listeners.get(message.enocean_id)
+        if listeners is None:
+            return None
+
+        packet = message.payload
+        if packet.packet_type != PACKET.RADIO or packet.rorg != RockerSwitchTools.DEFAULT_EEP.rorg:
+            return None
+
+        try:
+            rocker_action = RockerSwitchTools.extract_action_from_packet(packet)
+        except (DeviceException, EepPropException):
+            EnoceanTools.log_pickled_enocean_packet(_logger.warning, packet, "RockerSceneIndex - cannot extract")
+            return listeners
+
+        for device, scene in self._scenes.get((message.enocean_id, rocker_action.button), []):
+            try:
+                device.process_rocker_scene(scene)
+            except Exception as ex:
+                _logger.exception(ex)
+
+        return listeners
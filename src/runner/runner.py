@@ -4,20 +4,38 @@ import signal
 import threading
 import time
 from enum import IntEnum
-from typing import Dict, List, Set, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 
 from enocean import utils as enocean_utils
 
 from src.common.config_exception import ConfigException
-from src.config import CONFKEY_DEVICES, CONFKEY_ENOCEAN_PORT, CONFKEY_MAIN
+from src.common.eep import Eep
+from src.config import CONFKEY_DEVICES, CONFKEY_ENOCEAN_PORT, CONFKEY_MAIN, CONFKEY_ENOCEAN_TRANSMIT_RATE, \
+    CONFKEY_ENOCEAN_TRANSMIT_BURST, CONFKEY_STORAGE_DATABASE, CONFKEY_STORAGE_FLUSH_INTERVAL, CONFKEY_STORAGE_FSYNC, \
+    CONFKEY_STORAGE_JOURNAL, CONFKEY_ENOCEAN_GATEWAYS, CONFKEY_ENOCEAN_DEDUPLICATION_WINDOW, CONFKEY_ENOCEAN_PROCESSES
 from src.device.base.cyclic_device import CheckCyclicTask
 from src.device.base.device import Device
+from src.device.base.scene_actor import SceneActor
+from src.device.base.status_polling import StatusPolling
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools
 from src.common.device_exception import DeviceException
-from src.enocean_connector import EnoceanConnector
+from src.enocean_connector import EnoceanConnector, EnoceanMessage
 from src.enocean_packet_factory import EnoceanPacketFactory
-from src.mqtt_connector import MqttConnector
+from src.enocean_send_scheduler import EnoceanSendScheduler
+from src.enocean_transmit_pacer import TransmitPacer
+from src.mqtt_connector import MqttConnector, CONFKEY_MQTT_HEARTBEAT, CONFKEY_MQTT_SUBSCRIPTIONS
+from src.mqtt_publish_cache import MqttPublishCache
 from src.mqtt_publisher import MqttPublisher
+from src.process_enocean_connector import ProcessEnoceanConnector
 from src.runner.device_factory import DeviceFactory
+from src.runner.poll_scheduler import PollScheduler
+from src.runner.rocker_scene_index import RockerSceneIndex
+from src.runner.telegram_deduplicator import TelegramDeduplicator
+from src.runner.timer_wheel import TimerWheel
+from src.runner.topic_router import TopicRouter
+from src.state_database import StateDatabase, StateDatabaseException
+from src.storage import Storage, StorageWriter
 
 _logger = logging.getLogger(__name__)
 
@@ -31,21 +49,42 @@ class _MqttState(IntEnum):
 
 class Runner(abc.ABC):
 
+    TIME_ASSURE_CONNECTION = 30  # in seconds
+    TIME_CHECK_CYCLIC = 5  # in seconds
+
+    DEFAULT_GATEWAY = "default"  # name of the gateway configured by `enocean_port`
+
     def __init__(self):
         self._config = None
-        self._enocean_connector = None
+        # gateway name => connector; the first one is the default gateway (base ID used by `EnoceanPacketFactory`)
+        self._enocean_connectors: Dict[str, EnoceanConnector] = {}
+        self._deduplicator: Optional[TelegramDeduplicator] = None  # with several gateways only
         self._shutdown = False
 
-        self._enocean_ids: Dict[int, List[Device]] = {}
+        # set by the serial thread, the MQTT network thread and the signal handler; the main loop blocks on it
+        self._wakeup = threading.Event()
+
+        self._send_scheduler = EnoceanSendScheduler()
+        self._storage_writer: Optional[StorageWriter] = None
+        self._state_database: Optional[StateDatabase] = None
+
+        self._enocean_ids: Dict[Optional[int], List[Device]] = {}  # registration; None: listen to all senders
+        # built from `_enocean_ids` (see `_build_enocean_dispatch`), never modified: sender => devices
+        self._enocean_dispatch: Mapping[int, Tuple[Device, ...]] = MappingProxyType({})
+        self._enocean_catch_all: Tuple[Device, ...] = ()  # devices listening to all senders
         self._mqtt_last_will_channels: Dict[str, Device] = {}
-        self._mqtt_channels_subscriptions: Dict[str, Set[Device]] = {}
+        self._mqtt_router: TopicRouter[Device] = TopicRouter()  # incoming MQTT messages (commands) => devices
+        self._mqtt_subscriptions: List[str] = []  # topic filters subscribed at the broker
 
         self._devices_check_cyclic = set()
+        self._poll_scheduler = PollScheduler()
+        self._rocker_scenes = RockerSceneIndex()
 
         self._mqtt_publisher = MqttPublisher()
         self._mqtt_connector: Optional[MqttConnector] = None
 
         self._mqtt_state = _MqttState.UNINITIALED
+        self._mqtt_initialised = False  # subscribed, devices opened
         self._mqtt_lock = threading.Lock()
 
         signal.signal(signal.SIGINT, self._shutdown_gracefully)
@@ -54,6 +93,7 @@ class Runner(abc.ABC):
     def _shutdown_gracefully(self, sig, _frame):
         _logger.info("shutdown signaled (%s)", sig)
         self._shutdown = True
+        self._wakeup.set()
 
     def __del__(self):
         self.close()
@@ -64,9 +104,13 @@ class Runner(abc.ABC):
         #     pretty = json.dumps(self._config, indent=4, sort_keys=True)
         #     _logger.debug("config: %s", pretty)
 
+        self._send_scheduler.set_wakeup(self._wakeup)
+        self._init_storage()
+        self._init_mqtt_publisher()
         self._init_devices()
 
         self._mqtt_connector = MqttConnector(self._mqtt_publisher)
+        self._mqtt_connector.set_wakeup(self._wakeup)
         self._mqtt_connector.on_connect = self._on_mqtt_connect
         self._mqtt_connector.on_disconnect = self._on_mqtt_disconnect
 
@@ -76,11 +120,17 @@ class Runner(abc.ABC):
         self._connect_enocean()
 
     def close(self):
-        self._mqtt_channels_subscriptions = {}  # no commands will be executed anymore
+        self._mqtt_router = TopicRouter()  # no commands will be executed anymore
 
-        if self._enocean_connector is not None:  # and self._enocean.is_alive():
-            self._enocean_connector.close()
-            self._enocean_connector = None
+        if len(self._send_scheduler) > 0:
+            _logger.info("%d scheduled packets dropped.", self._send_scheduler.clear())
+        _logger.debug("send scheduler: %s", self._send_scheduler.stats)
+
+        for connector in self._enocean_connectors.values():
+            connector.close()
+        self._enocean_connectors = {}
+        if self._deduplicator is not None:
+            _logger.debug("%d duplicate telegrams skipped.", self._deduplicator.count_duplicates)
 
         if self._mqtt_connector is not None:
             for channel, device in self._mqtt_last_will_channels.items():
@@ -90,45 +140,66 @@ class Runner(abc.ABC):
                     _logger.error(ex)
 
             self._enocean_ids = {}
+            self._build_enocean_dispatch()
             self._mqtt_last_will_channels = {}
-            self._mqtt_channels_subscriptions = {}
+            self._mqtt_router = TopicRouter()
             self._devices_check_cyclic = set()
+            self._poll_scheduler = PollScheduler()
+            self._rocker_scenes = RockerSceneIndex()
 
             self._mqtt_connector.close()
             self._mqtt_connector = None
             _logger.debug("mqtt closed.")
 
-    def run(self):
-        """endless loop"""
-        time_step = 0.05
-        time_wait_for_refresh = 0
-        time_check_offline = 0
+        if self._storage_writer is not None:
+            Storage.set_writer(None)
+            self._storage_writer.close()  # writes pending changes (e.g. the last observation times set by `close_mqtt`)
+            self._storage_writer = None
 
+        if self._state_database is not None:
+            Storage.set_database(None)
+            self._state_database.close()
+            self._state_database = None
+
+    def run(self):
+        """
+        Endless loop. Blocks until a message arrives (the connectors set the wakeup event) or a timer gets due.
+        """
         self._wait_for_base_id()
         self._wait_for_mqtt_connection()
 
+        timers = TimerWheel()
+        timers.add(self.TIME_ASSURE_CONNECTION, self._assure_enocean_connections)
+        timers.add(self.TIME_CHECK_CYCLIC, self._check_cyclic_tasks)
+        self._poll_scheduler.start()
+
         try:
+            busy = True
             while not self._shutdown:
-                busy = False
-
-                if time_wait_for_refresh >= 30:
-                    time_wait_for_refresh = 0
-                    self._enocean_connector.assure_connection()
+                if not busy:
+                    self._wakeup.wait(self._min_timeout(
+                        timers.time_to_next(),
+                        self._poll_scheduler.time_to_next(),
+                        self._send_scheduler.time_to_next(),
+                        *(c.time_to_next_transmit() for c in self._enocean_connectors.values())
+                    ))
+                # clear before fetching, so that a message arriving meanwhile triggers the next loop
+                self._wakeup.clear()
 
+                busy = False
                 if self._process_enocean_messages():
-                    busy = True
+                    busy = True  # there may be more messages queued (fetched in blocks)
                 if self._process_mqtt_messages():
                     busy = True
 
-                if time_check_offline >= 5:
-                    time_check_offline = 0
-                    self._check_cyclic_tasks()
+                self._reinit_mqtt_connection()
+                self._send_scheduler.send_due()
+                timers.run_due()
+                self._poll_scheduler.run_due()
+                for connector in self._enocean_connectors.values():
+                    connector.transmit_due()
 
-                if not busy:
-                    self._mqtt_connector.ensure_connection()
-                    time.sleep(time_step)
-                    time_wait_for_refresh += time_step
-                    time_check_offline += time_step
+                self._mqtt_connector.ensure_connection()
 
         except KeyboardInterrupt:
             # gets called without signal-handler
@@ -136,66 +207,182 @@ class Runner(abc.ABC):
         finally:
             self.close()
 
+    @classmethod
+    def _min_timeout(cls, *timeouts: Optional[float]) -> Optional[float]:
+        timeouts = [t for t in timeouts if t is not None]
+        return min(timeouts) if timeouts else None
+
+    def _gateway_configs(self) -> Dict[str, Dict]:
+        """gateway name => config (port, pacing); the pacing settings of `main` are the defaults"""
+        main_config = self._config[CONFKEY_MAIN]
+        gateways = main_config.get(CONFKEY_ENOCEAN_GATEWAYS) or {self.DEFAULT_GATEWAY: {}}
+        defaults = {k: main_config[k] for k in [CONFKEY_ENOCEAN_PORT, CONFKEY_ENOCEAN_TRANSMIT_RATE,
+                                                CONFKEY_ENOCEAN_TRANSMIT_BURST] if k in main_config}
+        return {name: {**defaults, **config} for name, config in gateways.items()}
+
+    def _create_enocean_connector(self, port) -> EnoceanConnector:
+        if self._config[CONFKEY_MAIN].get(CONFKEY_ENOCEAN_PROCESSES, False):
+            return ProcessEnoceanConnector(port, self._enocean_eeps())
+        return EnoceanConnector(port)
+
     def _connect_enocean(self):
-        port = self._config[CONFKEY_MAIN][CONFKEY_ENOCEAN_PORT]  # validated
-        self._enocean_connector = EnoceanConnector(port)
-        self._enocean_connector.open()
+        gateway_configs = self._gateway_configs()
+        listened_senders = self._listened_enocean_senders()
+        for name, gateway_config in gateway_configs.items():
+            connector = self._create_enocean_connector(gateway_config[CONFKEY_ENOCEAN_PORT])  # validated
+            connector.set_wakeup(self._wakeup)
+            connector.set_transmit_pacer(self._create_transmit_pacer(gateway_config))
+            connector.set_listened_senders(listened_senders)
+            connector.open()
+            self._enocean_connectors[name] = connector
+
+        if len(self._enocean_connectors) > 1:
+            window = self._config[CONFKEY_MAIN].get(CONFKEY_ENOCEAN_DEDUPLICATION_WINDOW, TelegramDeduplicator.DEFAULT_WINDOW)
+            self._deduplicator = TelegramDeduplicator(window) if window > 0 else None
+
+        default_gateway = next(iter(self._enocean_connectors))
+        for device in self._devices():
+            device.set_enocean_connector(self._enocean_connectors[device.enocean_gateway or default_gateway])
+
+    def _assure_enocean_connections(self):
+        for connector in self._enocean_connectors.values():
+            connector.assure_connection()
+
+    def _devices(self) -> Set[Device]:
+        return {device for devices in self._enocean_ids.values() for device in devices}
+
+    def _listened_enocean_senders(self) -> Optional[Set[int]]:
+        """registered device targets and rocker IDs; None (no filter), if a device listens to all (e.g. the sniffer)"""
+        if None in self._enocean_ids:
+            return None
+        return set(self._enocean_ids.keys()) | self._rocker_scenes.rocker_ids
+
+    def _enocean_eeps(self) -> Dict[int, List[Eep]]:
+        """sender => EEPs of the registered devices and rocker scenes (decoded by the worker processes)"""
+        eeps: Dict[int, Set[Eep]] = {}
+        for enocean_id, devices in self._enocean_ids.items():
+            if enocean_id is not None:
+                eeps.setdefault(enocean_id, set()).update(eep for device in devices for eep in device.enocean_eeps)
+        for rocker_id in self._rocker_scenes.rocker_ids:
+            eeps.setdefault(rocker_id, set()).add(RockerSwitchTools.DEFAULT_EEP)
+        return {enocean_id: list(sender_eeps) for enocean_id, sender_eeps in eeps.items() if sender_eeps}
+
+    @classmethod
+    def _create_transmit_pacer(cls, gateway_config) -> Optional[TransmitPacer]:
+        rate = gateway_config.get(CONFKEY_ENOCEAN_TRANSMIT_RATE, TransmitPacer.DEFAULT_RATE)
+        burst = gateway_config.get(CONFKEY_ENOCEAN_TRANSMIT_BURST, TransmitPacer.DEFAULT_BURST)
+        if not rate:
+            return None  # disabled
+        return TransmitPacer(rate, burst)
+
+    def _init_storage(self):
+        main_config = self._config[CONFKEY_MAIN]
+        Storage.set_journal(main_config.get(CONFKEY_STORAGE_JOURNAL, False))
+
+        database_file = main_config.get(CONFKEY_STORAGE_DATABASE)
+        if database_file:
+            self._state_database = StateDatabase(database_file)
+            try:
+                self._state_database.open()
+            except StateDatabaseException as ex:
+                raise ConfigException("cannot open state database '{}' ({})!".format(database_file, ex))
+            Storage.set_database(self._state_database)
 
-        for _, devices in self._enocean_ids.items():
-            for device in devices:
-                device.set_enocean_connector(self._enocean_connector)
+        interval = main_config.get(CONFKEY_STORAGE_FLUSH_INTERVAL, StorageWriter.DEFAULT_INTERVAL)
+        if not interval:
+            return  # write immediately
+
+        self._storage_writer = StorageWriter(interval, fsync=main_config.get(CONFKEY_STORAGE_FSYNC, False))
+        self._storage_writer.start()
+        Storage.set_writer(self._storage_writer)
+
+    def _init_mqtt_publisher(self):
+        heartbeat = self._config[CONFKEY_MAIN].get(CONFKEY_MQTT_HEARTBEAT)
+        self._mqtt_publisher.set_cache(MqttPublishCache(heartbeat) if heartbeat else None)
 
     def _wait_for_base_id(self):
-        """wait until the base id is ready"""
+        """wait until the base ids of all gateways are ready"""
         time_step = 0.05
         time_counter = 0
+        pending = list(self._enocean_connectors)
 
-        while not self._shutdown:
+        while not self._shutdown and pending:
             # wait for getting the adapter id
             time.sleep(time_step)
             time_counter += time_step
             if time_counter > 30:
-                raise RuntimeError("Couldn't get my own Enocean ID!?")
-            base_id = self._enocean_connector.base_id
-            if base_id:
-                # got a base id
-                EnoceanPacketFactory.set_sender_id(base_id)
-                if type(base_id) == list:
-                    base_id = enocean_utils.combine_hex(base_id)
-                _logger.info("base_id=%s", hex(base_id))
-                break
+                raise RuntimeError("Couldn't get my own Enocean ID ({})!?".format(", ".join(pending)))
+            for name in list(pending):
+                base_id = self._enocean_connectors[name].base_id
+                if base_id:
+                    self._apply_base_id(base_id, name)
+                    pending.remove(name)
+
+    def _apply_base_id(self, base_id, gateway: str):
+        """The base ID of the default gateway is the default sender of all packets, the others of their devices only."""
+        is_default_gateway = gateway == next(iter(self._enocean_connectors))
+        if is_default_gateway:
+            EnoceanPacketFactory.set_sender_id(base_id)
+        if type(base_id) == list:
+            base_id = enocean_utils.combine_hex(base_id)
+        if not is_default_gateway:
+            for device in self._devices():
+                if device.enocean_gateway == gateway:
+                    device.set_default_enocean_sender(base_id)
+        _logger.info("base_id=%s (gateway '%s')", hex(base_id), gateway)
 
     def _wait_for_mqtt_connection(self):
-        """wait for getting mqtt connect callback called"""
-        time_step = 0.05
-        time_counter = 0
+        """wait for getting mqtt connect callback called (signaled via wakeup event)"""
+        time_limit = time.monotonic() + 15
 
         while not self._shutdown:
-            time.sleep(time_step)
-            time_counter += time_step
-            if time_counter > 15:
+            time_left = time_limit - time.monotonic()
+            if time_left <= 0:
                 raise RuntimeError("Couldn't connect to MQTT, callback was not called!?")
+            self._wakeup.wait(time_left)
+            self._wakeup.clear()
 
-            with self._mqtt_lock:
-                if self._mqtt_state == _MqttState.INITIALISING:
-                    channels = [c for c in self._mqtt_channels_subscriptions]
-                    self._mqtt_connector.subscribe(channels)
+            if self._init_mqtt_connection():
+                break
 
-                    self._mqtt_publisher.open(self._mqtt_connector)
-                    self._mqtt_state = _MqttState.CONNECTED
+    def _init_mqtt_connection(self) -> bool:
+        """
+        subscribe and open devices after the connect callback was called; returns True if done
 
-                    for _, devices in self._enocean_ids.items():
-                        for device in devices:
-                            device.open_mqtt()
+        After a reconnect, the devices get opened again (the connector has renewed the subscriptions already), as
+        the broker has published the last wills meanwhile and may have lost retained states.
+        """
+        with self._mqtt_lock:
+            if self._mqtt_state != _MqttState.INITIALISING:
+                return False
 
-                    break
+            if not self._mqtt_initialised:
+                self._mqtt_connector.subscribe(self._mqtt_subscriptions)
+                self._mqtt_publisher.open(self._mqtt_connector)
+            else:
+                self._mqtt_publisher.clear_cache()
+            self._mqtt_state = _MqttState.CONNECTED
+            self._mqtt_initialised = True
+
+            for _, devices in self._enocean_ids.items():
+                for device in devices:
+                    device.open_mqtt()
+
+            return True
+
+    def _reinit_mqtt_connection(self):
+        """after a reconnect (see `_on_mqtt_connect`)"""
+        if self._mqtt_state == _MqttState.INITIALISING:
+            self._init_mqtt_connection()
 
     def _process_mqtt_messages(self) -> bool:
         busy = False
         messages = self._mqtt_connector.get_queued_messages()
         for message in messages:
             try:
-                devices = self._mqtt_channels_subscriptions.get(message.topic)
+                devices = self._mqtt_router.match(message.topic)
+                if not devices:
+                    _logger.debug("no device subscribed to MQTT topic '%s'.", message.topic)
                 for device in devices:
                     device.process_mqtt_message(message)
                     busy = True
@@ -207,23 +394,25 @@ class Runner(abc.ABC):
     def _process_enocean_messages(self) -> bool:
         busy = False
 
-        messages = self._enocean_connector.get_messages()
-        for message in messages:
-            try:
-                listener = self._enocean_ids.get(message.enocean_id) or []
-                if message.enocean_id is not None:
-                    none_listener = self._enocean_ids.get(None)
-                    if none_listener:
-                        listener.extend(none_listener)
-                if listener:
-                    for device in listener:
-                        device.process_enocean_message(message)
-            except Exception as ex:
-                _logger.exception(ex)
-            busy = True
+        for gateway, connector in self._enocean_connectors.items():
+            for message in connector.get_messages():
+                if self._deduplicator is not None and self._deduplicator.is_duplicate(gateway, message):
+                    continue
+                self._dispatch_enocean_message(message)
+                busy = True
 
         return busy
 
+    def _dispatch_enocean_message(self, message: EnoceanMessage):
+        try:
+            scene_listener = self._rocker_scenes.dispatch(message)
+            for device in self._enocean_dispatch.get(message.enocean_id, self._enocean_catch_all):
+                if scene_listener and device in scene_listener:
+                    continue  # scene already triggered
+                device.process_enocean_message(message)
+        except Exception as ex:
+            _logger.exception(ex)
+
     def _check_cyclic_tasks(self):
         for device in self._devices_check_cyclic:
             device.check_cyclic_tasks()
@@ -232,7 +421,8 @@ class Runner(abc.ABC):
         """Notify MQTT connection state; callback from MQTT network thread"""
         with self._mqtt_lock:
             if rc == 0:
-                if self._mqtt_state == _MqttState.UNINITIALED:
+                if not self._mqtt_initialised or self._mqtt_state == _MqttState.DISCONNECTED:
+                    # (re-)initialised by the main loop, see `_init_mqtt_connection`
                     self._mqtt_state = _MqttState.INITIALISING
             else:
                 self._mqtt_state = _MqttState.DISCONNECTED
@@ -255,9 +445,24 @@ class Runner(abc.ABC):
         if found_configuration_errors:
             raise ConfigException("Found configuration errors!?")
 
+        self._build_enocean_dispatch()
+
+    def _build_enocean_dispatch(self):
+        """precompute the devices per sender, including the devices listening to all senders"""
+        catch_all = tuple(self._enocean_ids.get(None) or ())
+        self._enocean_dispatch = MappingProxyType({
+            enocean_id: tuple(devices) + catch_all
+            for enocean_id, devices in self._enocean_ids.items() if enocean_id is not None
+        })
+        self._enocean_catch_all = catch_all
+
     def _init_device(self, name, config):
         device_instance = DeviceFactory.create_device(name, config)
 
+        gateway = device_instance.enocean_gateway
+        if gateway is not None and gateway not in self._gateway_configs():
+            raise DeviceException("device '{}': unknown Enocean gateway '{}'!".format(name, gateway))
+
         enocean_ids = device_instance.enocean_targets
         if enocean_ids is None:
             # interprete as listen to all (LogDevice)!
@@ -271,16 +476,35 @@ class Runner(abc.ABC):
 
         if isinstance(device_instance, CheckCyclicTask):
             self._devices_check_cyclic.add(device_instance)
+        if isinstance(device_instance, StatusPolling):
+            self._poll_scheduler.add(device_instance)
+        if isinstance(device_instance, SceneActor):
+            self._rocker_scenes.add(device_instance)
 
         device_instance.set_mqtt_publisher(self._mqtt_publisher)
+        device_instance.set_send_scheduler(self._send_scheduler)
         channel = device_instance.get_mqtt_last_will_channel()
         if channel:
             # former last wills could be overwritten, no matter
             self._mqtt_last_will_channels[channel] = device_instance
 
     def _collect_mqtt_subscriptions(self):
-        self._mqtt_channels_subscriptions = {}
+        """
+        Route the command channels of all devices. Channels covered by the configured bridge-wide subscriptions
+        (e.g. "smarthome/enocean/+/cmd") are not subscribed individually.
+        """
+        self._mqtt_router = TopicRouter()
+
+        bridge_subscriptions = self._config[CONFKEY_MAIN].get(CONFKEY_MQTT_SUBSCRIPTIONS) or []
+        bridge_router: TopicRouter[str] = TopicRouter()
+        try:
+            for topic_filter in bridge_subscriptions:
+                bridge_router.add(topic_filter, topic_filter)
+        except ValueError as ex:
+            raise ConfigException(ex)
 
+        subscriptions = list(bridge_subscriptions)
+        subscribed = set(subscriptions)
         for _, devices in self._enocean_ids.items():
             for device in devices:
                 channels = device.get_mqtt_channel_subscriptions()
@@ -288,8 +512,14 @@ class Runner(abc.ABC):
                     for channel in channels:
                         if channel is None:
                             continue
-                        devices = self._mqtt_channels_subscriptions.get(channel)
-                        if devices is None:
-                            devices = set()
-                            self._mqtt_channels_subscriptions[channel] = devices
-                        devices.add(device)
+                        try:
+                            self._mqtt_router.add(channel, device)
+                        except ValueError as ex:
+                            raise ConfigException("device '{}': {}".format(device.name, ex))
+
+                        covered = not TopicRouter.has_wildcards(channel) and bridge_router.match(channel)
+                        if not covered and channel not in subscribed:
+                            subscriptions.append(channel)
+                            subscribed.add(channel)
+
+        self._mqtt_subscriptions = subscriptions
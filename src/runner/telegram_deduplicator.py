@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from src.enocean_connector import EnoceanMessage
+
+
+class TelegramDeduplicator:
+    """
+    With several gateways, a telegram is usually received by more than one of them. The first reception wins;
+    the same telegram (sender + payload) from another gateway within the time window is a duplicate.
+
+    Receptions by the same gateway are never duplicates (e.g. a rocker pressed twice). The status byte is not part
+    of the payload, as repeaters change it.
+    """
+
+    DEFAULT_WINDOW = 0.5  # in seconds
+
+    def __init__(self, window: float = DEFAULT_WINDOW):
+        self._window = window
+        self._seen: "OrderedDict[Tuple[int, bytes], Tuple[float, str]]" = OrderedDict()  # ordered by time
+        self.count_duplicates = 0
+
+    def is_duplicate(self, gateway: str, message: EnoceanMessage) -> bool:
+        now = self._now()
+        self._expire(now)
+
+        key = (message.enocean_id, bytes(message.payload.data[:-1]))
+        seen = self._seen.get(key)
+        if seen is not None and seen[1] != gateway:
+            self.count_duplicates += 1
+            return True
+
+        self._seen[key] = (now, gateway)
+        self._seen.move_to_end(key)
+        return False
+
+    def _expire(self, now: float):
+        time_limit = now - self._window
+        while self._seen:
+            key, (seen_time, _) = next(iter(self._seen.items()))
+            if seen_time > time_limit:
+                break
+            del self._seen[key]
+
+    def __len__(self):
+        return len(self._seen)
+
+    @classmethod
+    def _now(cls) -> float:
+        return time.monotonic()
@@ -0,0 +1,50 @@
+import time
+from typing import Callable, List, Optional
+
+
+class _Timer:
+
+    def __init__(self, interval: float, callback: Callable[[], None], due: float):
+        self.interval = interval
+        self.callback = callback
+        self.due = due
+
+
+class TimerWheel:
+    """
+    Keeps the periodic tasks of the main loop (connection checks, cyclic device tasks). The loop asks for the time until the
+    next due timer and blocks exactly that long, instead of polling in small steps.
+    """
+
+    def __init__(self):
+        self._timers: List[_Timer] = []
+
+    def add(self, interval: float, callback: Callable[[], None], first_delay: Optional[float] = None):
+        if interval <= 0:
+            raise ValueError("timer interval must be positive!")
+        delay = interval if first_delay is None else first_delay
+        self._timers.append(_Timer(interval, callback, self._now() + delay))
+
+    def time_to_next(self) -> Optional[float]:
+        """seconds until the next timer is due (0 if overdue); None if there is no timer"""
+        if not self._timers:
+            return None
+        due = min(t.due for t in self._timers)
+        return max(0.0, due - self._now())
+
+    def run_due(self) -> bool:
+        """execute all due timers; returns True if any timer was executed"""
+        executed = False
+        now = self._now()
+        for timer in self._timers:
+            if timer.due <= now:
+                timer.due += timer.interval
+                if timer.due <= now:
+                    timer.due = now + timer.interval  # skip missed intervals, don't catch up
+                timer.callback()
+                executed = True
+        return executed
+
+    @classmethod
+    def _now(cls) -> float:
+        return time.monotonic()
@@ -0,0 +1,99 @@
+from typing import Dict, Generic, List, Set, TypeVar
+
+
+T = TypeVar("T")
+
+_LEVEL_SEPARATOR = "/"
+_SINGLE_LEVEL_WILDCARD = "+"
+_MULTI_LEVEL_WILDCARD = "#"
+
+
+class _TopicNode(Generic[T]):
+
+    __slots__ = ["children", "subscribers", "multi_level_subscribers"]
+
+    def __init__(self):
+        self.children: Dict[str, _TopicNode[T]] = {}
+        self.subscribers: Set[T] = set()  # filter ends here
+        self.multi_level_subscribers: Set[T] = set()  # filter ends with "#" here
+
+
+class TopicRouter(Generic[T]):
+    """
+    Topic trie of MQTT subscriptions (topic filters with "+" and "#" wildcards). Matching a topic costs O(topic depth)
+    (for each level at most the exact and the "+" branch are followed), no matter the number of subscriptions.
+    """
+
+    def __init__(self):
+        self._root: _TopicNode[T] = _TopicNode()
+        self._filters: Set[str] = set()
+
+    @property
+    def filters(self) -> Set[str]:
+        return set(self._filters)
+
+    @classmethod
+    def is_valid_filter(cls, topic_filter: str) -> bool:
+        if not topic_filter:
+            return False
+        levels = topic_filter.split(_LEVEL_SEPARATOR)
+        for index, level in enumerate(levels):
+            if _MULTI_LEVEL_WILDCARD in level and (level != _MULTI_LEVEL_WILDCARD or index != len(levels) - 1):
+                return False
+            if _SINGLE_LEVEL_WILDCARD in level and level != _SINGLE_LEVEL_WILDCARD:
+                return False
+        return True
+
+    @classmethod
+    def has_wildcards(cls, topic_filter: str) -> bool:
+        return _SINGLE_LEVEL_WILDCARD in topic_filter or _MULTI_LEVEL_WILDCARD in topic_filter
+
+    def add(self, topic_filter: str, subscriber: T):
+        """raises ValueError for invalid topic filters"""
+        if not self.is_valid_filter(topic_filter):
+            raise ValueError("invalid MQTT topic filter '{}'!".format(topic_filter))
+
+        node = self._root
+        for level in topic_filter.split(_LEVEL_SEPARATOR):
+            if level == _MULTI_LEVEL_WILDCARD:
+                node.multi_level_subscribers.add(subscriber)
+                break
+            child = node.children.get(level)
+            if child is None:
+                child = _TopicNode()
+                node.children[level] = child
+            node = child
+        else:
+            node.subscribers.add(subscriber)
+
+        self._filters.add(topic_filter)
+
+    def match(self, topic: str) -> Set[T]:
+        """all subscribers of filters matching the topic (empty set if there are none)"""
+        result: Set[T] = set()
+        levels = topic.split(_LEVEL_SEPARATOR)
+        # wildcards at the first level don't match topics starting with "$" (e.g. "$SYS/...")
+        system_topic = topic.startswith("$")
+
+        nodes: List[_TopicNode[T]] = [self._root]
+        for index, level in enumerate(levels):
+            next_nodes: List[_TopicNode[T]] = []
+            for node in nodes:
+                if node.multi_level_subscribers and not (index == 0 and system_topic):
+                    result.update(node.multi_level_subscribers)
+
+                child = node.children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+                if not (index == 0 and system_topic):
+                    child = node.children.get(_SINGLE_LEVEL_WILDCARD)
+                    if child is not None:
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return result
+
+        for node in nodes:
+            result.update(node.subscribers)
+            result.update(node.multi_level_subscribers)  # "a/#" matches "a" too
+        return result
@@ -0,0 +1,153 @@
+import struct
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+
+class SharedRingException(Exception):
+    pass
+
+
+class SharedRing:
+    """
+    Ring buffer of byte records within a `multiprocessing.shared_memory` block, for exactly one producer and one
+    consumer process. The producer only advances the write counter, the consumer only the read counter (both count
+    bytes since creation, the positions are taken modulo the capacity).
+
+    Python gives no memory ordering guarantees for shared memory: on weakly ordered CPUs (ARM) a counter may become
+    visible to the other process before the record bytes it covers. So the counters should be handed over by a
+    syscall (e.g. a pipe message), which acts as barrier: the consumer reads up to the `written` counter of the
+    producer only (`limit` of `get`), the producer reuses space up to the `read` counter of the consumer only
+    (`released` of `put`). Without these arguments, the counters in shared memory are used (same process, tests).
+
+    Layout: capacity (8) | write counter (8) | read counter (8) | data; a record is its length (2) + bytes and may
+    wrap around the end of the data area.
+    """
+
+    DEFAULT_CAPACITY = 1 << 16
+    MAX_RECORD_SIZE = 0xffff
+
+    _CAPACITY = struct.Struct("<Q")
+    _COUNTER = struct.Struct("<Q")
+    _LENGTH = struct.Struct("<H")
+    _OFFSET_WRITE = 8
+    _OFFSET_READ = 16
+    _OFFSET_DATA = 24
+
+    def __init__(self, memory: SharedMemory, owner: bool):
+        self._memory = memory
+        self._owner = owner
+        self._buffer = memory.buf
+        self._capacity = self._CAPACITY.unpack_from(self._buffer, 0)[0]
+        self.count_overflows = 0
+
+    @classmethod
+    def create(cls, capacity: int = DEFAULT_CAPACITY) -> "SharedRing":
+        memory = SharedMemory(create=True, size=cls._OFFSET_DATA + capacity)
+        memory.buf[:cls._OFFSET_DATA] = bytes(cls._OFFSET_DATA)
+        cls._CAPACITY.pack_into(memory.buf, 0, capacity)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedRing":
+        """opens a ring created by another (parent) process; only the creator unlinks it"""
+        try:
+            try:
+                memory = SharedMemory(name=name, track=False)
+            except TypeError:  # Python < 3.13; children share the resource tracker of the parent, so no harm
+                memory = SharedMemory(name=name)
+        except FileNotFoundError as ex:
+            raise SharedRingException(ex)
+        return cls(memory, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self):
+        """used bytes (records incl. length fields)"""
+        return self._counter(self._OFFSET_WRITE) - self._counter(self._OFFSET_READ)
+
+    def _counter(self, offset: int) -> int:
+        return self._COUNTER.unpack_from(self._buffer, offset)[0]
+
+    @property
+    def written(self) -> int:
+        """write counter (producer side)"""
+        return self._counter(self._OFFSET_WRITE)
+
+    @property
+    def read(self) -> int:
+        """read counter (consumer side)"""
+        return self._counter(self._OFFSET_READ)
+
+    def put(self, record: bytes, released: Optional[int] = None) -> bool:
+        """
+        producer side; returns False (and drops the record) if the ring is full
+        released: read counter of the consumer, handed over by a syscall
+        """
+        size = len(record)
+        if size > self.MAX_RECORD_SIZE:
+            raise SharedRingException("record too large ({} bytes)!".format(size))
+
+        write = self._counter(self._OFFSET_WRITE)
+        if released is None:
+            released = self._counter(self._OFFSET_READ)
+        if write + self._LENGTH.size + size - released > self._capacity:
+            self.count_overflows += 1
+            return False
+
+        write = self._copy_in(write, self._LENGTH.pack(size))
+        write = self._copy_in(write, record)
+        self._COUNTER.pack_into(self._buffer, self._OFFSET_WRITE, write)  # publish after the data
+        return True
+
+    def get(self, limit: Optional[int] = None) -> Optional[bytes]:
+        """
+        consumer side; returns None if the ring is empty
+        limit: write counter of the producer, handed over by a syscall; later records are left in the ring
+        """
+        read = self._counter(self._OFFSET_READ)
+        if limit is None:
+            limit = self._counter(self._OFFSET_WRITE)
+        if read >= limit:
+            return None
+
+        read, raw_size = self._copy_out(read, self._LENGTH.size)
+        read, record = self._copy_out(read, self._LENGTH.unpack(raw_size)[0])
+        self._COUNTER.pack_into(self._buffer, self._OFFSET_READ, read)  # release after the data
+        return record
+
+    def _copy_in(self, counter: int, data: bytes) -> int:
+        position = counter % self._capacity
+        first = min(len(data), self._capacity - position)
+        start = self._OFFSET_DATA + position
+        self._buffer[start:start + first] = data[:first]
+        if first < len(data):
+            self._buffer[self._OFFSET_DATA:self._OFFSET_DATA + len(data) - first] = data[first:]
+        return counter + len(data)
+
+    def _copy_out(self, counter: int, size: int):
+        position = counter % self._capacity
+        first = min(size, self._capacity - position)
+        start = self._OFFSET_DATA + position
+        data = bytes(self._buffer[start:start + first])
+        if first < size:
+            data += bytes(self._buffer[self._OFFSET_DATA:self._OFFSET_DATA + size - first])
+        return counter + size, data
+
+    def close(self):
+        """detach; the creator removes the shared memory block too"""
+        if self._memory is None:
+            return
+        self._buffer = None
+        self._memory.close()
+        if self._owner:
+            try:
+                self._memory.unlink()
+            except FileNotFoundError:
+                pass
+        self._memory = None
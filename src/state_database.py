@@ -0,0 +1,112 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+from src.storage_codec import JsonStorageCodec, StorageCodecs, StorageCodecException
+
+
+_logger = logging.getLogger(__name__)
+
+
+class StateDatabaseException(Exception):
+    pass
+
+
+class StateDatabase:
+    """
+    One SQLite file (WAL mode) for the state of all devices, instead of one YAML file per device.
+    The state is organized by namespaces (a namespace per storage, see `Storage`). All rows are read at once
+    when the database gets opened; the storages write their changed keys only.
+
+    The values are stored as JSON text; datetimes as {"$datetime": "<iso format>"} (see `JsonStorageCodec`).
+    """
+
+    _codec = JsonStorageCodec()
+
+    def __init__(self, file: str):
+        self._file = file
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # used by the main loop and the storage writer thread
+        self._namespaces: Dict[str, Dict[str, object]] = {}
+
+    def open(self):
+        try:
+            directory = os.path.dirname(self._file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._connection = sqlite3.connect(self._file, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS state (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._bulk_load()
+        except (sqlite3.Error, OSError) as ex:
+            raise StateDatabaseException(ex)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _bulk_load(self):
+        namespaces = {}
+        for namespace, key, value in self._connection.execute("SELECT namespace, key, value FROM state"):
+            try:
+                namespaces.setdefault(namespace, {})[key] = self._codec.load_value(value)
+            except StorageCodecException as ex:
+                _logger.warning("state database: cannot read '%s' of '%s' (%s)!", key, namespace, ex)
+        self._namespaces = namespaces
+        _logger.debug("state database: %d namespaces loaded.", len(namespaces))
+
+    def load(self, namespace: str) -> Optional[Dict[str, object]]:
+        """returns None if the namespace is unknown"""
+        data = self._namespaces.get(namespace)
+        return dict(data) if data is not None else None
+
+    def write(self, namespace: str, changed: Dict[str, object], deleted: Iterable[str] = ()):
+        with self._lock:
+            if self._connection is None:
+                raise StateDatabaseException("state database is not open!")
+            try:
+                rows = [(namespace, key, self._codec.dump_value(value)) for key, value in changed.items()]
+            except StorageCodecException as ex:
+                raise StateDatabaseException(ex)
+            try:
+                with self._connection:
+                    self._connection.execute("BEGIN")
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO state (namespace, key, value) VALUES (?, ?, ?)", rows
+                    )
+                    self._connection.executemany(
+                        "DELETE FROM state WHERE namespace = ? AND key = ?", [(namespace, key) for key in deleted]
+                    )
+            except sqlite3.Error as ex:
+                raise StateDatabaseException(ex)
+
+            data = self._namespaces.setdefault(namespace, {})
+            data.update(changed)
+            for key in deleted:
+                data.pop(key, None)
+
+    def import_file(self, namespace: str, file: str) -> Optional[Dict[str, object]]:
+        """
+        migrates a former storage file (any storage codec) into JSON values; returns the imported data or None if
+        there is no file
+        """
+        if not os.path.isfile(file):
+            return None
+        try:
+            with open(file, 'rb') as stream:
+                data = StorageCodecs.for_file(file).loads(stream.read()) or {}
+        except (PermissionError, StorageCodecException) as ex:
+            raise StateDatabaseException(ex)
+
+        self.write(namespace, data)
+        _logger.info("state database: storage file '%s' imported.", file)
+        return dict(data)
@@ -1,57 +1,363 @@
+import logging
 import os
-import yaml
+import threading
+from typing import Dict, Optional, Set
+
+from src.state_database import StateDatabase, StateDatabaseException
+from src.storage_codec import StorageCodec, StorageCodecs, StorageCodecException
 
 
 CONFKEY_STORAGE_FILE = "storage_file"
 CONFKEY_STORAGE_MAX_AGE_SECS = "storage_max_age_secs"  # former: "restore_last_max_diff"
 
 
+_logger = logging.getLogger(__name__)
+
+
 class StorageException(Exception):
     pass
 
 
 class Storage:
+    """
+    Key value store, persisted as file. The format depends on the file extension (YAML, JSON or a compact binary
+    format, see `StorageCodecs`). If a `StorageWriter` is set (see `set_writer`), `save` only marks the
+    storage as dirty and the file gets written in background (write-behind).
+
+    If a `StateDatabase` is set (see `set_database`), the data is kept there instead (the file path is used as
+    namespace); an existing file gets imported on first load.
+
+    The whole file gets replaced atomically (temporary file + rename). In journal mode (see `set_journal`) each write
+    only appends a record with the changes to "<file>.journal", which is merged into the file from time to time.
+    The journal gets replayed on load. Journal mode always writes with fsync (file and directory).
+    """
+
+    JOURNAL_SUFFIX = ".journal"
+    JOURNAL_COMPACT_RECORDS = 200  # the journal gets merged into the file after this number of records
+    TEMP_SUFFIX = ".tmp"
+
+    _JOURNAL_SET = "set"
+    _JOURNAL_DELETE = "delete"
+
+    _writer = None  # type: Optional[StorageWriter]
+    _database = None  # type: Optional[StateDatabase]
+    _journal = False
 
     def __init__(self):
         self._file = None
+        self._codec: StorageCodec = StorageCodecs.DEFAULT
         self._data = {}
         self._checked_path_exists = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        # changes since the last write, used for the journal and the incremental updates of the state database
+        self._changed_keys: Set[str] = set()
+        self._deleted_keys: Set[str] = set()
+        self._journal_records = 0
+
+    @classmethod
+    def set_writer(cls, writer):
+        """None: write synchronously within `save`"""
+        cls._writer = writer
+
+    @classmethod
+    def set_journal(cls, enabled: bool):
+        cls._journal = enabled
+
+    @classmethod
+    def set_database(cls, database: Optional[StateDatabase]):
+        """None: one file per storage"""
+        cls._database = database
 
     def set_file(self, file):
         self._file = file
+        if file is not None:
+            self._codec = StorageCodecs.for_file(file)
 
     def empty(self):
-        self._data = {}
+        with self._lock:
+            self._deleted_keys.update(self._data.keys())
+            self._changed_keys.clear()
+            self._data = {}
 
     def load(self):
+        if self._database is not None and self._file is not None:
+            self._load_from_database(self._database)
+            return
+
         try:
+            data = None
             if self._file is not None and os.path.isfile(self._file):
-                with open(self._file, 'r') as stream:
-                    self._data = yaml.unsafe_load(stream)
+                with open(self._file, 'rb') as stream:
+                    data = self._codec.loads(stream.read())
+            if self._file is not None and os.path.isfile(self._journal_file):
+                data = self._replay_journal(data or {})
+
+            if data is not None:
+                with self._lock:
+                    self._data = data
+                    self._changed_keys.clear()
+                    self._deleted_keys.clear()
+                    self._dirty = False
             else:
                 self.empty()
-        except (PermissionError, ValueError) as ex:
+        except (PermissionError, StorageCodecException) as ex:
             raise StorageException(ex)
 
+    @property
+    def _journal_file(self):
+        return self._file + self.JOURNAL_SUFFIX
+
+    def _replay_journal(self, data: Dict) -> Dict:
+        """apply the journal records; a broken record (power loss while appending) ends the replay"""
+        count = 0
+        with open(self._journal_file, 'rb') as stream:
+            raw = stream.read()
+        for record in self._codec.load_records(raw):
+            try:
+                data.update(record.get(self._JOURNAL_SET, {}))
+                for key in record.get(self._JOURNAL_DELETE, []):
+                    data.pop(key, None)
+            except (AttributeError, TypeError, ValueError):
+                _logger.warning("storage journal '%s': broken record ignored.", self._journal_file)
+                break
+            count += 1
+
+        self._journal_records = count
+        return data
+
+    def _load_from_database(self, database: StateDatabase):
+        try:
+            data = database.load(self._file)
+            if data is None:
+                data = database.import_file(self._file, self._file)
+        except StateDatabaseException as ex:
+            raise StorageException(ex)
+
+        with self._lock:
+            self._data = data or {}
+            self._changed_keys.clear()
+            self._deleted_keys.clear()
+            self._dirty = False
+
     def save(self):
-        if self._file is not None:
+        if self._file is None:
+            return
 
-            if not self._checked_path_exists:
-                self._checked_path_exists = True
-                os.makedirs(os.path.dirname(self._file), exist_ok=True)
+        writer = self._writer
+        if writer is not None:
+            with self._lock:
+                self._dirty = True
+            writer.mark_dirty(self)
+        else:
+            self._write(fsync=False)
 
-            try:
-                # backup and write to a new file to avoid flashing the same sdcards bits again and again?
-                with open(self._file, 'w') as stream:
-                    yaml.dump(self._data, stream, default_flow_style=False)
-            except PermissionError as ex:
-                raise StorageException(ex)
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def flush(self, fsync=False):
+        """write the file, if there are unsaved changes"""
+        if self._dirty:
+            self._write(fsync)
+
+    def _write(self, fsync: bool):
+        if self._file is None:
+            return
+        if self._database is not None:
+            self._write_to_database(self._database)
+            return
+
+        if not self._checked_path_exists:
+            self._checked_path_exists = True
+            os.makedirs(os.path.dirname(self._file), exist_ok=True)
+
+        if self._journal:
+            fsync = True  # a journal is pointless, if a power loss may lose or reorder its records
+        if self._journal and self._journal_records < self.JOURNAL_COMPACT_RECORDS:
+            self._append_journal(fsync)
+        else:
+            self._write_snapshot(fsync)
+
+    def _write_snapshot(self, fsync: bool):
+        """
+        write the whole data to a temporary file, which replaces the file atomically; the journal becomes obsolete
+
+        An existing journal gets the pending changes appended first, so journal + old file and the new file contain
+        the same data. Replaying the journal over the new file (power loss before the journal is removed) changes
+        nothing then.
+        """
+        with self._lock:
+            data = dict(self._data)  # values are not modified in place, a shallow copy is sufficient
+            record = self._take_journal_record()
+
+        temp_file = self._file + self.TEMP_SUFFIX
+        try:
+            if record and os.path.exists(self._journal_file):
+                self._write_journal_record(record, fsync)
+
+            raw = self._codec.dumps(data)
+            with open(temp_file, 'wb') as stream:
+                stream.write(raw)
+                if fsync:
+                    stream.flush()
+                    os.fsync(stream.fileno())
+            os.replace(temp_file, self._file)
+            if fsync:
+                self._fsync_directory()  # the rename itself; a power loss leaves either the old or the new file
+
+            if os.path.exists(self._journal_file):
+                os.remove(self._journal_file)
+                if fsync:
+                    self._fsync_directory()
+            self._journal_records = 0
+        except (PermissionError, OSError, StorageCodecException) as ex:
+            self._restore_journal_record(record)
+            raise StorageException(ex)
+
+    def _take_journal_record(self) -> Dict:
+        """the changes since the last write (to be called with lock)"""
+        record = {}
+        if self._changed_keys:
+            record[self._JOURNAL_SET] = {key: self._data[key] for key in self._changed_keys}
+        if self._deleted_keys:
+            record[self._JOURNAL_DELETE] = sorted(self._deleted_keys)
+        self._changed_keys = set()
+        self._deleted_keys = set()
+        self._dirty = False
+        return record
+
+    def _append_journal(self, fsync: bool):
+        """append one small record with the changes since the last write"""
+        with self._lock:
+            record = self._take_journal_record()
+
+        if not record:
+            return
+
+        try:
+            self._write_journal_record(record, fsync)
+        except (PermissionError, OSError, StorageCodecException) as ex:
+            self._restore_journal_record(record)
+            raise StorageException(ex)
+
+    def _restore_journal_record(self, record: Dict):
+        """marks the changes of a failed write as pending again"""
+        with self._lock:
+            self._changed_keys.update(k for k in record.get(self._JOURNAL_SET, {}) if k in self._data)
+            self._deleted_keys.update(k for k in record.get(self._JOURNAL_DELETE, []) if k not in self._data)
+            self._dirty = True  # try again with next flush
+
+    def _write_journal_record(self, record: Dict, fsync: bool):
+        raw = self._codec.dump_record(record)
+        created = not os.path.exists(self._journal_file)
+        with open(self._journal_file, 'ab') as stream:
+            stream.write(raw)
+            if fsync:
+                stream.flush()
+                os.fsync(stream.fileno())
+        if fsync and created:
+            self._fsync_directory()
+        self._journal_records += 1
+
+    def _fsync_directory(self):
+        """makes renames, creations and removals within the directory of the file durable"""
+        directory = os.open(os.path.dirname(os.path.abspath(self._file)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+    def _write_to_database(self, database: StateDatabase):
+        with self._lock:
+            changed = {key: self._data[key] for key in self._changed_keys}
+            deleted = self._deleted_keys
+            self._changed_keys = set()
+            self._deleted_keys = set()
+            self._dirty = False
+
+        try:
+            database.write(self._file, changed, deleted)
+        except StateDatabaseException as ex:
+            with self._lock:
+                self._changed_keys.update(k for k in changed if k in self._data)
+                self._deleted_keys.update(k for k in deleted if k not in self._data)
+                self._dirty = True  # try again with next flush
+            raise StorageException(ex)
 
     def get(self, key, default=None):
         return self._data.get(key, default)
 
     def set(self, key, value):
-        self._data[key] = value
+        with self._lock:
+            self._data[key] = value
+            self._changed_keys.add(key)
+            self._deleted_keys.discard(key)
 
     def delete(self, key):
-        self._data.pop(key, None)
+        with self._lock:
+            if key in self._data:
+                del self._data[key]
+                self._deleted_keys.add(key)
+            self._changed_keys.discard(key)
+
+
+class StorageWriter:
+    """
+    Writes dirty storages in background, so many updates get coalesced into one write and the main loop doesn't block
+    on file I/O. All pending changes get written on `close`.
+    """
+
+    DEFAULT_INTERVAL = 10.0  # in seconds
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, fsync=False):
+        self._interval = interval
+        self._fsync = fsync
+
+        self._dirty: Set[Storage] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._count_marked = 0
+        self._count_written = 0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """stop the background thread and write all pending changes"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._dirty:
+            _logger.error("storage writer: %d storages could not be written - changes are lost!", len(self._dirty))
+        _logger.debug("storage writer: %d saves coalesced into %d writes.", self._count_marked, self._count_written)
+
+    def mark_dirty(self, storage: Storage):
+        with self._lock:
+            self._dirty.add(storage)
+            self._count_marked += 1
+
+    def flush(self):
+        with self._lock:
+            storages = self._dirty
+            self._dirty = set()
+
+        for storage in storages:
+            try:
+                storage.flush(fsync=self._fsync)
+                self._count_written += 1
+            except StorageException as ex:
+                _logger.error("cannot write storage file (%s)!", ex)
+                with self._lock:
+                    self._dirty.add(storage)  # try again with next flush
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.flush()
@@ -0,0 +1,289 @@
+import abc
+import datetime
+import json
+import os
+import struct
+from typing import Dict, Iterator, List
+
+import yaml
+
+
+class StorageCodecException(Exception):
+    pass
+
+
+class StorageCodec(abc.ABC):
+    """
+    Serialization of the storage data (a dict with simple values and datetimes) and of the journal records.
+    A broken journal record (power loss while appending) ends the record iteration.
+    """
+
+    EXTENSIONS: List[str] = []
+
+    @abc.abstractmethod
+    def dumps(self, data: Dict) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, raw: bytes) -> Dict:
+        """raises StorageCodecException"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def dump_record(self, record: Dict) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load_records(self, raw: bytes) -> Iterator[Dict]:
+        raise NotImplementedError
+
+
+class _LineRecordsCodec(StorageCodec):
+    """text formats, one journal record per line"""
+
+    def dump_record(self, record: Dict) -> bytes:
+        return self._dump_line(record).replace("\n", " ").rstrip().encode() + b"\n"
+
+    def load_records(self, raw: bytes) -> Iterator[Dict]:
+        for line in raw.splitlines():
+            if not line.endswith(b"}"):
+                return  # incomplete
+            try:
+                record = self.loads(line)
+            except StorageCodecException:
+                return
+            if not isinstance(record, dict):
+                return
+            yield record
+
+    @abc.abstractmethod
+    def _dump_line(self, record: Dict) -> str:
+        raise NotImplementedError
+
+
+class YamlStorageCodec(_LineRecordsCodec):
+    """backwards compatible; uses libyaml if available and the safe loader (timestamps are supported by YAML)"""
+
+    EXTENSIONS = [".yaml", ".yml"]
+
+    _Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    _Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+    def dumps(self, data: Dict) -> bytes:
+        return yaml.dump(data, Dumper=self._Dumper, default_flow_style=False).encode()
+
+    def loads(self, raw: bytes) -> Dict:
+        try:
+            return yaml.load(raw, Loader=self._Loader)
+        except (yaml.YAMLError, ValueError) as ex:
+            raise StorageCodecException(ex)
+
+    def _dump_line(self, record: Dict) -> str:
+        return yaml.dump(record, Dumper=self._Dumper, default_flow_style=True, width=1 << 30)
+
+
+class JsonStorageCodec(_LineRecordsCodec):
+    """datetimes are stored explicitly as {"$datetime": "<iso format>"}"""
+
+    EXTENSIONS = [".json"]
+
+    DATETIME_KEY = "$datetime"
+
+    def dumps(self, data: Dict) -> bytes:
+        return json.dumps(data, default=self._encode_default, indent=2, sort_keys=True).encode()
+
+    def loads(self, raw: bytes) -> Dict:
+        try:
+            return json.loads(raw, object_hook=self._decode_object)
+        except ValueError as ex:
+            raise StorageCodecException(ex)
+
+    def _dump_line(self, record: Dict) -> str:
+        return json.dumps(record, default=self._encode_default, separators=(",", ":"))
+
+    def dump_value(self, value) -> str:
+        """a single value (compact), e.g. for a database column"""
+        try:
+            return json.dumps(value, default=self._encode_default, separators=(",", ":"))
+        except (TypeError, ValueError) as ex:
+            raise StorageCodecException(ex)
+
+    def load_value(self, raw: str):
+        try:
+            return json.loads(raw, object_hook=self._decode_object)
+        except ValueError as ex:
+            raise StorageCodecException(ex)
+
+    @classmethod
+    def _encode_default(cls, value):
+        if isinstance(value, datetime.datetime):
+            return {cls.DATETIME_KEY: value.isoformat()}
+        raise TypeError("type {} is not supported!".format(type(value)))
+
+    @classmethod
+    def _decode_object(cls, obj):
+        if len(obj) == 1 and cls.DATETIME_KEY in obj:
+            return datetime.datetime.fromisoformat(obj[cls.DATETIME_KEY])
+        return obj
+
+
+class BinaryStorageCodec(StorageCodec):
+    """
+    Compact binary format of its own: one type byte per value, big endian numbers, length prefixed strings,
+    datetimes as ISO strings. Journal records are length prefixed.
+    """
+
+    EXTENSIONS = [".bin"]
+
+    MAGIC = b"EMS1"
+
+    _NONE = b"N"
+    _TRUE = b"T"
+    _FALSE = b"F"
+    _INT = b"i"
+    _BIG_INT = b"I"
+    _FLOAT = b"f"
+    _STR = b"s"
+    _DATETIME = b"d"
+    _LIST = b"l"
+    _MAP = b"m"
+
+    _LEN = struct.Struct(">I")
+    _INT64 = struct.Struct(">q")
+    _FLOAT64 = struct.Struct(">d")
+
+    # corrupt data: e.g. TypeError for unhashable map keys, RecursionError for deep nesting
+    _DECODE_ERRORS = (struct.error, IndexError, ValueError, UnicodeDecodeError, TypeError, RecursionError)
+
+    def dumps(self, data: Dict) -> bytes:
+        parts = [self.MAGIC]
+        self._encode(data, parts)
+        return b"".join(parts)
+
+    def loads(self, raw: bytes) -> Dict:
+        if not raw.startswith(self.MAGIC):
+            raise StorageCodecException("no binary storage data (magic number missing)!")
+        try:
+            value, pos = self._decode(raw, len(self.MAGIC))
+        except self._DECODE_ERRORS as ex:
+            raise StorageCodecException(ex)
+        if pos != len(raw):
+            raise StorageCodecException("unexpected data at the end!")
+        return value
+
+    def dump_record(self, record: Dict) -> bytes:
+        parts = []
+        self._encode(record, parts)
+        payload = b"".join(parts)
+        return self._LEN.pack(len(payload)) + payload
+
+    def load_records(self, raw: bytes) -> Iterator[Dict]:
+        pos = 0
+        while pos + self._LEN.size <= len(raw):
+            size, = self._LEN.unpack_from(raw, pos)
+            pos += self._LEN.size
+            if pos + size > len(raw):
+                return  # incomplete
+            try:
+                record, end = self._decode(raw, pos)
+            except self._DECODE_ERRORS:
+                return
+            if end != pos + size or not isinstance(record, dict):
+                return
+            pos = end
+            yield record
+
+    def _encode(self, value, parts: List[bytes]):
+        if value is None:
+            parts.append(self._NONE)
+        elif value is True:
+            parts.append(self._TRUE)
+        elif value is False:
+            parts.append(self._FALSE)
+        elif isinstance(value, int):
+            if -(1 << 63) <= value < (1 << 63):
+                parts.append(self._INT + self._INT64.pack(value))
+            else:
+                self._encode_text(self._BIG_INT, str(value), parts)
+        elif isinstance(value, float):
+            parts.append(self._FLOAT + self._FLOAT64.pack(value))
+        elif isinstance(value, str):
+            self._encode_text(self._STR, value, parts)
+        elif isinstance(value, datetime.datetime):
+            self._encode_text(self._DATETIME, value.isoformat(), parts)
+        elif isinstance(value, (list, tuple)):
+            parts.append(self._LIST + self._LEN.pack(len(value)))
+            for item in value:
+                self._encode(item, parts)
+        elif isinstance(value, dict):
+            parts.append(self._MAP + self._LEN.pack(len(value)))
+            for key, item in value.items():
+                self._encode(key, parts)
+                self._encode(item, parts)
+        else:
+            raise StorageCodecException("type {} is not supported!".format(type(value)))
+
+    def _encode_text(self, type_code: bytes, text: str, parts: List[bytes]):
+        encoded = text.encode()
+        parts.append(type_code + self._LEN.pack(len(encoded)) + encoded)
+
+    def _decode(self, raw: bytes, pos: int):
+        type_code = raw[pos:pos + 1]
+        pos += 1
+
+        if type_code == self._NONE:
+            return None, pos
+        if type_code == self._TRUE:
+            return True, pos
+        if type_code == self._FALSE:
+            return False, pos
+        if type_code == self._INT:
+            return self._INT64.unpack_from(raw, pos)[0], pos + self._INT64.size
+        if type_code == self._FLOAT:
+            return self._FLOAT64.unpack_from(raw, pos)[0], pos + self._FLOAT64.size
+        if type_code in (self._STR, self._BIG_INT, self._DATETIME):
+            size, = self._LEN.unpack_from(raw, pos)
+            pos += self._LEN.size
+            if pos + size > len(raw):
+                raise ValueError("string exceeds data!")
+            text = raw[pos:pos + size].decode()
+            pos += size
+            if type_code == self._BIG_INT:
+                return int(text), pos
+            if type_code == self._DATETIME:
+                return datetime.datetime.fromisoformat(text), pos
+            return text, pos
+        if type_code == self._LIST:
+            count, = self._LEN.unpack_from(raw, pos)
+            pos += self._LEN.size
+            items = []
+            for _ in range(count):
+                item, pos = self._decode(raw, pos)
+                items.append(item)
+            return items, pos
+        if type_code == self._MAP:
+            count, = self._LEN.unpack_from(raw, pos)
+            pos += self._LEN.size
+            data = {}
+            for _ in range(count):
+                key, pos = self._decode(raw, pos)
+                data[key], pos = self._decode(raw, pos)
+            return data, pos
+
+        raise ValueError("unknown type code ({})!".format(type_code))
+
+
+class StorageCodecs:
+
+    DEFAULT = YamlStorageCodec()
+
+    _CODECS = [DEFAULT, JsonStorageCodec(), BinaryStorageCodec()]
+
+    @classmethod
+    def for_file(cls, file: str) -> StorageCodec:
+        """chosen by extension; YAML for unknown extensions"""
+        extension = os.path.splitext(file)[1].lower()
+        for codec in cls._CODECS:
+            if extension in codec.EXTENSIONS:
+                return codec
+        return cls.DEFAULT
@@ -0,0 +1,148 @@
+import threading
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from enocean.protocol.constants import RORG
+from enocean.protocol.packet import Packet, RadioPacket
+
+from src.common.eep import Eep
+
+
+# one bit field of an EEP profile; `in_status` selects the status byte instead of the data bytes;
+# `valid_ranges` ((start, end), ...) of enums, the library fails for other values
+EepField = namedtuple("EepField", ["shortcut", "offset", "size", "in_status", "valid_ranges"])
+
+
+class CompiledEepDecoder:
+    """
+    Bit field table of one EEP profile, extracted once from the XML definitions of the enocean library.
+    Decodes the raw values of a packet with plain integer operations.
+    """
+
+    STATUS_BITS = 8
+
+    def __init__(self, fields: List[EepField]):
+        self._fields = fields
+        self._shortcuts = [field.shortcut for field in fields]
+
+    @property
+    def fields(self) -> List[EepField]:
+        return self._fields
+
+    def can_decode(self, packet: RadioPacket) -> bool:
+        """the library path is used otherwise (e.g. shorter packets), to keep its behaviour (errors)"""
+        return self.can_decode_data(packet.rorg, packet.data)
+
+    def can_decode_data(self, rorg: int, data) -> bool:
+        """like `can_decode`, for the raw radio data (ERP1, incl. RORG, sender and status)"""
+        if rorg == RORG.VLD:
+            return False  # status is located in the optional data
+        data_bits = max(0, len(data) - 6) * 8
+        for field in self._fields:
+            bits = self.STATUS_BITS if field.in_status else data_bits
+            if field.offset + field.size > bits:
+                return False
+        return True
+
+    def decode(self, packet: RadioPacket) -> Optional[Dict[str, int]]:
+        """returns None for values, which are not defined by the profile"""
+        values = self.decode_values(packet.data, packet.status)
+        return None if values is None else self.to_props(values)
+
+    def decode_values(self, data, status: int) -> Optional[List[int]]:
+        """raw values in the order of `fields`; None for values, which are not defined by the profile"""
+        data_bits = (len(data) - 6) * 8
+        payload = int.from_bytes(bytes(data[1:len(data) - 5]), "big")
+
+        values = []
+        for field in self._fields:
+            if field.in_status:
+                value, bits = status, self.STATUS_BITS
+            else:
+                value, bits = payload, data_bits
+            raw_value = (value >> (bits - field.offset - field.size)) & ((1 << field.size) - 1)
+            if field.valid_ranges is not None and not any(s <= raw_value <= e for s, e in field.valid_ranges):
+                return None
+            values.append(raw_value)
+        return values
+
+    def to_props(self, values: List[int]) -> Dict[str, int]:
+        """props of the values of `decode_values`"""
+        return dict(zip(self._shortcuts, values))
+
+
+class EepDecoders:
+    """
+    Registry of compiled EEP decoders. `Packet.parse_eep` walks the XML definitions (BeautifulSoup) for each call; the
+    decoders get generated once per EEP (on first use) and return the same raw values. Unknown profiles and packets,
+    which cannot be decoded by the bit field table, are decoded by the library.
+    """
+
+    _decoders: Dict[Tuple, Optional[CompiledEepDecoder]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_decoder(cls, eep: Eep) -> Optional[CompiledEepDecoder]:
+        """returns None for unknown profiles"""
+        key = (eep.rorg, eep.func, eep.type, eep.direction, eep.command)
+        try:
+            return cls._decoders[key]
+        except KeyError:
+            pass
+
+        with cls._lock:
+            if key not in cls._decoders:
+                cls._decoders[key] = cls._compile(eep)
+            return cls._decoders[key]
+
+    @classmethod
+    def _compile(cls, eep: Eep) -> Optional[CompiledEepDecoder]:
+        library = Packet.eep
+        if not library.init_ok:
+            return None
+        profiles = library.telegrams.get(eep.rorg, {}).get(eep.func, {})
+        if eep.type not in profiles:
+            return None  # let the library log its warnings
+
+        profile = library.find_profile(None, eep.rorg, eep.func, eep.type, eep.direction, eep.command)
+        if profile is None:
+            return None
+
+        fields = []
+        for source in profile.contents:
+            if source.name not in ["value", "enum", "status"]:
+                continue
+
+            valid_ranges = None
+            if source.name == "value":
+                if source.find("range") is None or source.find("scale") is None:
+                    return None  # incomplete definition, the library fails
+            elif source.name == "enum":
+                valid_ranges = tuple(
+                    [(int(i["value"]), int(i["value"])) for i in source.find_all("item")] +
+                    [(int(i.get("start", -1)), int(i.get("end", -1))) for i in source.find_all("rangeitem")]
+                )
+
+            fields.append(EepField(
+                shortcut=source["shortcut"],
+                offset=int(source["offset"]),
+                size=int(source["size"]),
+                in_status=source.name == "status",
+                valid_ranges=valid_ranges,
+            ))
+
+        # duplicated shortcuts: the last one wins (like the `OrderedDict` of the library)
+        return CompiledEepDecoder(fields)
+
+    @classmethod
+    def decode(cls, packet: RadioPacket, eep: Eep) -> Optional[Dict[str, int]]:
+        """returns None if the packet has to be decoded by the library (unknown profile or invalid values)"""
+        decoder = cls.get_decoder(eep)
+        if decoder is None or not decoder.can_decode(packet):
+            return None
+        return decoder.decode(packet)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._decoders = {}
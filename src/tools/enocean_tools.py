@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Tuple
 
 from enocean.protocol.constants import PACKET
 from enocean.protocol.packet import RadioPacket
@@ -6,11 +6,16 @@ from enocean.protocol.packet import RadioPacket
 from src.common.eep import Eep
 from src.common.device_exception import DeviceException
 from src.tools.converter import Converter
+from src.tools.eep_decoder import EepDecoders
 from src.tools.pickle_tools import PickleTools
 
 
 class EnoceanTools:
 
+    # the decoded props are cached within the packet instance, so an EEP gets decoded only once per telegram,
+    # no matter how many devices get the packet
+    _PROPS_CACHE_ATTR = "_decoded_props_cache"
+
     @classmethod
     def int_to_byte_list(cls, value: int):
         result = []
@@ -24,6 +29,36 @@ class EnoceanTools:
         if packet.packet_type != PACKET.RADIO:
             raise DeviceException("no radio paket ({})!".format(cls.packet_type_to_string(packet.packet_type)))
 
+        cache = getattr(packet, cls._PROPS_CACHE_ATTR, None)
+        if cache is None:
+            cache = {}
+            setattr(packet, cls._PROPS_CACHE_ATTR, cache)
+
+        key = cls.eep_key(eep)
+        data = cache.get(key)
+        if data is None:
+            data = EepDecoders.decode(packet, eep)  # doesn't update `packet.parsed`
+            if data is None:
+                data = cls._extract_props_by_library(packet, eep)
+            cache[key] = data
+
+        return dict(data)  # callers may modify their copy
+
+    @classmethod
+    def eep_key(cls, eep: Eep) -> Tuple:
+        return eep.rorg, eep.func, eep.type, eep.direction, eep.command
+
+    @classmethod
+    def set_decoded_props(cls, packet: RadioPacket, decoded_props: Dict[Tuple, Dict[str, object]]):
+        """fills the props cache of `extract_props` with props decoded elsewhere (by a worker process)"""
+        cache = getattr(packet, cls._PROPS_CACHE_ATTR, None)
+        if cache is None:
+            cache = {}
+            setattr(packet, cls._PROPS_CACHE_ATTR, cache)
+        cache.update(decoded_props)
+
+    @classmethod
+    def _extract_props_by_library(cls, packet: RadioPacket, eep: Eep) -> Dict[str, object]:
         data = {}
         props = packet.parse_eep(
             rorg_func=eep.func,
@@ -0,0 +1,57 @@
+"""
+Compares the telegrams per second of the compiled EEP decoders with the XML driven decoding of the enocean library.
+
+    python -m test.benchmark.benchmark_eep_decoders
+"""
+import logging
+import time
+import warnings
+
+from src.device.eltako_fud61.fud61_eep import Fud61Action, Fud61Command, Fud61Eep
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.tools.eep_decoder import EepDecoders
+from src.tools.enocean_tools import EnoceanTools
+from test.setup_test import SetupTest
+
+
+DURATION = 2.0  # seconds per run
+
+
+def _create_samples():
+    SetupTest.set_dummy_sender_id()
+
+    eep = Fud61Eep.EEP.clone()
+    eep.command = Fud61Command.DIMMING.value
+    _, dimmer_packet = Fud61Eep.create_props_and_packet(Fud61Action(command=Fud61Command.DIMMING, dim_state=33))
+    rocker_packet = RockerSwitchTools.create_packet(RockerAction(press=RockerPress.PRESS_SHORT, button=RockerButton.ROCK1))
+
+    return [
+        ("A5-38-08 (dimmer)", dimmer_packet, eep),
+        ("F6-02-02 (rocker)", rocker_packet, RockerSwitchTools.DEFAULT_EEP),
+    ]
+
+
+def _measure(decode_func, packet, eep) -> float:
+    count = 0
+    time_end = time.perf_counter() + DURATION
+    while time.perf_counter() < time_end:
+        for _ in range(100):
+            decode_func(packet, eep)
+        count += 100
+    return count / DURATION
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)
+
+    for name, packet, eep in _create_samples():
+        EepDecoders.get_decoder(eep)  # compile outside of the measurement
+        library = _measure(EnoceanTools._extract_props_by_library, packet, eep)
+        compiled = _measure(EepDecoders.decode, packet, eep)
+        print("{}: library {:10.0f} telegrams/s; compiled {:10.0f} telegrams/s; factor {:.1f}".format(
+            name, library, compiled, compiled / library))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Soak test of the Enocean dispatch (`Runner._process_enocean_messages`) with a catch-all listener (like the sniffer):
+per-packet cost and allocated memory over many rounds. "legacy" is the former dispatch, which extended the
+registered device lists with the catch-all listeners for every message, so both grew with the uptime.
+
+    python -m test.benchmark.benchmark_enocean_dispatch
+"""
+import signal
+import time
+import tracemalloc
+import warnings
+
+from src.device.base.device import Device
+from src.enocean_connector import EnoceanMessage
+from src.runner.runner import Runner
+
+
+ROUNDS = 10
+MESSAGES_PER_ROUND = 20000
+ACTOR_COUNT = 50
+
+
+class _NullDevice(Device):
+
+    def process_enocean_message(self, message: EnoceanMessage):
+        pass
+
+    def process_mqtt_message(self, message):
+        pass
+
+
+class _ListConnector:
+
+    def __init__(self):
+        self.messages = []
+
+    def get_messages(self):
+        return self.messages
+
+    def close(self):
+        pass
+
+
+def _legacy_dispatch(enocean_ids, messages):
+    for message in messages:
+        listener = enocean_ids.get(message.enocean_id) or []
+        if message.enocean_id is not None:
+            none_listener = enocean_ids.get(None)
+            if none_listener:
+                listener.extend(none_listener)
+        for device in listener:
+            device.process_enocean_message(message)
+
+
+def _create_runner() -> Runner:
+    runner = Runner()
+    runner._enocean_connectors = {Runner.DEFAULT_GATEWAY: _ListConnector()}
+    for index in range(ACTOR_COUNT):
+        runner._enocean_ids[0x05000000 + index] = [_NullDevice("actor{}".format(index))]
+    runner._enocean_ids[None] = [_NullDevice("sniffer")]
+    runner._build_enocean_dispatch()
+    return runner
+
+
+def _soak(name, dispatch):
+    # half of the senders are unknown (catch-all listener only)
+    messages = [EnoceanMessage(payload=None, enocean_id=0x05000000 + i % (ACTOR_COUNT * 2)) for i in range(MESSAGES_PER_ROUND)]
+
+    tracemalloc.start()
+    for index in range(ROUNDS):
+        time_start = time.perf_counter()
+        dispatch(messages)
+        duration = time.perf_counter() - time_start
+        memory, _ = tracemalloc.get_traced_memory()
+        print("{} round {:2d}: {:8.3f} us/packet; {:9.1f} KiB allocated".format(
+            name, index + 1, duration / len(messages) * 1e6, memory / 1024))
+    tracemalloc.stop()
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    signal_handlers = {s: signal.getsignal(s) for s in [signal.SIGINT, signal.SIGTERM]}
+
+    runner = _create_runner()
+
+    def dispatch(messages):
+        runner._enocean_connectors[Runner.DEFAULT_GATEWAY].messages = messages
+        runner._process_enocean_messages()
+
+    _soak("current", dispatch)
+
+    legacy_ids = {enocean_id: list(devices) for enocean_id, devices in _create_runner()._enocean_ids.items()}
+    _soak("legacy ", lambda messages: _legacy_dispatch(legacy_ids, messages))
+
+    for sig, handler in signal_handlers.items():
+        signal.signal(sig, handler)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Compares the receive path of the `SerialCommunicator` of the `enocean` package (byte lists, `Packet.parse_msg`, one
+packet object per telegram) with the `Esp3Framer`/`Esp3Communicator` path of the `EnoceanConnector`:
+framing only and captured telegrams replayed through a pty (serial port emulation, no baud rate limit).
+"Listened 10%" drops the telegrams of 90% of the senders within the framer (see `EnoceanConnector.set_listened_senders`).
+`ProcessEnoceanConnector` reads and frames within a worker process (shared memory ring to the main process).
+"Decoded" extracts the rocker props of each message like the devices do; the process connector decodes them within
+the worker already. "main CPU" is the CPU time of the main process (all its threads, without the worker).
+
+    python -m test.benchmark.benchmark_esp3_framer
+"""
+import os
+import pty
+import queue
+import threading
+import time
+import tty
+import warnings
+from typing import Tuple
+
+from enocean.communicators import SerialCommunicator
+from enocean.protocol.constants import PARSE_RESULT
+from enocean.protocol.packet import Packet
+
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.enocean_connector import EnoceanConnector
+from src.esp3_framer import Esp3Framer
+from src.process_enocean_connector import ProcessEnoceanConnector
+from src.tools.enocean_tools import EnoceanTools
+from test.setup_test import SetupTest
+
+
+TELEGRAM_COUNT = 5000
+SENDER_COUNT = 50
+TIMEOUT = 60  # in seconds
+
+
+def _create_stream() -> bytes:
+    chunks = []
+    for index in range(TELEGRAM_COUNT):
+        action = RockerAction(RockerPress.PRESS_SHORT if index % 2 else RockerPress.RELEASE, RockerButton.ROCK1)
+        packet = RockerSwitchTools.create_packet(action, sender=0x05000000 + index % SENDER_COUNT)
+        chunks.append(bytes(packet.build()))
+    return b"".join(chunks)
+
+
+def _measure_framing(stream: bytes):
+    time_start = time.perf_counter()
+    buffer = []
+    count = 0
+    for index in range(0, len(stream), 16):  # `SerialCommunicator` reads 16 bytes at once
+        buffer.extend(bytearray(stream[index:index + 16]))
+        while True:
+            status, buffer, packet = Packet.parse_msg(buffer)
+            if status == PARSE_RESULT.INCOMPLETE:
+                break
+            count += 1
+    legacy = time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    framer = Esp3Framer()
+    frames = []
+    for index in range(0, len(stream), 256):
+        frames.extend(framer.feed(stream[index:index + 256]))
+    framing = time.perf_counter() - time_start
+
+    print("framing only (legacy, incl. packet objects): {:5.1f} us/telegram ({} telegrams)".format(legacy / count * 1e6, count))
+    print("framing only (Esp3Framer):                 {:5.1f} us/telegram ({} telegrams)".format(framing / len(frames) * 1e6, len(frames)))
+
+
+def _replay(stream: bytes, open_port, receive) -> Tuple[float, float]:
+    """
+    writes the stream to a pty and returns the time until all telegrams were received and the CPU time of the main
+    process meanwhile; `receive` returns the total number of processed telegrams
+    """
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    port = os.ttyname(slave)
+
+    close_port = open_port(port)
+    try:
+        writer = threading.Thread(target=os.write, args=(master, stream), daemon=True)
+        time_start = time.perf_counter()
+        cpu_start = time.process_time()
+        writer.start()
+
+        count = 0
+        time_limit = time.monotonic() + TIMEOUT
+        while count < TELEGRAM_COUNT and time.monotonic() < time_limit:
+            count = receive()
+        duration = time.perf_counter() - time_start
+        cpu = time.process_time() - cpu_start
+        if count < TELEGRAM_COUNT:
+            print("timeout, only {} telegrams received!".format(count))
+        return duration, cpu
+    finally:
+        close_port()
+        os.close(master)
+        os.close(slave)
+
+
+def _replay_legacy(stream: bytes) -> Tuple[float, float]:
+    communicator = None
+    count = 0
+
+    def open_port(port):
+        nonlocal communicator
+        communicator = SerialCommunicator(port)
+        communicator.start()
+
+        def close_port():
+            communicator.stop()
+            communicator.join()
+        return close_port
+
+    def receive():
+        nonlocal count
+        try:
+            packet = communicator.receive.get(timeout=0.1)
+            if hasattr(packet, "sender_int"):
+                count += 1
+        except queue.Empty:
+            pass
+        return count
+
+    return _replay(stream, open_port, receive)
+
+
+def _replay_connector(stream: bytes, listened_senders, connector_class=EnoceanConnector, decode=False) -> Tuple[float, float]:
+    wakeup = threading.Event()
+    connector = None
+    count = 0
+    eep = RockerSwitchTools.DEFAULT_EEP
+
+    def open_port(port):
+        nonlocal connector
+        if connector_class is ProcessEnoceanConnector and decode:
+            connector = connector_class(port, {0x05000000 + i: [eep] for i in range(SENDER_COUNT)})
+        else:
+            connector = connector_class(port)
+        connector.set_wakeup(wakeup)
+        connector.set_listened_senders(listened_senders)
+        connector.open()
+        return connector.close
+
+    def receive():
+        wakeup.wait(0.1)
+        wakeup.clear()
+        stats = connector.receive_stats  # before `get_messages`, which drains all frames queued at call time
+        messages = connector.get_messages()
+        if decode:
+            for message in messages:
+                EnoceanTools.extract_props(message.payload, eep)
+        if connector_class is ProcessEnoceanConnector:
+            nonlocal count
+            count += len(messages)  # the statistics of the worker arrive periodically only
+            return count
+        return stats.received + stats.dropped
+
+    return _replay(stream, open_port, receive)
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    SetupTest.set_dummy_sender_id()
+    stream = _create_stream()
+
+    _measure_framing(stream)
+
+    for name, replay in [
+        ("legacy (SerialCommunicator)", _replay_legacy),
+        ("EnoceanConnector, all listened", lambda s: _replay_connector(s, None)),
+        ("EnoceanConnector, listened 10%", lambda s: _replay_connector(s, [0x05000000 + i for i in range(SENDER_COUNT // 10)])),
+        ("ProcessEnoceanConnector, all listened", lambda s: _replay_connector(s, None, ProcessEnoceanConnector)),
+        ("EnoceanConnector, all listened, decoded", lambda s: _replay_connector(s, None, decode=True)),
+        ("ProcessEnoceanConnector, all listened, decoded", lambda s: _replay_connector(s, None, ProcessEnoceanConnector, True)),
+    ]:
+        duration, cpu = replay(stream)
+        print("pty replay {}: {:6.3f}s ({:7.0f} telegrams/s, main CPU {:5.1f} us/telegram)".format(
+            name, duration, TELEGRAM_COUNT / duration, cpu / TELEGRAM_COUNT * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares the load and save costs of the storage codecs for the key sets of `Fsb61Storage` and `OpeningSensor`:
+encoding/decoding only and complete file writes/reads. "legacy" is the former pure Python `yaml.dump`/`yaml.unsafe_load`.
+
+    python -m test.benchmark.benchmark_storage_codecs
+"""
+import datetime
+import os
+import time
+import warnings
+
+import yaml
+
+from src.device.eltako_fsb61.fsb61_storage import StorageKey as Fsb61StorageKey
+from src.device.opening_sensor.opening_sensor import StorageKey as OpeningSensorStorageKey, StateValue
+from src.storage import Storage
+from src.storage_codec import StorageCodecs
+from test.setup_test import SetupTest
+
+
+DURATION = 1.0  # seconds per run
+
+EXTENSIONS = [".yaml", ".json", ".bin"]
+
+
+def _create_samples():
+    tz = datetime.timezone(datetime.timedelta(seconds=3600))
+    now = datetime.datetime(2024, 5, 17, 13, 7, 45, 123456, tzinfo=tz)
+
+    return [
+        ("Fsb61Storage", {
+            Fsb61StorageKey.VALUE.value: 37.5,
+            Fsb61StorageKey.TIME_SINCE.value: now,
+            Fsb61StorageKey.TIME_UPDATE.value: now,
+            Fsb61StorageKey.TIME_LAST_OBSERVATION.value: now,
+        }),
+        ("OpeningSensor", {
+            OpeningSensorStorageKey.VALUE_SUCCESS.value: StateValue.CLOSED.value,
+            OpeningSensorStorageKey.TIME_SUCCESS.value: now,
+            OpeningSensorStorageKey.VALUE_ERROR.value: StateValue.ERROR.value,
+            OpeningSensorStorageKey.TIME_ERROR.value: now,
+            OpeningSensorStorageKey.TIME_LAST_OBSERVATION.value: now,
+        }),
+    ]
+
+
+def _measure(func) -> float:
+    """returns microseconds per call"""
+    count = 0
+    time_start = time.perf_counter()
+    time_end = time_start + DURATION
+    while time.perf_counter() < time_end:
+        for _ in range(20):
+            func()
+        count += 20
+    return (time.perf_counter() - time_start) / count * 1e6
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    work_dir = SetupTest.ensure_clean_work_dir()
+
+    for name, data in _create_samples():
+        raw = yaml.dump(data, default_flow_style=False)
+        encode = _measure(lambda: yaml.dump(data, default_flow_style=False))
+        decode = _measure(lambda: yaml.unsafe_load(raw))
+        print("{} (legacy): encode {:7.1f} us; decode {:7.1f} us".format(name, encode, decode))
+
+        for extension in EXTENSIONS:
+            storage_path = os.path.join(work_dir, "benchmark_storage" + extension)
+            codec = StorageCodecs.for_file(storage_path)
+            raw = codec.dumps(data)
+            encode = _measure(lambda: codec.dumps(data))
+            decode = _measure(lambda: codec.loads(raw))
+
+            storage = Storage()
+            storage.set_file(storage_path)
+            for key, value in data.items():
+                storage.set(key, value)
+
+            save = _measure(storage.save)
+            load = _measure(storage.load)
+            size = os.path.getsize(storage_path)
+            print("{} ({}): encode {:7.1f} us; decode {:7.1f} us; file save {:7.1f} us; file load {:7.1f} us; {} bytes".format(
+                name, extension, encode, decode, save, load, size))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from src.device.base.rocker_actor import RockerSwitchAction, RockerActor
 from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
 from src.enocean_connector import EnoceanMessage
 from src.tools.enocean_tools import EnoceanTools
+from src.enocean_transmit_pacer import TransmitPriority
 
 
 class _MockDevice(RockerActor):
@@ -23,7 +24,7 @@ class _MockDevice(RockerActor):
     def _now(self):
         return self.now
 
-    def _send_enocean_packet(self, packet, delay=0):
+    def _send_enocean_packet(self, packet, delay=0, priority=TransmitPriority.COMMAND):
         self.packets.append(packet)
 
     def _publish_mqtt(self, payload: Union[str, Dict], mqtt_channel: str = None):
@@ -5,6 +5,7 @@ from typing import Dict, Union
 
 from paho.mqtt.client import MQTTMessage
 
+from src.command.shutter_command import ShutterCommandType
 from src.common.device_exception import DeviceException
 from src.device.eltako_fsb61.fsb61_actor import Fsb61Actor
 from src.device.eltako_fsb61 import fsb61_actor
@@ -12,6 +13,8 @@ from src.device.eltako_fsb61.fsb61_eep import Fsb61CommandConverter, Fsb61Comman
     Fsb61StateConverter
 from src.device.eltako_fsb61.fsb61_shutter_position import Fsb61ShutterPosition
 from src.enocean_connector import EnoceanMessage
+from src.enocean_send_scheduler import EnoceanSendScheduler
+from src.enocean_transmit_pacer import TransmitPriority
 from test.setup_test import SetupTest
 
 
@@ -73,7 +76,7 @@ class _MockFsb61Actor(Fsb61Actor):
     def _publish_mqtt(self, payload: Union[str, Dict], mqtt_channel: str = None):
         self.messages.append(payload)
 
-    def _send_enocean_packet(self, packet, delay=0):
+    def _send_enocean_packet(self, packet, delay=0, priority=TransmitPriority.COMMAND):
         self.packets.append(packet)
 
 
@@ -179,6 +182,40 @@ class TestFsb61Actor(unittest.TestCase):
         simulate_status_packet(Fsb61StateType.STOPPED)
         self.assertEqual(device.position, 0)
 
+    def test_merge_position_commands(self):
+        device = self.device
+        device._set_command_inbox_config({"command_merge": {"POSITION": 1.0}})
+
+        scheduler = EnoceanSendScheduler()
+        scheduler_time = 1000.0
+        scheduler._now = lambda: scheduler_time
+        device.set_send_scheduler(scheduler)
+
+        executed = []
+        device._execute_command = executed.append
+
+        def send_mqtt(payload: bytes):
+            message = MQTTMessage()
+            message.payload = payload
+            device.process_mqtt_message(message)
+
+        for value in [b"10", b"20", b"30"]:
+            send_mqtt(value)
+        self.assertEqual([c.value for c in executed], [10])
+
+        scheduler_time += 1.0
+        device.now = device.now + timedelta(seconds=1)
+        scheduler.send_due()
+        self.assertEqual([c.value for c in executed], [10, 30])
+
+        # STOP discards the pending position
+        send_mqtt(b"40")
+        send_mqtt(b"stop")
+        self.assertEqual(executed[2].type, ShutterCommandType.STOP)
+        scheduler_time += 1.0
+        scheduler.send_due()
+        self.assertEqual(len(executed), 3)
+
 
 class TestFsb61Validation(unittest.TestCase):
 
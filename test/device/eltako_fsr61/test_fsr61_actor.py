@@ -12,6 +12,8 @@ from src.device.eltako_fsr61.fsr61_actor import Fsr61Actor
 from src.device.eltako_fsr61.fsr61_eep import Fsr61Action, Fsr61Eep, Fsr61Command
 from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerButton, RockerPress
 from src.enocean_connector import EnoceanMessage
+from src.enocean_transmit_pacer import TransmitPriority
+from src.runner.poll_scheduler import PollScheduler
 from test.setup_test import SetupTest
 
 
@@ -33,7 +35,7 @@ class _MockDevice(Fsr61Actor):
     def _publish_mqtt(self, payload: Union[str, Dict], mqtt_channel: str = None):
         self.messages.append(payload)
 
-    def _send_enocean_packet(self, packet, delay=0):
+    def _send_enocean_packet(self, packet, delay=0, priority=TransmitPriority.COMMAND):
         self.packets.append(packet)
 
 
@@ -104,25 +106,26 @@ class TestFsr61Actor(unittest.TestCase):
             nonlocal last_command
             last_command = command
 
-        def check_check_cyclic_tasks(now: datetime) -> Optional[SwitchCommand]:
+        def check_poll_status(now: datetime) -> Optional[SwitchCommand]:
             nonlocal last_command
             last_command = None
             d.now = now
-            d.check_cyclic_tasks()
+            d.poll_status(skip_age)
             return last_command
 
         d._execute_actor_command = mock_execute_actor_command
 
+        skip_age = d.refresh_rate * PollScheduler.SKIP_FACTOR
         time_now = d.now
         self.assertEqual(d._last_status_request, None)
-        self.assertEqual(check_check_cyclic_tasks(time_now), SwitchCommand.UPDATE)
+        self.assertEqual(check_poll_status(time_now), SwitchCommand.UPDATE)
         self.assertEqual(d._last_status_request, time_now)
 
         time_before = time_now
-        time_now = time_before + timedelta(seconds=d.DEFAULT_REFRESH_RATE - 1)
-        self.assertEqual(check_check_cyclic_tasks(time_now), None)
+        time_now = time_before + timedelta(seconds=skip_age - 1)
+        self.assertEqual(check_poll_status(time_now), None)
         self.assertEqual(d._last_status_request, time_before)
 
-        time_now = time_now + timedelta(seconds=d.DEFAULT_REFRESH_RATE * 0.5)
-        self.assertEqual(check_check_cyclic_tasks(time_now), SwitchCommand.UPDATE)
+        time_now = time_now + timedelta(seconds=1)
+        self.assertEqual(check_poll_status(time_now), SwitchCommand.UPDATE)
         self.assertEqual(d._last_status_request, time_now)
@@ -6,11 +6,15 @@ from typing import Optional, Dict, Union
 from paho.mqtt.client import MQTTMessage
 
 from src.command.dimmer_command import DimmerCommandType, DimmerCommand
+from src.common.device_exception import DeviceException
 from src.common.switch_status import SwitchStatus
 from src.device.eltako_fud61.fud61_actor import Fud61Actor
 from src.device.eltako_fud61.fud61_eep import Fud61Action, Fud61Eep, Fud61Command
 from src.enocean_connector import EnoceanMessage
+from src.enocean_send_scheduler import EnoceanSendScheduler
 from src.tools.pickle_tools import PickleTools
+from src.enocean_transmit_pacer import TransmitPriority
+from src.runner.poll_scheduler import PollScheduler
 from test.setup_test import SetupTest
 
 PACKET_STATUS_ON_33 = """
@@ -45,7 +49,7 @@ class _MockDevice(Fud61Actor):
     def _publish_mqtt(self, payload: Union[str, Dict], mqtt_channel: str = None):
         self.messages.append(payload)
 
-    def _send_enocean_packet(self, packet, delay=0):
+    def _send_enocean_packet(self, packet, delay=0, priority=TransmitPriority.COMMAND):
         self.packets.append(packet)
 
 
@@ -157,25 +161,71 @@ class TestFud61Actor(unittest.TestCase):
             nonlocal last_command
             last_command = command
 
-        def check_check_cyclic_tasks(now: datetime) -> Optional[DimmerCommand]:
+        def check_poll_status(now: datetime) -> Optional[DimmerCommand]:
             nonlocal last_command
             last_command = None
             d.now = now
-            d.check_cyclic_tasks()
+            d.poll_status(skip_age)
             return last_command
 
         d._execute_actor_command = mock_execute_actor_command
 
+        skip_age = d.refresh_rate * PollScheduler.SKIP_FACTOR
         time_now = d.now
         self.assertEqual(d._last_status_request, None)
-        self.assertEqual(check_check_cyclic_tasks(time_now), DimmerCommand(DimmerCommandType.UPDATE))
+        self.assertEqual(check_poll_status(time_now), DimmerCommand(DimmerCommandType.UPDATE))
         self.assertEqual(d._last_status_request, time_now)
 
         time_before = time_now
-        time_now = time_before + datetime.timedelta(seconds=d.DEFAULT_REFRESH_RATE - 1)
-        self.assertEqual(check_check_cyclic_tasks(time_now), None)
+        time_now = time_before + datetime.timedelta(seconds=skip_age - 1)
+        self.assertEqual(check_poll_status(time_now), None)
         self.assertEqual(d._last_status_request, time_before)
 
-        time_now = time_now + datetime.timedelta(seconds=d.DEFAULT_REFRESH_RATE * 0.5)
-        self.assertEqual(check_check_cyclic_tasks(time_now), DimmerCommand(DimmerCommandType.UPDATE))
+        time_now = time_now + datetime.timedelta(seconds=1)
+        self.assertEqual(check_poll_status(time_now), DimmerCommand(DimmerCommandType.UPDATE))
         self.assertEqual(d._last_status_request, time_now)
+
+    def test_merge_dim_commands(self):
+        d = self.device
+        d._set_command_inbox_config({"command_merge": {"DIM": 0.5}})
+
+        scheduler = EnoceanSendScheduler()
+        scheduler_time = 1000.0
+        scheduler._now = lambda: scheduler_time
+        d.set_send_scheduler(scheduler)
+
+        executed = []
+        d._execute_actor_command = executed.append
+
+        def send_mqtt(payload: bytes):
+            message = MQTTMessage()
+            message.payload = payload
+            d.process_mqtt_message(message)
+
+        # first value gets executed immediately, the following ones are merged
+        time_start = d.now
+        for value in [b"10", b"20", b"30", b"40"]:
+            send_mqtt(value)
+        self.assertEqual(executed, [DimmerCommand(DimmerCommandType.DIM, 10)])
+        self.assertEqual(d.count_merged_commands, 2)
+
+        scheduler_time += 0.5
+        d.now = time_start + datetime.timedelta(seconds=0.5)
+        scheduler.send_due()
+        self.assertEqual(executed[1:], [DimmerCommand(DimmerCommandType.DIM, 40)])
+
+        # the window is running again, "off" discards the pending value
+        send_mqtt(b"50")
+        send_mqtt(b"off")
+        scheduler_time += 0.5
+        scheduler.send_due()
+        self.assertEqual(executed[2:], [DimmerCommand(DimmerCommandType.OFF)])
+        self.assertEqual(len(scheduler), 0)
+
+        # window passed
+        d.now = time_start + datetime.timedelta(seconds=2)
+        send_mqtt(b"60")
+        self.assertEqual(executed[3:], [DimmerCommand(DimmerCommandType.DIM, 60)])
+
+        with self.assertRaises(DeviceException):
+            d._set_command_inbox_config({"command_merge": {"ON": 0.5}})
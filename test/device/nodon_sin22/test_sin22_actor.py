@@ -5,6 +5,7 @@ from src.common.switch_status import SwitchStatus
 from src.device.nodon_sin22.sin22_actor import Sin22Actor
 from src.tools.enocean_tools import EnoceanTools
 from src.tools.pickle_tools import PickleTools
+from src.enocean_transmit_pacer import TransmitPriority
 from test.setup_test import SetupTest
 
 
@@ -24,7 +25,7 @@ class _MockDevice(Sin22Actor):
     def _publish_mqtt(self, payload: Union[str, Dict], mqtt_channel: str = None):
         self.messages.append(payload)
 
-    def _send_enocean_packet(self, packet, delay=0):
+    def _send_enocean_packet(self, packet, delay=0, priority=TransmitPriority.COMMAND):
         self.packets.append(packet)
 
 
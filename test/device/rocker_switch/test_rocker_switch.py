@@ -8,6 +8,7 @@ from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, Rock
 from src.enocean_connector import EnoceanMessage
 from src.tools.enocean_tools import EnoceanTools
 from src.tools.pickle_tools import PickleTools
+from src.enocean_transmit_pacer import TransmitPriority
 
 
 class _MockDevice(RockerSwitch):
@@ -29,7 +30,7 @@ class _MockDevice(RockerSwitch):
     def _now(self):
         return self.now
 
-    def _send_enocean_packet(self, packet, delay=0):
+    def _send_enocean_packet(self, packet, delay=0, priority=TransmitPriority.COMMAND):
         self.packets.append(packet)
 
     def _publish_mqtt(self, payload: str, mqtt_channel: str = None):
@@ -0,0 +1,85 @@
+import unittest
+
+from src.runner.poll_scheduler import PollScheduler
+
+
+class _MockPollScheduler(PollScheduler):
+
+    def __init__(self):
+        self.now = 0.0
+        super().__init__()
+
+    def _now(self) -> float:
+        return self.now
+
+
+class _MockDevice:
+
+    def __init__(self, scheduler: _MockPollScheduler, refresh_rate=300, reported=False):
+        self.scheduler = scheduler
+        self.refresh_rate = refresh_rate
+        self.reported = reported
+        self.polls = []
+
+    def poll_status(self, skip_age: float) -> bool:
+        if self.reported:
+            return False
+        self.polls.append(self.scheduler.now)
+        return True
+
+
+class TestPollScheduler(unittest.TestCase):
+
+    def test_no_devices(self):
+        scheduler = _MockPollScheduler()
+        scheduler.start()
+        self.assertIsNone(scheduler.time_to_next())
+        self.assertFalse(scheduler.run_due())
+
+    def test_spread(self):
+        scheduler = _MockPollScheduler()
+        devices = [_MockDevice(scheduler) for _ in range(4)]
+        for device in devices:
+            scheduler.add(device)
+        scheduler.start()
+
+        for now in range(0, 600, 25):
+            scheduler.now = now
+            scheduler.run_due()
+
+        self.assertEqual([d.polls for d in devices], [[0, 300], [75, 375], [150, 450], [225, 525]])
+        self.assertEqual(scheduler.time_to_next(), 25)  # first device again at 600
+
+    def test_individual_refresh_rate(self):
+        scheduler = _MockPollScheduler()
+        fast = _MockDevice(scheduler, refresh_rate=60)
+        scheduler.add(fast)
+        scheduler.start()
+
+        for now in range(0, 181, 10):
+            scheduler.now = now
+            scheduler.run_due()
+
+        self.assertEqual(fast.polls, [0, 60, 120, 180])
+
+    def test_skip_reported_device(self):
+        scheduler = _MockPollScheduler()
+        device = _MockDevice(scheduler, reported=True)
+        scheduler.add(device)
+        scheduler.start()
+
+        self.assertTrue(scheduler.run_due())
+        self.assertEqual(device.polls, [])
+        self.assertEqual(scheduler.time_to_next(), 300)  # stays scheduled
+
+    def test_fell_behind(self):
+        scheduler = _MockPollScheduler()
+        device = _MockDevice(scheduler)
+        scheduler.add(device)
+        scheduler.start()
+
+        scheduler.now = 1000
+        scheduler.run_due()
+        scheduler.run_due()
+        self.assertEqual(device.polls, [1000])
+        self.assertEqual(scheduler.time_to_next(), 300)
@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from paho.mqtt.client import MQTTMessage
+
+from src.device.base import device
+from src.device.base.scene_actor import SceneActor, CONFKEY_ROCKER_SCENES
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.enocean_connector import EnoceanMessage
+from src.runner.rocker_scene_index import RockerSceneIndex
+
+
+class _TestSceneActor(SceneActor):
+
+    def __init__(self, name, enocean_target, scenes):
+        super().__init__(name)
+        self.mqtt_commands = []
+
+        self.set_config({
+            device.CONFKEY_ENOCEAN_SENDER: 9,
+            device.CONFKEY_ENOCEAN_TARGET: enocean_target,
+            device.CONFKEY_MQTT_CHANNEL_CMD: "dummy-cmd",
+            device.CONFKEY_MQTT_CHANNEL_STATE: "dummy-state",
+            CONFKEY_ROCKER_SCENES: scenes,
+        })
+
+    def process_mqtt_message(self, message: MQTTMessage):
+        self.mqtt_commands.append(message.payload.decode())
+
+
+def _create_message(sender, button, press=RockerPress.PRESS_SHORT):
+    packet = RockerSwitchTools.create_packet(action=RockerAction(press=press, button=button), sender=sender)
+    return EnoceanMessage(payload=packet, enocean_id=packet.sender_int)
+
+
+class TestRockerSceneIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.device1 = _TestSceneActor("device1", 101, [
+            {"rocker_id": 1, "rocker_key": 1, "command": "on"},
+            {"rocker_id": 1, "rocker_key": 1, "command": "ignored"},
+            {"rocker_id": 2, "rocker_key": 2, "command": "off"},
+        ])
+        self.device2 = _TestSceneActor("device2", 102, [
+            {"rocker_id": 1, "rocker_key": 1, "command": "toggle"},
+            {"rocker_id": 102, "rocker_key": 0, "command": "own"},
+        ])
+        self.index = RockerSceneIndex()
+        self.index.add(self.device1)
+        self.index.add(self.device2)
+
+    def test_rocker_ids(self):
+        self.assertEqual(self.index.rocker_ids, {1, 2})
+
+    def test_dispatch(self):
+        with mock.patch.object(RockerSwitchTools, "extract_action_from_packet",
+                               wraps=RockerSwitchTools.extract_action_from_packet) as extract:
+            skip = self.index.dispatch(_create_message(1, RockerButton.ROCK1))
+            self.assertEqual(extract.call_count, 1)  # decoded once for all actors
+
+        self.assertEqual(skip, {self.device1, self.device2})
+        self.assertEqual(self.device1.mqtt_commands, ["on"])
+        self.assertEqual(self.device2.mqtt_commands, ["toggle"])
+
+    def test_dispatch_no_scene(self):
+        skip = self.index.dispatch(_create_message(2, RockerButton.ROCK3))
+        self.assertEqual(skip, {self.device1})
+        self.assertEqual(self.device1.mqtt_commands, [])
+
+        skip = self.index.dispatch(_create_message(2, None, press=RockerPress.RELEASE))
+        self.assertEqual(skip, {self.device1})
+        self.assertEqual(self.device1.mqtt_commands, [])
+
+    def test_not_indexed(self):
+        self.assertIsNone(self.index.dispatch(_create_message(3, RockerButton.ROCK1)))
+        # scenes of the own actor ID are handled by the actor itself
+        self.assertIsNone(self.index.dispatch(_create_message(102, RockerButton.ROCK0)))
+        self.assertEqual(self.device2.mqtt_commands, [])
@@ -0,0 +1,195 @@
+import signal
+import unittest
+from typing import List, Optional
+
+from src.config import CONFKEY_MAIN
+from src.device.base.device import Device
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.enocean_connector import EnoceanMessage
+from src.runner.runner import Runner
+from src.runner.telegram_deduplicator import TelegramDeduplicator
+
+
+class _TestDevice(Device):
+
+    def __init__(self, name, enocean_targets: Optional[List[int]]):
+        super().__init__(name)
+        self._test_targets = enocean_targets
+        self.messages = []
+        self.count_open_mqtt = 0
+
+    def open_mqtt(self):
+        self.count_open_mqtt += 1
+
+    @property
+    def enocean_targets(self):
+        return self._test_targets
+
+    def process_enocean_message(self, message: EnoceanMessage):
+        self.messages.append(message)
+
+    def process_mqtt_message(self, message):
+        pass
+
+
+class _TestConnector:
+
+    def __init__(self):
+        self.messages = []
+
+    def get_messages(self):
+        messages, self.messages = self.messages, []
+        return messages
+
+    def close(self):
+        pass
+
+
+class _TestMqttConnector:
+
+    def __init__(self):
+        self.subscriptions = []
+
+    def subscribe(self, channels):
+        self.subscriptions.append(list(channels))
+
+    def close(self):
+        pass
+
+
+class _TestMqttPublisher:
+
+    def __init__(self):
+        self.count_clear_cache = 0
+
+    def open(self, _mqtt_connector):
+        pass
+
+    def clear_cache(self):
+        self.count_clear_cache += 1
+
+
+class TestRunnerEnoceanDispatch(unittest.TestCase):
+
+    def setUp(self):
+        self._signal_handlers = {s: signal.getsignal(s) for s in [signal.SIGINT, signal.SIGTERM]}
+
+        self.runner = Runner()
+        self.runner._enocean_connectors = {Runner.DEFAULT_GATEWAY: _TestConnector()}
+
+    def tearDown(self):
+        for sig, handler in self._signal_handlers.items():
+            signal.signal(sig, handler)
+
+    def _register(self, *devices: _TestDevice):
+        for device in devices:
+            for enocean_id in device.enocean_targets if device.enocean_targets is not None else [None]:
+                self.runner._enocean_ids.setdefault(enocean_id, []).append(device)
+        self.runner._build_enocean_dispatch()
+
+    def _dispatch(self, *enocean_ids):
+        self.runner._enocean_connectors[Runner.DEFAULT_GATEWAY].messages = [
+            EnoceanMessage(payload=None, enocean_id=i) for i in enocean_ids
+        ]
+        self.runner._process_enocean_messages()
+
+    def test_catch_all_listeners(self):
+        actor = _TestDevice("actor", [0x01])
+        sniffer = _TestDevice("sniffer", None)
+        self._register(actor, sniffer)
+
+        for _ in range(100):
+            self._dispatch(0x01, 0x02)
+
+        self.assertEqual(len(actor.messages), 100)
+        self.assertEqual(len(sniffer.messages), 200)
+        # the registration must not grow with each message
+        self.assertEqual(self.runner._enocean_ids, {0x01: [actor], None: [sniffer]})
+        self.assertEqual(self.runner._enocean_dispatch[0x01], (actor, sniffer))
+
+    def test_dispatch_immutable(self):
+        self._register(_TestDevice("actor", [0x01]))
+
+        with self.assertRaises(TypeError):
+            self.runner._enocean_dispatch[0x02] = ()
+        self._dispatch(0x02)  # nobody listens
+
+
+class TestRunnerGateways(unittest.TestCase):
+
+    def setUp(self):
+        self._signal_handlers = {s: signal.getsignal(s) for s in [signal.SIGINT, signal.SIGTERM]}
+        self.runner = Runner()
+
+    def tearDown(self):
+        for sig, handler in self._signal_handlers.items():
+            signal.signal(sig, handler)
+
+    def test_gateway_configs(self):
+        self.runner._config = {CONFKEY_MAIN: {"enocean_port": "/dev/ttyUSB0", "enocean_transmit_rate": 5}}
+        self.assertEqual(self.runner._gateway_configs(), {
+            Runner.DEFAULT_GATEWAY: {"enocean_port": "/dev/ttyUSB0", "enocean_transmit_rate": 5}
+        })
+
+        self.runner._config = {CONFKEY_MAIN: {"enocean_transmit_rate": 5, "enocean_gateways": {
+            "a": {"enocean_port": "/dev/ttyUSB0"},
+            "b": {"enocean_port": "/dev/ttyUSB1", "enocean_transmit_rate": 2},
+        }}}
+        self.assertEqual(self.runner._gateway_configs(), {
+            "a": {"enocean_port": "/dev/ttyUSB0", "enocean_transmit_rate": 5},
+            "b": {"enocean_port": "/dev/ttyUSB1", "enocean_transmit_rate": 2},
+        })
+
+    def test_deduplicate_and_base_ids(self):
+        runner = self.runner
+        runner._enocean_connectors = {"a": _TestConnector(), "b": _TestConnector()}
+        runner._deduplicator = TelegramDeduplicator()
+
+        device = _TestDevice("actor", [0x01])
+        device._enocean_gateway = "b"
+        runner._enocean_ids = {0x01: [device]}
+        runner._build_enocean_dispatch()
+
+        packet = RockerSwitchTools.create_packet(RockerAction(RockerPress.PRESS_SHORT, RockerButton.ROCK1), sender=0x01)
+        for connector in runner._enocean_connectors.values():
+            connector.messages = [EnoceanMessage(payload=packet, enocean_id=0x01)]
+        runner._process_enocean_messages()
+        self.assertEqual(len(device.messages), 1)
+
+        runner._apply_base_id([0xff, 0x80, 0, 0], "b")  # not the default gateway
+        self.assertEqual(device._enocean_sender, 0xff800000)
+
+
+class TestRunnerMqttReconnect(unittest.TestCase):
+
+    def setUp(self):
+        self._signal_handlers = {s: signal.getsignal(s) for s in [signal.SIGINT, signal.SIGTERM]}
+
+        self.runner = Runner()
+        self.runner._enocean_connectors = {Runner.DEFAULT_GATEWAY: _TestConnector()}
+        self.runner._mqtt_connector = _TestMqttConnector()
+        self.runner._mqtt_publisher = _TestMqttPublisher()
+        self.device = _TestDevice("window", [0x01])
+        self.runner._enocean_ids[0x01] = [self.device]
+
+    def tearDown(self):
+        for sig, handler in self._signal_handlers.items():
+            signal.signal(sig, handler)
+
+    def test_reconnect_opens_devices_again(self):
+        self.runner._on_mqtt_connect(0)
+        self.assertTrue(self.runner._init_mqtt_connection())
+        self.assertEqual(self.device.count_open_mqtt, 1)
+
+        self.runner._on_mqtt_disconnect(1)
+        self.runner._reinit_mqtt_connection()
+        self.assertEqual(self.device.count_open_mqtt, 1)
+
+        self.runner._on_mqtt_connect(0)  # network thread
+        self.runner._reinit_mqtt_connection()  # main loop
+        self.assertEqual(self.device.count_open_mqtt, 2)
+        self.assertEqual(self.runner._mqtt_publisher.count_clear_cache, 1)
+        self.assertEqual(len(self.runner._mqtt_connector.subscriptions), 1)  # renewed by the connector
+
+        self.runner._reinit_mqtt_connection()
+        self.assertEqual(self.device.count_open_mqtt, 2)
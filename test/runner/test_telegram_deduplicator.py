@@ -0,0 +1,50 @@
+import unittest
+from collections import namedtuple
+
+from src.enocean_connector import EnoceanMessage
+from src.runner.telegram_deduplicator import TelegramDeduplicator
+
+
+_Packet = namedtuple("_Packet", ["data"])
+
+
+class _TestDeduplicator(TelegramDeduplicator):
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.now = 1000.0
+
+    def _now(self):
+        return self.now
+
+
+def _message(sender, *data, status=0x30):
+    return EnoceanMessage(payload=_Packet(data=[0xf6, *data, 0x01, 0x02, 0x03, 0x04, status]), enocean_id=sender)
+
+
+class TestTelegramDeduplicator(unittest.TestCase):
+
+    def test_duplicate_from_other_gateway(self):
+        dedup = _TestDeduplicator(0.5)
+
+        self.assertFalse(dedup.is_duplicate("a", _message(1, 0x30)))
+        self.assertTrue(dedup.is_duplicate("b", _message(1, 0x30, status=0x31)))  # repeated (status differs)
+        self.assertFalse(dedup.is_duplicate("b", _message(1, 0x10)))  # other payload
+        self.assertFalse(dedup.is_duplicate("b", _message(2, 0x30)))  # other sender
+        self.assertEqual(dedup.count_duplicates, 1)
+
+    def test_same_gateway_is_no_duplicate(self):
+        dedup = _TestDeduplicator(0.5)
+
+        self.assertFalse(dedup.is_duplicate("a", _message(1, 0x30)))
+        self.assertFalse(dedup.is_duplicate("a", _message(1, 0x30)))
+
+    def test_window(self):
+        dedup = _TestDeduplicator(0.5)
+
+        self.assertFalse(dedup.is_duplicate("a", _message(1, 0x30)))
+        dedup.now += 0.4
+        self.assertTrue(dedup.is_duplicate("b", _message(1, 0x30)))
+        dedup.now += 0.2
+        self.assertFalse(dedup.is_duplicate("b", _message(1, 0x30)))
+        self.assertEqual(len(dedup), 1)  # expired entries are removed
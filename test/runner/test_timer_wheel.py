@@ -0,0 +1,58 @@
+import unittest
+
+from src.runner.timer_wheel import TimerWheel
+
+
+class _MockTimerWheel(TimerWheel):
+
+    def __init__(self):
+        self.now = 0.0
+        super().__init__()
+
+    def _now(self) -> float:
+        return self.now
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def test_no_timer(self):
+        timers = _MockTimerWheel()
+        self.assertIsNone(timers.time_to_next())
+        self.assertFalse(timers.run_due())
+
+    def test_time_to_next(self):
+        timers = _MockTimerWheel()
+        calls = []
+        timers.add(30, lambda: calls.append(30))
+        timers.add(5, lambda: calls.append(5))
+
+        self.assertEqual(timers.time_to_next(), 5)
+
+        timers.now = 4.9
+        self.assertFalse(timers.run_due())
+        self.assertEqual(calls, [])
+
+        timers.now = 5.0
+        self.assertTrue(timers.run_due())
+        self.assertEqual(calls, [5])
+        self.assertEqual(timers.time_to_next(), 5)
+
+        timers.now = 30.1
+        self.assertTrue(timers.run_due())
+        self.assertEqual(calls, [5, 30, 5])
+
+    def test_skip_missed_intervals(self):
+        timers = _MockTimerWheel()
+        calls = []
+        timers.add(5, lambda: calls.append(timers.now))
+
+        timers.now = 100
+        timers.run_due()
+        timers.run_due()
+        self.assertEqual(calls, [100])
+        self.assertEqual(timers.time_to_next(), 5)
+
+    def test_first_delay(self):
+        timers = _MockTimerWheel()
+        timers.add(5, lambda: None, first_delay=0)
+        self.assertEqual(timers.time_to_next(), 0)
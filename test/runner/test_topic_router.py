@@ -0,0 +1,43 @@
+import unittest
+
+from src.runner.topic_router import TopicRouter
+
+
+class TestTopicRouter(unittest.TestCase):
+
+    def test_match(self):
+        router = TopicRouter()
+        router.add("home/enocean/shutter/cmd", "exact")
+        router.add("home/enocean/+/cmd", "plus")
+        router.add("home/#", "hash")
+        router.add("home/enocean/#", "hash2")
+        router.add("+/+/+", "plus3")
+        router.add("#", "all")
+
+        self.assertEqual(router.match("home/enocean/shutter/cmd"), {"exact", "plus", "hash", "hash2", "all"})
+        self.assertEqual(router.match("home/enocean/dimmer/cmd"), {"plus", "hash", "hash2", "all"})
+        self.assertEqual(router.match("home/enocean/dimmer"), {"hash", "hash2", "plus3", "all"})
+        self.assertEqual(router.match("home/enocean"), {"hash", "hash2", "all"})  # "#" includes the parent level
+        self.assertEqual(router.match("other/topic"), {"all"})
+        self.assertEqual(router.match("$SYS/broker/uptime"), set())
+
+    def test_no_subscriber(self):
+        router = TopicRouter()
+        router.add("a/b", 1)
+        self.assertEqual(router.match("a/c"), set())
+        self.assertEqual(router.match("a"), set())
+        self.assertEqual(router.match("a/b/c"), set())
+
+    def test_several_subscribers(self):
+        router = TopicRouter()
+        router.add("a/+", 1)
+        router.add("a/+", 2)
+        router.add("a/b", 2)
+        self.assertEqual(router.match("a/b"), {1, 2})
+        self.assertEqual(router.filters, {"a/+", "a/b"})
+
+    def test_invalid_filters(self):
+        router = TopicRouter()
+        for topic_filter in ["", "a/#/b", "a/b#", "a+/b", "a/+b"]:
+            with self.assertRaises(ValueError):
+                router.add(topic_filter, 1)
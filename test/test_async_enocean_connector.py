@@ -0,0 +1,70 @@
+import asyncio
+import os
+import pty
+import tty
+import unittest
+
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import Packet
+
+from src.async_enocean_connector import AsyncEnoceanConnector
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from test.setup_test import SetupTest
+
+
+class TestAsyncEnoceanConnector(unittest.TestCase):
+
+    def setUp(self):
+        SetupTest.set_dummy_sender_id()
+
+        self.master, slave = pty.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+
+    def tearDown(self):
+        os.close(self.master)
+
+    def test_receive_and_send(self):
+        sent_packet = RockerSwitchTools.create_packet(RockerAction(RockerPress.PRESS_SHORT, RockerButton.ROCK1), sender=0x01020304)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            wakeup = asyncio.Event()
+            connector = AsyncEnoceanConnector(self.port, loop)
+            connector.set_wakeup(wakeup)
+            connector.open()
+            try:
+                os.write(self.master, bytes(sent_packet.build()))
+                await asyncio.wait_for(wakeup.wait(), 1)
+                messages = connector.get_messages()
+
+                connector.send(sent_packet)
+                await asyncio.sleep(0.05)
+                written = os.read(self.master, 100)
+            finally:
+                connector.close()
+
+            return messages, written
+
+        messages, written = asyncio.run(run())
+
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].enocean_id, 0x01020304)
+        self.assertEqual(written, bytes(sent_packet.build()))
+
+    def test_request_base_id(self):
+        response = Packet(PACKET.RESPONSE, data=[0, 0xff, 0x80, 0, 0], optional=[])
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            connector = AsyncEnoceanConnector(self.port, loop)
+            connector.open()
+            try:
+                loop.call_later(0.05, os.write, self.master, bytes(response.build()))
+                return await connector.request_base_id()
+            finally:
+                connector.close()
+
+        base_id = asyncio.run(run())
+
+        self.assertEqual(base_id, [0xff, 0x80, 0, 0])
@@ -0,0 +1,91 @@
+import os
+import pty
+import threading
+import tty
+import unittest
+
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import Packet
+
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.enocean_connector import EnoceanConnector
+from test.setup_test import SetupTest
+
+
+class TestEnoceanConnector(unittest.TestCase):
+
+    def setUp(self):
+        SetupTest.set_dummy_sender_id()
+
+        self.master, slave = pty.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+
+        self.wakeup = threading.Event()
+        self.connector = EnoceanConnector(self.port)
+        self.connector.set_wakeup(self.wakeup)
+
+    def tearDown(self):
+        self.connector.close()
+        os.close(self.master)
+
+    @classmethod
+    def _create_packet(cls, sender):
+        return RockerSwitchTools.create_packet(RockerAction(RockerPress.PRESS_SHORT, RockerButton.ROCK1), sender=sender)
+
+    def _receive(self, packets, expected_count):
+        for packet in packets:
+            os.write(self.master, bytes(packet.build()))
+        messages = []
+        while len(messages) < expected_count and self.wakeup.wait(1):
+            self.wakeup.clear()
+            messages.extend(self.connector.get_messages())
+        return messages
+
+    def test_receive_and_send(self):
+        packet = self._create_packet(0x01020304)
+        self.connector.open()
+
+        messages = self._receive([packet], 1)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].enocean_id, 0x01020304)
+        self.assertEqual(messages[0].payload, packet)
+        self.assertTrue(messages[0].payload.received is not None)
+
+        self.connector.send(packet)
+        self.assertEqual(os.read(self.master, 100), bytes(packet.build()))
+
+    def test_listened_senders(self):
+        self.connector.set_listened_senders([0x01020304])
+        self.connector.open()
+
+        messages = self._receive([self._create_packet(0x0a0b0c0d), self._create_packet(0x01020304)], 1)
+        self.assertEqual([m.enocean_id for m in messages], [0x01020304])
+
+        stats = self.connector.receive_stats
+        self.assertEqual((stats.received, stats.dropped, stats.dropped_senders), (1, 1, 1))
+        self.assertEqual(self.connector.dropped_senders, {0x0a0b0c0d: 1})
+
+    def test_dropped_senders_do_not_wake_up(self):
+        self.connector.set_listened_senders([0x01020304])
+        self.connector.open()
+
+        os.write(self.master, bytes(self._create_packet(0x0a0b0c0d).build()))
+        self.assertFalse(self.wakeup.wait(0.3))
+        self.assertEqual(self.connector.receive_stats.dropped, 1)
+
+    def test_base_id(self):
+        self.connector.open()
+        response = Packet(PACKET.RESPONSE, data=[0, 0xff, 0x80, 0, 0], optional=[])
+
+        def respond():
+            request = os.read(self.master, 100)
+            if request == bytes(Packet(PACKET.COMMON_COMMAND, data=[0x08]).build()):
+                os.write(self.master, bytes(response.build()))
+
+        thread = threading.Thread(target=respond)
+        thread.start()
+        base_id = self.connector.base_id
+        thread.join()
+
+        self.assertEqual(base_id, [0xff, 0x80, 0, 0])
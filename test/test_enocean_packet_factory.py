@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+
+from enocean.protocol.packet import RadioPacket
+
+from src.device.eltako_fud61.fud61_eep import Fud61Action, Fud61Command, Fud61Eep
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.enocean_packet_factory import EnoceanPacketFactory
+from test.setup_test import SetupTest
+
+
+class TestEnoceanPacketFactory(unittest.TestCase):
+
+    def setUp(self):
+        SetupTest.set_dummy_sender_id()
+        EnoceanPacketFactory.clear_templates()
+
+    def tearDown(self):
+        EnoceanPacketFactory.clear_templates()
+
+    def check_template(self, create_func):
+        expected = create_func(0x01020304, 0x0a0b0c0d)
+        EnoceanPacketFactory.clear_templates()
+        create_func(0x05060708, 0x0e0f1011)  # creates the template
+
+        with mock.patch.object(RadioPacket, "create", wraps=RadioPacket.create) as create:
+            packet = create_func(0x01020304, 0x0a0b0c0d)
+            self.assertEqual(create.call_count, 0)
+
+        self.assertEqual(packet, expected)
+        self.assertEqual(packet.optional, expected.optional)
+        self.assertEqual(packet.sender_int, 0x01020304)
+        self.assertEqual(packet.destination_int, 0x0a0b0c0d)
+        self.assertEqual(packet.learn, expected.learn)
+        self.assertEqual(packet.parsed, expected.parsed)
+        self.assertEqual(str(packet), str(expected))
+
+    def test_rocker(self):
+        for action in [RockerAction(press=RockerPress.PRESS_SHORT, button=RockerButton.ROCK1), RockerAction(press=RockerPress.RELEASE)]:
+            self.check_template(lambda s, d: RockerSwitchTools.create_packet(action, sender=s, destination=d))
+
+    def test_4bs(self):
+        for action in [Fud61Action(command=Fud61Command.DIMMING, dim_state=33), Fud61Action(command=Fud61Command.STATUS_REQUEST)]:
+            def create_func(sender, destination):
+                action.sender = sender
+                action.destination = destination
+                return Fud61Eep.create_packet(action)
+
+            self.check_template(create_func)
+
+    def test_different_props(self):
+        packet1 = Fud61Eep.create_packet(Fud61Action(command=Fud61Command.DIMMING, dim_state=33))
+        packet2 = Fud61Eep.create_packet(Fud61Action(command=Fud61Command.DIMMING, dim_state=34))
+        self.assertNotEqual(packet1.data, packet2.data)
+
+    def test_packets_are_independent(self):
+        action = RockerAction(press=RockerPress.RELEASE)
+        packet1 = RockerSwitchTools.create_packet(action)
+        packet1.data[1] = 0xff
+        next(iter(packet1.parsed.values()))["raw_value"] = -1
+        packet2 = RockerSwitchTools.create_packet(action)
+        self.assertNotEqual(packet2.data[1], 0xff)
+        self.assertNotEqual(next(iter(packet2.parsed.values()))["raw_value"], -1)
@@ -0,0 +1,124 @@
+import threading
+import unittest
+
+from src.enocean_send_scheduler import EnoceanSendScheduler
+
+
+class _MockEnoceanSendScheduler(EnoceanSendScheduler):
+
+    def __init__(self):
+        self.now = 0.0
+        super().__init__()
+
+    def _now(self) -> float:
+        return self.now
+
+
+class TestEnoceanSendScheduler(unittest.TestCase):
+
+    def test_send_in_due_order(self):
+        scheduler = _MockEnoceanSendScheduler()
+        sent = []
+
+        scheduler.schedule(0.2, lambda: sent.append("b"))
+        scheduler.schedule(0.05, lambda: sent.append("a"))
+        scheduler.schedule(0.2, lambda: sent.append("c"))  # same due time, keeps insertion order
+
+        self.assertEqual(len(scheduler), 3)
+        self.assertAlmostEqual(scheduler.time_to_next(), 0.05)
+
+        self.assertFalse(scheduler.send_due())
+        self.assertEqual(sent, [])
+
+        scheduler.now = 0.1
+        self.assertTrue(scheduler.send_due())
+        self.assertEqual(sent, ["a"])
+
+        scheduler.now = 1.0
+        self.assertTrue(scheduler.send_due())
+        self.assertEqual(sent, ["a", "b", "c"])
+        self.assertIsNone(scheduler.time_to_next())
+
+    def test_wakeup(self):
+        scheduler = _MockEnoceanSendScheduler()
+        wakeup = threading.Event()
+        scheduler.set_wakeup(wakeup)
+
+        scheduler.schedule(0.05, lambda: None)
+        self.assertTrue(wakeup.is_set())
+
+    def test_send_exception_does_not_break(self):
+        scheduler = _MockEnoceanSendScheduler()
+        sent = []
+
+        def fail():
+            raise RuntimeError("test")
+
+        scheduler.schedule(0.01, fail)
+        scheduler.schedule(0.02, lambda: sent.append("ok"))
+
+        scheduler.now = 1.0
+        scheduler.send_due()
+        self.assertEqual(sent, ["ok"])
+
+    def test_cancel(self):
+        scheduler = _MockEnoceanSendScheduler()
+        sent = []
+
+        entry = scheduler.schedule(0.1, lambda: sent.append("a"), owner="dev1")
+        scheduler.schedule(0.2, lambda: sent.append("b"), owner="dev1")
+        scheduler.schedule(0.3, lambda: sent.append("c"), owner="dev2")
+
+        self.assertTrue(scheduler.cancel(entry))
+        self.assertFalse(scheduler.cancel(entry))
+        self.assertAlmostEqual(scheduler.time_to_next(), 0.2)
+
+        self.assertEqual(scheduler.cancel_owner("dev1"), 1)
+        self.assertEqual(len(scheduler), 1)
+
+        scheduler.now = 1.0
+        scheduler.send_due()
+        self.assertEqual(sent, ["c"])
+
+        stats = scheduler.stats
+        self.assertEqual(stats.queued, 3)
+        self.assertEqual(stats.sent, 1)
+        self.assertEqual(stats.cancelled, 2)
+        self.assertEqual(stats.pending, 0)
+
+    def test_cancel_after_sent(self):
+        scheduler = _MockEnoceanSendScheduler()
+
+        entry = scheduler.schedule(0.1, lambda: None)
+        scheduler.now = 1.0
+        scheduler.send_due()
+
+        self.assertFalse(scheduler.cancel(entry))
+        self.assertEqual(scheduler.stats.cancelled, 0)
+
+    def test_max_pending_per_owner(self):
+        scheduler = _MockEnoceanSendScheduler()
+        scheduler._max_pending_per_owner = 2
+
+        self.assertIsNotNone(scheduler.schedule(0.1, lambda: None, owner="dev1"))
+        self.assertIsNotNone(scheduler.schedule(0.1, lambda: None, owner="dev1"))
+        self.assertIsNone(scheduler.schedule(0.1, lambda: None, owner="dev1"))
+        self.assertIsNotNone(scheduler.schedule(0.1, lambda: None, owner="dev2"))
+
+        stats = scheduler.stats
+        self.assertEqual(stats.queued, 3)
+        self.assertEqual(stats.dropped, 1)
+        self.assertEqual(stats.pending, 3)
+
+        scheduler.now = 1.0
+        scheduler.send_due()
+        self.assertIsNotNone(scheduler.schedule(0.1, lambda: None, owner="dev1"))
+
+    def test_clear(self):
+        scheduler = _MockEnoceanSendScheduler()
+        scheduler.schedule(0.1, lambda: None, owner="dev1")
+        scheduler.schedule(0.1, lambda: None, owner="dev2")
+
+        self.assertEqual(scheduler.clear(), 2)
+        self.assertEqual(len(scheduler), 0)
+        self.assertIsNone(scheduler.time_to_next())
@@ -0,0 +1,78 @@
+import unittest
+
+from src.enocean_transmit_pacer import TransmitPacer, TransmitPriority
+
+
+class _MockTransmitPacer(TransmitPacer):
+
+    def __init__(self, rate, burst):
+        self.now = 0.0
+        super().__init__(rate, burst)
+
+    def _now(self) -> float:
+        return self.now
+
+
+class TestTransmitPacer(unittest.TestCase):
+
+    def test_burst_and_rate(self):
+        pacer = _MockTransmitPacer(rate=10, burst=3)
+        transmitted = []
+
+        for i in range(5):
+            pacer.submit(i)
+        self.assertEqual(pacer.time_to_next(), 0.0)
+
+        pacer.transmit_due(transmitted.append)
+        self.assertEqual(transmitted, [0, 1, 2])
+        self.assertEqual(pacer.queued, 2)
+        self.assertAlmostEqual(pacer.time_to_next(), 0.1)
+
+        pacer.now = 0.05
+        self.assertFalse(pacer.transmit_due(transmitted.append))
+
+        pacer.now = 0.1
+        pacer.transmit_due(transmitted.append)
+        self.assertEqual(transmitted, [0, 1, 2, 3])
+
+        pacer.now = 10.0
+        pacer.transmit_due(transmitted.append)
+        self.assertEqual(transmitted, [0, 1, 2, 3, 4])
+        self.assertIsNone(pacer.time_to_next())
+
+    def test_priority(self):
+        pacer = _MockTransmitPacer(rate=10, burst=1)
+        transmitted = []
+
+        pacer.submit("status1", TransmitPriority.STATUS)
+        pacer.submit("status2", TransmitPriority.STATUS)
+        pacer.submit("command", TransmitPriority.COMMAND)
+
+        pacer.transmit_due(transmitted.append)
+        self.assertEqual(transmitted, ["command"])
+
+        pacer.now = 1.0
+        pacer.transmit_due(transmitted.append)
+        self.assertEqual(transmitted, ["command", "status1"])
+
+    def test_stats(self):
+        pacer = _MockTransmitPacer(rate=10, burst=1)
+
+        pacer.submit(1)
+        pacer.submit(2)
+        pacer.transmit_due(lambda p: None)
+        pacer.now = 0.5
+        pacer.transmit_due(lambda p: None)
+
+        stats = pacer.stats
+        self.assertEqual(stats.transmitted, 2)
+        self.assertEqual(stats.queued, 0)
+        self.assertEqual(stats.max_queued, 2)
+        self.assertAlmostEqual(stats.wait_time_max, 0.5)
+        self.assertAlmostEqual(stats.wait_time_avg, 0.25)
+
+    def test_invalid_config(self):
+        with self.assertRaises(ValueError):
+            TransmitPacer(rate=0)
+        with self.assertRaises(ValueError):
+            TransmitPacer(burst=0)
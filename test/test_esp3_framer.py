@@ -0,0 +1,86 @@
+import unittest
+
+from enocean.protocol import crc8 as enocean_crc8
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import Packet, RadioPacket, ResponsePacket
+
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.esp3_framer import CRC8_TABLE, Esp3Framer, crc8
+from test.setup_test import SetupTest
+
+
+class TestEsp3Framer(unittest.TestCase):
+
+    def setUp(self):
+        SetupTest.set_dummy_sender_id()
+
+        self.packet = RockerSwitchTools.create_packet(RockerAction(RockerPress.PRESS_SHORT, RockerButton.ROCK1), sender=0x01020304)
+        self.raw = bytes(self.packet.build())
+
+    def test_crc8(self):
+        self.assertEqual(tuple(CRC8_TABLE), enocean_crc8.CRC_TABLE)
+        self.assertEqual(crc8(self.raw[1:5]), self.raw[5])
+        self.assertEqual(crc8(memoryview(self.raw)[6:-1]), self.raw[-1])
+
+    def test_frame(self):
+        framer = Esp3Framer()
+        frames = framer.feed(self.raw)
+
+        self.assertEqual(len(frames), 1)
+        frame = frames[0]
+        self.assertEqual(frame.packet_type, PACKET.RADIO_ERP1)
+        self.assertEqual(frame.sender_int, 0x01020304)
+        self.assertEqual(frame.response_data, None)
+
+        packet = frame.to_packet()
+        self.assertIsInstance(packet, RadioPacket)
+        self.assertEqual(packet, self.packet)
+        self.assertEqual(len(framer), 0)
+
+    def test_split_chunks_and_compaction(self):
+        framer = Esp3Framer(capacity=64)  # forces moving the unread bytes to the front
+        stream = self.raw * 30
+
+        frames = []
+        for index in range(0, len(stream), 7):
+            frames.extend(framer.feed(stream[index:index + 7]))
+
+        self.assertEqual(len(frames), 30)
+        self.assertTrue(all(f.sender_int == 0x01020304 for f in frames))
+        self.assertEqual(framer.count_crc_errors, 0)
+
+    def test_resync(self):
+        framer = Esp3Framer()
+        broken = bytearray(self.raw)
+        broken[-1] ^= 0xff  # data CRC
+
+        frames = framer.feed(b"\x00\x01" + broken + b"\x55\x00" + self.raw)
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0].to_packet(), self.packet)
+        self.assertTrue(framer.count_crc_errors >= 1)
+        self.assertTrue(framer.count_skipped_bytes >= 2 + len(broken))
+
+    def test_response(self):
+        response = Packet(PACKET.RESPONSE, data=[0, 0xff, 0x80, 0, 0], optional=[])
+        frames = Esp3Framer().feed(bytes(response.build()))
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0].sender_int, None)
+        self.assertEqual(frames[0].response_data, bytes([0xff, 0x80, 0, 0]))
+        self.assertIsInstance(frames[0].to_packet(), ResponsePacket)
+
+    def test_sender_filter(self):
+        framer = Esp3Framer()
+        framer.set_sender_filter({0x01020304})
+
+        other = RockerSwitchTools.create_packet(RockerAction(RockerPress.PRESS_SHORT, RockerButton.ROCK1), sender=0x0a0b0c0d)
+        response = Packet(PACKET.RESPONSE, data=[0, 0xff, 0x80, 0, 0], optional=[])
+        frames = framer.feed(bytes(other.build()) * 3 + self.raw + bytes(response.build()))
+
+        self.assertEqual([f.sender_int for f in frames], [0x01020304, None])  # responses always pass
+        self.assertEqual(framer.count_dropped, 3)
+        self.assertEqual(framer.dropped_senders, {0x0a0b0c0d: 3})
+
+        framer.set_sender_filter(None)
+        self.assertEqual(len(framer.feed(bytes(other.build()))), 1)
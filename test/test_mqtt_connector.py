@@ -0,0 +1,155 @@
+import os
+import unittest
+
+import paho.mqtt.client as mqtt
+
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+from paho.mqtt.reasoncodes import ReasonCodes
+
+from src.mqtt_connector import MqttConnector, MqttException, CONFKEY_MQTT_TOPIC_ALIAS_MAXIMUM, \
+    CONFKEY_MQTT_MESSAGE_EXPIRY, CONFKEY_MQTT_SHARED_SUBSCRIPTION_GROUP
+from src.mqtt_publisher import MqttPublisher
+from src.mqtt_spool import MqttSpool
+from test.setup_test import SetupTest
+
+
+class _MessageInfo:
+
+    def __init__(self, mid):
+        self.mid = mid
+        self.rc = mqtt.MQTT_ERR_SUCCESS
+
+
+class _PahoClient:
+
+    def __init__(self):
+        self.published = []
+        self.properties = []
+        self.subscriptions = None
+
+    def publish(self, topic, payload, qos, retain, properties=None):
+        self.published.append((topic, payload, qos, retain))
+        self.properties.append(properties)
+        return _MessageInfo(len(self.published))
+
+    def subscribe(self, subscriptions):
+        self.subscriptions = subscriptions
+        return mqtt.MQTT_ERR_SUCCESS, 1
+
+
+class TestMqttConnector(unittest.TestCase):
+
+    @classmethod
+    def _create_connector(cls):
+        connector = MqttConnector(MqttPublisher())
+        connector._mqtt = _PahoClient()
+        connector._on_connect(None, None, None, 0)
+        return connector
+
+    def test_in_flight_limit(self):
+        connector = self._create_connector()
+        connector._max_in_flight = 2
+
+        for i in range(3):
+            connector.publish("topic/{}".format(i), "payload", qos=1)
+        connector.publish("topic/retained", "1", qos=1, retain=True)
+        connector.publish("topic/retained", "2", qos=1, retain=True)  # conflated
+        self.assertEqual(connector.queued, 4)
+
+        connector._flush_publish_queue()
+        self.assertEqual(connector.in_flight, 2)
+        self.assertEqual(connector.queued, 2)
+
+        connector._flush_publish_queue()  # nothing acknowledged
+        self.assertEqual(len(connector._mqtt.published), 2)
+
+        connector._on_publish(None, None, 1)
+        self.assertEqual(connector.in_flight, 1)
+        connector._flush_publish_queue()
+        self.assertEqual(connector.queued, 1)
+
+        connector._flush_publish_queue(limited=False)
+        self.assertEqual(connector.queued, 0)
+        self.assertEqual(connector._mqtt.published[-1], ("topic/retained", "2", 1, True))
+
+    def test_acknowledged_before_registered(self):
+        connector = self._create_connector()
+
+        connector._on_publish(None, None, 1)  # paho network thread was faster
+        connector.publish("topic", "payload", qos=2)
+        connector._flush_publish_queue()
+
+        self.assertEqual(connector.in_flight, 0)
+
+    def test_spool_while_disconnected(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        spool_file = os.path.join(work_dir, "connector_spool.jsonl")
+
+        connector = self._create_connector()
+        connector._spool = MqttSpool(spool_file)
+        connector.subscribe(["cmd"])
+
+        connector._on_disconnect(None, None, mqtt.MQTT_ERR_CONN_LOST)
+        connector.ensure_connection()  # not fatal, reconnecting
+        connector.publish("state", "1", qos=1, retain=True)
+        connector.publish("state", "2", qos=1, retain=True)
+        connector.publish("event", "pressed", qos=1)
+        connector._flush_publish_queue()
+        self.assertEqual(connector._mqtt.published, [])
+        self.assertEqual(len(connector._spool), 2)
+        self.assertTrue(os.path.exists(spool_file))
+
+        connector._on_connect(None, None, None, mqtt.CONNACK_REFUSED_SERVER_UNAVAILABLE)
+        connector.ensure_connection()  # broker is starting
+
+        connector._on_connect(None, None, None, 0)
+        connector.publish("event", "released", qos=1)
+        connector._flush_publish_queue()
+        self.assertEqual([(p[0], p[1]) for p in connector._mqtt.published],
+                         [("state", "2"), ("event", "pressed"), ("event", "released")])
+        self.assertFalse(os.path.exists(spool_file))
+
+    def test_refused_connection(self):
+        connector = self._create_connector()
+
+        connector._on_connect(None, None, None, mqtt.CONNACK_REFUSED_NOT_AUTHORIZED)
+        with self.assertRaises(MqttException):
+            connector.ensure_connection()
+
+    def test_mqtt_v5(self):
+        connector = MqttConnector(MqttPublisher())
+        connector._mqtt = _PahoClient()
+        connector._set_v5_config({
+            CONFKEY_MQTT_TOPIC_ALIAS_MAXIMUM: 10,
+            CONFKEY_MQTT_MESSAGE_EXPIRY: 3600,
+            CONFKEY_MQTT_SHARED_SUBSCRIPTION_GROUP: "bridges",
+        }, protocol=5)
+
+        connack_properties = Properties(PacketTypes.CONNACK)
+        connack_properties.TopicAliasMaximum = 2  # broker limit
+        connector._on_connect(None, None, None, ReasonCodes(PacketTypes.CONNACK, identifier=0), connack_properties)
+
+        for topic in ["a", "a", "b", "c", "a"]:
+            connector.publish(topic, "state", qos=0, retain=True)
+        connector.publish("a", "event", qos=1)
+        connector._flush_publish_queue()
+
+        published = [(p[0], props.TopicAlias) for p, props in zip(connector._mqtt.published, connector._mqtt.properties)]
+        # "a" conflated in the queue; "c" reuses the alias of the least recently used topic "a"
+        self.assertEqual(published, [("a", 1), ("b", 2), ("c", 1), ("a", 2)])
+        self.assertEqual(connector._mqtt.properties[0].MessageExpiryInterval, 3600)
+        self.assertFalse(hasattr(connector._mqtt.properties[-1], "MessageExpiryInterval"))  # not retained
+
+        connector.publish("c", "event", qos=0)
+        connector.publish("c", "event", qos=1)  # may be resent after a reconnect => with topic
+        connector._flush_publish_queue()
+        self.assertEqual([p[0] for p in connector._mqtt.published[-2:]], ["", "c"])
+
+        connector.subscribe(["cmd/+"])
+        self.assertEqual(connector._mqtt.subscriptions, [("$share/bridges/cmd/+", 1)])
+
+    def test_mqtt_v5_config_requires_protocol(self):
+        connector = MqttConnector(MqttPublisher())
+        with self.assertRaises(MqttException):
+            connector._set_v5_config({CONFKEY_MQTT_TOPIC_ALIAS_MAXIMUM: 10}, protocol=4)
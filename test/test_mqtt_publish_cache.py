@@ -0,0 +1,58 @@
+import json
+import unittest
+
+from src.mqtt_publish_cache import MqttPublishCache
+
+
+class _TestMqttPublishCache(MqttPublishCache):
+
+    def __init__(self, heartbeat):
+        super().__init__(heartbeat)
+        self.now = 1000.0
+
+    def _now(self):
+        return self.now
+
+
+class TestMqttPublishCache(unittest.TestCase):
+
+    @classmethod
+    def _state(cls, status, timestamp):
+        return json.dumps({"device": "shutter", "status": status, "timestamp": timestamp}, sort_keys=True)
+
+    def test_ignore_timestamp(self):
+        cache = _TestMqttPublishCache(heartbeat=300)
+
+        self.assertFalse(cache.is_redundant("a", self._state("on", "2024-01-01T10:00:00"), retain=True))
+        cache.now += 10
+        self.assertTrue(cache.is_redundant("a", self._state("on", "2024-01-01T10:00:10"), retain=True))
+        self.assertFalse(cache.is_redundant("b", self._state("on", "2024-01-01T10:00:10"), retain=True))
+        self.assertFalse(cache.is_redundant("a", self._state("off", "2024-01-01T10:00:10"), retain=True))
+        self.assertFalse(cache.is_redundant("a", {"device": "shutter", "status": "on"}, retain=True))
+        self.assertEqual(cache.count_skipped, 1)
+
+    def test_heartbeat(self):
+        cache = _TestMqttPublishCache(heartbeat=300)
+
+        self.assertFalse(cache.is_redundant("a", self._state("on", "1"), retain=True))
+        cache.now += 299
+        self.assertTrue(cache.is_redundant("a", self._state("on", "2"), retain=True))
+        cache.now += 1
+        self.assertFalse(cache.is_redundant("a", self._state("on", "3"), retain=True))
+        self.assertTrue(cache.is_redundant("a", self._state("on", "4"), retain=True))
+
+        cache.clear()
+        self.assertFalse(cache.is_redundant("a", self._state("on", "5"), retain=True))
+
+    def test_not_retained(self):
+        cache = _TestMqttPublishCache(heartbeat=300)
+
+        self.assertFalse(cache.is_redundant("a", "pressed", retain=False))
+        self.assertFalse(cache.is_redundant("a", "pressed", retain=False))
+
+    def test_no_json(self):
+        cache = _TestMqttPublishCache(heartbeat=300)
+
+        self.assertFalse(cache.is_redundant("a", "OFFLINE", retain=True))
+        self.assertTrue(cache.is_redundant("a", "OFFLINE", retain=True))
+        self.assertFalse(cache.is_redundant("a", "{broken", retain=True))
@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+
+from src.mqtt_publish_queue import MqttPublishQueue, PendingPublish, QueueFullPolicy
+
+
+class TestMqttPublishQueue(unittest.TestCase):
+
+    @classmethod
+    def _message(cls, channel, payload, retain=False):
+        return PendingPublish(channel=channel, payload=payload, qos=1, retain=retain)
+
+    def test_conflation(self):
+        queue = MqttPublishQueue()
+        queue.put(self._message("a", "1", retain=True))
+        queue.put(self._message("b", "1"))
+        queue.put(self._message("b", "2"))
+        queue.put(self._message("a", "2", retain=True))
+        queue.put(self._message("c", "1", retain=True))
+
+        messages = queue.take()
+        self.assertEqual([(m.channel, m.payload) for m in messages], [("a", "2"), ("b", "1"), ("b", "2"), ("c", "1")])
+        self.assertEqual(len(queue), 0)
+
+    def test_take_batches(self):
+        queue = MqttPublishQueue()
+        for i in range(5):
+            queue.put(self._message("a", str(i)))
+
+        self.assertEqual([m.payload for m in queue.take(2)], ["0", "1"])
+        self.assertEqual([m.payload for m in queue.take(0)], [])
+        self.assertEqual([m.payload for m in queue.take(10)], ["2", "3", "4"])
+
+    def test_drop_oldest(self):
+        queue = MqttPublishQueue(max_size=2, policy=QueueFullPolicy.DROP)
+        self.assertTrue(queue.put(self._message("a", "1")))
+        self.assertTrue(queue.put(self._message("a", "2")))
+        self.assertFalse(queue.put(self._message("a", "3")))
+
+        self.assertEqual(queue.count_dropped, 1)
+        self.assertEqual([m.payload for m in queue.take()], ["2", "3"])
+
+    def test_block(self):
+        queue = MqttPublishQueue(max_size=1, policy=QueueFullPolicy.BLOCK, block_timeout=5)
+        queue.put(self._message("a", "1"))
+
+        taken = []
+        thread = threading.Timer(0.05, lambda: taken.extend(queue.take()))
+        thread.start()
+        time_start = time.monotonic()
+        self.assertTrue(queue.put(self._message("a", "2")))  # blocks until the consumer took the first message
+        self.assertLess(time.monotonic() - time_start, 4)
+        thread.join()
+
+        self.assertEqual([m.payload for m in taken], ["1"])
+        self.assertEqual([m.payload for m in queue.take()], ["2"])
+
+    def test_block_timeout(self):
+        queue = MqttPublishQueue(max_size=1, policy=QueueFullPolicy.BLOCK, block_timeout=0.01)
+        queue.put(self._message("a", "1"))
+        self.assertFalse(queue.put(self._message("a", "2")))
+        self.assertEqual([m.payload for m in queue.take()], ["2"])
@@ -0,0 +1,53 @@
+import os
+import unittest
+
+from src.mqtt_publish_queue import PendingPublish
+from src.mqtt_spool import MqttSpool
+from test.setup_test import SetupTest
+
+
+class TestMqttSpool(unittest.TestCase):
+
+    @classmethod
+    def _message(cls, channel, payload, retain=False):
+        return PendingPublish(channel=channel, payload=payload, qos=1, retain=retain)
+
+    def test_persist_and_replay(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        spool_file = os.path.join(work_dir, "mqtt_spool.jsonl")
+
+        spool = MqttSpool(spool_file)
+        spool.open()
+        spool.put([self._message("a", "1", retain=True), self._message("b", "1")])
+        spool.put([self._message("a", "2", retain=True), self._message("b", "2")])
+        self.assertEqual(len(spool), 3)
+
+        # power loss while appending
+        with open(spool_file, "a") as stream:
+            stream.write('{"channel":"c","payl')
+
+        spool = MqttSpool(spool_file)  # process restarted
+        spool.open()
+        messages = spool.take()
+        self.assertEqual([(m.channel, m.payload) for m in messages], [("a", "2"), ("b", "1"), ("b", "2")])
+        self.assertFalse(os.path.exists(spool_file))
+
+    def test_bounded(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        spool_file = os.path.join(work_dir, "mqtt_spool_bounded.jsonl")
+
+        spool = MqttSpool(spool_file, max_size=3)
+        spool.open()
+        for i in range(300):
+            spool.put([self._message("a", str(i))])
+        self.assertEqual(len(spool), 3)
+
+        with open(spool_file, "r") as stream:
+            self.assertLess(len(stream.readlines()), 300)  # rewritten meanwhile
+
+        spool = MqttSpool(spool_file, max_size=3)
+        spool.open()
+        self.assertEqual([m.payload for m in spool.take(2)], ["297", "298"])
+        self.assertTrue(os.path.exists(spool_file))
+        self.assertEqual([m.payload for m in spool.take(2)], ["299"])
+        self.assertFalse(os.path.exists(spool_file))
@@ -0,0 +1,118 @@
+import os
+import pty
+import threading
+import tty
+import unittest
+from unittest import mock
+
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import Packet
+
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.esp3_process_communicator import Esp3ProcessCommunicator
+from src.process_enocean_connector import ProcessEnoceanConnector
+from src.tools.enocean_tools import EnoceanTools
+from test.setup_test import SetupTest
+
+
+class TestProcessEnoceanConnector(unittest.TestCase):
+
+    def setUp(self):
+        SetupTest.set_dummy_sender_id()
+
+        self.master, slave = pty.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+
+        self.wakeup = threading.Event()
+        self.connector = ProcessEnoceanConnector(self.port)
+        self.connector.set_wakeup(self.wakeup)
+
+    def tearDown(self):
+        self.connector.close()
+        os.close(self.master)
+
+    @classmethod
+    def _create_packet(cls, sender):
+        return RockerSwitchTools.create_packet(RockerAction(RockerPress.PRESS_SHORT, RockerButton.ROCK1), sender=sender)
+
+    def _receive(self, packets, expected_count):
+        for packet in packets:
+            os.write(self.master, bytes(packet.build()))
+        messages = []
+        while len(messages) < expected_count and self.wakeup.wait(1):
+            self.wakeup.clear()
+            messages.extend(self.connector.get_messages())
+        return messages
+
+    def test_receive_and_send(self):
+        packet = self._create_packet(0x01020304)
+        self.connector.open()
+
+        messages = self._receive([packet], 1)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].enocean_id, 0x01020304)
+        self.assertEqual(messages[0].payload, packet)
+        self.assertTrue(messages[0].payload.received is not None)
+
+        self.connector.send(packet)
+        self.assertEqual(os.read(self.master, 100), bytes(packet.build()))
+
+    def test_listened_senders(self):
+        self.connector.set_listened_senders([0x01020304])
+        self.connector.open()
+
+        messages = self._receive([self._create_packet(0x0a0b0c0d), self._create_packet(0x01020304)], 1)
+        self.assertEqual([m.enocean_id for m in messages], [0x01020304])
+
+        self.connector.close()  # the worker reports its statistics at the end
+        stats = self.connector.receive_stats
+        self.assertEqual((stats.received, stats.dropped, stats.dropped_senders), (1, 1, 1))
+        self.assertEqual(self.connector.dropped_senders, {0x0a0b0c0d: 1})
+
+    def test_decoded_props(self):
+        eep = RockerSwitchTools.DEFAULT_EEP
+        self.connector = ProcessEnoceanConnector(self.port, {0x01020304: [eep]})
+        self.connector.set_wakeup(self.wakeup)
+        self.connector.open()
+
+        messages = self._receive([self._create_packet(0x01020304), self._create_packet(0x0a0b0c0d)], 2)
+        decoded = {m.enocean_id: getattr(m.payload, EnoceanTools._PROPS_CACHE_ATTR, None) for m in messages}
+        self.assertEqual(decoded[0x0a0b0c0d], None)  # no EEP known
+        expected = {'R1': 1, 'EB': 1, 'R2': 0, 'SA': 0, 'T21': 1, 'NU': 1}
+        self.assertEqual(decoded[0x01020304], {EnoceanTools.eep_key(eep): expected})
+        self.assertEqual(EnoceanTools.extract_props(messages[0].payload, eep), expected)
+
+    def test_base_id(self):
+        self.connector.open()
+        response = Packet(PACKET.RESPONSE, data=[0, 0xff, 0x80, 0, 0], optional=[])
+
+        def respond():
+            request = os.read(self.master, 100)
+            if request == bytes(Packet(PACKET.COMMON_COMMAND, data=[0x08]).build()):
+                os.write(self.master, bytes(response.build()))
+
+        thread = threading.Thread(target=respond)
+        thread.start()
+        base_id = self.connector.base_id
+        thread.join()
+
+        self.assertEqual(base_id, [0xff, 0x80, 0, 0])
+
+    def test_worker_gone(self):
+        self.connector.open()
+        self.connector._enocean._process.kill()
+        self.connector._enocean._process.join()
+        self.connector._enocean.join(1)
+        self.assertFalse(self.connector.is_alive())
+        self.assertFalse(self.connector._enocean.send(self._create_packet(0x01020304)))
+
+    def test_start_timeout(self):
+        with mock.patch.object(Esp3ProcessCommunicator, "START_TIMEOUT", 0):
+            self.connector.open()
+        self.assertFalse(self.connector.is_alive())
+
+        self.connector.assure_connection()  # starts a new worker
+        self.assertTrue(self.connector.is_alive())
+        messages = self._receive([self._create_packet(0x01020304)], 1)
+        self.assertEqual([m.enocean_id for m in messages], [0x01020304])
@@ -0,0 +1,63 @@
+import unittest
+
+from src.shared_ring import SharedRing, SharedRingException
+
+
+class TestSharedRing(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedRing.create(64)
+        self.consumer = SharedRing.attach(self.ring.name)
+
+    def tearDown(self):
+        self.consumer.close()
+        self.ring.close()
+
+    def test_put_get(self):
+        self.assertIsNone(self.consumer.get())
+        self.assertTrue(self.ring.put(b"abc"))
+        self.assertTrue(self.ring.put(b""))
+        self.assertEqual(len(self.consumer), 7)
+        self.assertEqual(self.consumer.get(), b"abc")
+        self.assertEqual(self.consumer.get(), b"")
+        self.assertIsNone(self.consumer.get())
+        self.assertEqual(len(self.ring), 0)
+
+    def test_wrap_around(self):
+        for index in range(100):
+            record = bytes([index]) * (index % 20)
+            self.assertTrue(self.ring.put(record))
+            self.assertEqual(self.consumer.get(), record)
+
+    def test_full(self):
+        for _ in range(5):
+            self.assertTrue(self.ring.put(bytes(10)))
+        self.assertFalse(self.ring.put(bytes(10)))
+        self.assertEqual(self.ring.count_overflows, 1)
+
+        self.assertEqual(self.consumer.get(), bytes(10))
+        self.assertTrue(self.ring.put(bytes(10)))
+
+    def test_handed_over_counters(self):
+        self.assertTrue(self.ring.put(b"abc"))
+        written = self.ring.written
+        self.assertTrue(self.ring.put(b"def"))
+
+        self.assertEqual(self.consumer.get(written), b"abc")
+        self.assertIsNone(self.consumer.get(written))  # announced later
+        self.assertEqual(self.consumer.get(self.ring.written), b"def")
+
+        for _ in range(5):
+            self.assertTrue(self.ring.put(bytes(10), self.consumer.read))
+        released = self.consumer.read
+        self.assertEqual(self.consumer.get(), bytes(10))
+        self.assertFalse(self.ring.put(bytes(10), released))  # the space is not released yet
+        self.assertTrue(self.ring.put(bytes(10), self.consumer.read))
+
+    def test_record_too_large(self):
+        with self.assertRaises(SharedRingException):
+            self.ring.put(bytes(SharedRing.MAX_RECORD_SIZE + 1))
+
+    def test_attach_unknown(self):
+        with self.assertRaises(SharedRingException):
+            SharedRing.attach("enocean-mqtt-bridge-unknown")
@@ -0,0 +1,83 @@
+import datetime
+import os
+import sqlite3
+import unittest
+
+import yaml
+
+from src.state_database import StateDatabase
+from src.storage import Storage
+from test.setup_test import SetupTest
+
+
+class TestStateDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = SetupTest.ensure_clean_work_dir()
+        self.database_path = os.path.join(self.work_dir, 'state.sqlite')
+
+    def test_roundtrip(self):
+        tz = datetime.timezone(datetime.timedelta(seconds=3600))
+        since = datetime.datetime(2018, 12, 3, 13, 7, 45, tzinfo=tz)
+
+        database = StateDatabase(self.database_path)
+        database.open()
+        self.assertIsNone(database.load("shutter"))
+        database.write("shutter", {"VALUE": 50.0, "TIME_SINCE": since, "OBSOLETE": 1})
+        database.write("shutter", {"VALUE": 60.0}, deleted=["OBSOLETE"])
+        database.write("window", {"VALUE": "open"})
+        database.close()
+
+        database = StateDatabase(self.database_path)
+        database.open()
+        self.assertEqual(database.load("shutter"), {"VALUE": 60.0, "TIME_SINCE": since})
+        self.assertEqual(database.load("window"), {"VALUE": "open"})
+        database.close()
+
+    def test_storage_adapter(self):
+        storage_path = os.path.join(self.work_dir, 'storage_import.yaml')
+        with open(storage_path, 'w') as stream:
+            yaml.dump({"VALUE": 20, "TIME": "abc"}, stream)
+
+        database = StateDatabase(self.database_path)
+        database.open()
+        Storage.set_database(database)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            p.load()  # imports the former file
+            self.assertEqual(p.get("VALUE"), 20)
+
+            p.set("VALUE", 30)
+            p.delete("TIME")
+            p.save()
+        finally:
+            Storage.set_database(None)
+            database.close()
+
+        database = StateDatabase(self.database_path)
+        database.open()
+        Storage.set_database(database)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            p.load()
+            self.assertEqual(p.get("VALUE"), 30)
+            self.assertIsNone(p.get("TIME"))
+        finally:
+            Storage.set_database(None)
+            database.close()
+
+    def test_values_as_json(self):
+        tz = datetime.timezone(datetime.timedelta(seconds=3600))
+        since = datetime.datetime(2018, 12, 3, 13, 7, 45, tzinfo=tz)
+
+        database = StateDatabase(self.database_path)
+        database.open()
+        database.write("shutter", {"TIME_SINCE": since, "VALUE": [1, "a"]})
+        database.close()
+
+        connection = sqlite3.connect(self.database_path)
+        rows = dict(connection.execute("SELECT key, value FROM state"))
+        connection.close()
+        self.assertEqual(rows, {"TIME_SINCE": '{"$datetime":"2018-12-03T13:07:45+01:00"}', "VALUE": '[1,"a"]'})
@@ -1,10 +1,12 @@
 import datetime
 import os
+import time
 import unittest
+from unittest import mock
 
 import pickle
 
-from src.storage import Storage, StorageException
+from src.storage import Storage, StorageException, StorageWriter
 from test.setup_test import SetupTest
 
 
@@ -84,3 +86,202 @@ class TestStorage(unittest.TestCase):
 
         with self.assertRaises(StorageException):
             p.load()
+
+    def test_write_behind(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        storage_path = os.path.join(work_dir, 'storage_write_behind.yaml')
+
+        writer = StorageWriter(interval=3600, fsync=True)  # no flush by the thread within the test
+        writer.start()
+        Storage.set_writer(writer)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            for i in range(10):
+                p.set("data", i)
+                p.save()
+
+            self.assertTrue(p.dirty)
+            self.assertFalse(os.path.exists(storage_path))
+        finally:
+            Storage.set_writer(None)
+            writer.close()
+
+        self.assertFalse(p.dirty)
+
+        p = Storage()
+        p.set_file(storage_path)
+        p.load()
+        self.assertEqual(p.get("data"), 9)
+
+    def test_write_behind_interval(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        storage_path = os.path.join(work_dir, 'storage_write_behind_interval.yaml')
+
+        writer = StorageWriter(interval=0.01)
+        writer.start()
+        Storage.set_writer(writer)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            p.set("data", 1)
+            p.save()
+
+            time_limit = time.monotonic() + 5
+            while not os.path.exists(storage_path) and time.monotonic() < time_limit:
+                time.sleep(0.01)
+            self.assertTrue(os.path.exists(storage_path))
+            self.assertFalse(p.dirty)
+        finally:
+            Storage.set_writer(None)
+            writer.close()
+
+    def test_write_behind_retry(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        storage_path = os.path.join(work_dir, 'storage_write_behind_retry.yaml')
+
+        writer = StorageWriter(interval=3600)
+        Storage.set_writer(writer)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            p.set("data", 1)
+            p.save()
+
+            with mock.patch("src.storage.os.replace", side_effect=OSError("disk full")):
+                writer.flush()
+            self.assertTrue(p.dirty)
+            self.assertFalse(os.path.exists(storage_path))
+
+            writer.flush()  # without a new `save`
+            self.assertFalse(p.dirty)
+            self.assertTrue(os.path.exists(storage_path))
+        finally:
+            Storage.set_writer(None)
+            writer.close()
+
+    def test_journal(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        storage_path = os.path.join(work_dir, 'storage_journal.yaml')
+        journal_path = storage_path + Storage.JOURNAL_SUFFIX
+        tz = datetime.timezone(datetime.timedelta(seconds=3600))
+        time_since = datetime.datetime(2018, 12, 3, 13, 7, 45, tzinfo=tz)
+
+        Storage.set_journal(True)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            p.load()
+            p.set("value", 10)
+            p.set("obsolete", "text\nwith line break")
+            p.save()
+            p.set("value", 20)
+            p.set("since", time_since)
+            p.delete("obsolete")
+            p.save()
+
+            self.assertFalse(os.path.exists(storage_path))
+            with open(journal_path, 'r') as stream:
+                self.assertEqual(len(stream.readlines()), 2)
+
+            # power loss while appending
+            with open(journal_path, 'a') as stream:
+                stream.write("{set: {value: 3")
+
+            p = Storage()
+            p.set_file(storage_path)
+            p.load()
+            self.assertEqual(p.get("value"), 20)
+            self.assertEqual(p.get("since"), time_since)
+            self.assertIsNone(p.get("obsolete"))
+        finally:
+            Storage.set_journal(False)
+
+        p.save()  # compaction
+        self.assertTrue(os.path.exists(storage_path))
+        self.assertFalse(os.path.exists(journal_path))
+
+        p = Storage()
+        p.set_file(storage_path)
+        p.load()
+        self.assertEqual(p.get("value"), 20)
+
+    def test_journal_compaction(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        storage_path = os.path.join(work_dir, 'storage_journal_compaction.yaml')
+
+        Storage.set_journal(True)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            for i in range(Storage.JOURNAL_COMPACT_RECORDS + 1):
+                p.set("value", i)
+                p.save()
+
+            self.assertTrue(os.path.exists(storage_path))
+            self.assertFalse(os.path.exists(storage_path + Storage.JOURNAL_SUFFIX))
+            self.assertFalse(os.path.exists(storage_path + Storage.TEMP_SUFFIX))
+
+            p = Storage()
+            p.set_file(storage_path)
+            p.load()
+            self.assertEqual(p.get("value"), Storage.JOURNAL_COMPACT_RECORDS)
+        finally:
+            Storage.set_journal(False)
+
+    def test_journal_compaction_interrupted(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        storage_path = os.path.join(work_dir, 'storage_journal_interrupted.yaml')
+        journal_path = storage_path + Storage.JOURNAL_SUFFIX
+
+        Storage.set_journal(True)
+        try:
+            p = Storage()
+            p.set_file(storage_path)
+            p.set("value", 1)
+            p.set("other", 1)
+            p.save()
+            p.set("value", 2)
+            p.save()
+        finally:
+            Storage.set_journal(False)
+
+        # compaction with pending changes, power loss after the rename but before the journal is removed
+        p.set("value", 3)
+        p.delete("other")
+        with mock.patch("src.storage.os.remove", side_effect=OSError("power loss")):
+            with self.assertRaises(StorageException):
+                p.save()
+        self.assertTrue(os.path.exists(storage_path))
+        self.assertTrue(os.path.exists(journal_path))
+
+        p = Storage()
+        p.set_file(storage_path)
+        p.load()
+        self.assertEqual(p.get("value"), 3)
+        self.assertIsNone(p.get("other"))
+
+    def test_codec_by_extension(self):
+        work_dir = SetupTest.ensure_clean_work_dir()
+        tz = datetime.timezone(datetime.timedelta(seconds=3600))
+        time_since = datetime.datetime(2018, 12, 3, 13, 7, 45, tzinfo=tz)
+
+        for extension in [".json", ".bin"]:
+            storage_path = os.path.join(work_dir, 'storage_codec' + extension)
+
+            Storage.set_journal(True)
+            try:
+                p = Storage()
+                p.set_file(storage_path)
+                p.set("value", 1.5)
+                p.set("since", time_since)
+                p.save()
+            finally:
+                Storage.set_journal(False)
+            p.save()  # compaction
+
+            p = Storage()
+            p.set_file(storage_path)
+            p.load()
+            self.assertEqual(p.get("value"), 1.5)
+            self.assertEqual(p.get("since"), time_since)
@@ -0,0 +1,79 @@
+import datetime
+import unittest
+
+from src.storage_codec import StorageCodecs, YamlStorageCodec, JsonStorageCodec, BinaryStorageCodec, \
+    StorageCodecException
+
+
+class TestStorageCodec(unittest.TestCase):
+
+    CODECS = [YamlStorageCodec(), JsonStorageCodec(), BinaryStorageCodec()]
+
+    @classmethod
+    def _create_data(cls):
+        tz = datetime.timezone(datetime.timedelta(seconds=3600))
+        return {
+            "VALUE": 37.5,
+            "TIME_SINCE": datetime.datetime(2018, 12, 3, 13, 7, 45, 123456, tzinfo=tz),
+            "TIME_NAIVE": datetime.datetime(2018, 12, 3, 13, 7, 45),
+            "STATE": "closed",
+            "COUNT": -12,
+            "BIG": 1 << 70,
+            "FLAG": True,
+            "NONE": None,
+            "LIST": [1, "2", [3.0]],
+            "DICT": {"a": 1},
+        }
+
+    def test_roundtrip(self):
+        data = self._create_data()
+        for codec in self.CODECS:
+            with self.subTest(codec=type(codec).__name__):
+                comp = codec.loads(codec.dumps(data))
+                self.assertEqual(comp, data)
+                self.assertEqual(comp["TIME_SINCE"].utcoffset(), data["TIME_SINCE"].utcoffset())
+                self.assertIsNone(comp["TIME_NAIVE"].tzinfo)
+
+    def test_records(self):
+        records = [{"set": {"VALUE": 1.5, "TIME": self._create_data()["TIME_SINCE"]}}, {"delete": ["VALUE"]}]
+        for codec in self.CODECS:
+            with self.subTest(codec=type(codec).__name__):
+                raw = b"".join(codec.dump_record(r) for r in records)
+                self.assertEqual(list(codec.load_records(raw)), records)
+
+                # power loss while appending: the broken record ends the iteration
+                broken = raw + codec.dump_record(records[0])[:-3]
+                self.assertEqual(list(codec.load_records(broken)), records)
+
+    def test_wrong_format(self):
+        for codec in self.CODECS:
+            with self.subTest(codec=type(codec).__name__):
+                with self.assertRaises(StorageCodecException):
+                    codec.loads(b"\x80\x03]q\x00(KxK\x03K\xffK\x00Kde.")
+
+    def test_binary_corrupt(self):
+        codec = BinaryStorageCodec()
+        unhashable_key = b"m" + (1).to_bytes(4, "big") + b"l" + (0).to_bytes(4, "big") + b"N"
+        deep_nesting = b"l" + (1).to_bytes(4, "big")
+        for payload in [unhashable_key, deep_nesting * 100000]:
+            with self.assertRaises(StorageCodecException):
+                codec.loads(codec.MAGIC + payload)
+            raw = codec.dump_record({"set": {"VALUE": 1}})
+            record = len(payload).to_bytes(4, "big") + payload
+            self.assertEqual(list(codec.load_records(raw + record + raw)), [{"set": {"VALUE": 1}}])
+
+    def test_json_value(self):
+        codec = JsonStorageCodec()
+        data = self._create_data()
+        self.assertEqual(codec.load_value(codec.dump_value(data["TIME_SINCE"])), data["TIME_SINCE"])
+        self.assertEqual(codec.load_value(codec.dump_value(data)), data)
+        with self.assertRaises(StorageCodecException):
+            codec.dump_value(object())
+        with self.assertRaises(StorageCodecException):
+            codec.load_value("{broken")
+
+    def test_for_file(self):
+        self.assertIsInstance(StorageCodecs.for_file("/var/lib/x/fsb61.YAML"), YamlStorageCodec)
+        self.assertIsInstance(StorageCodecs.for_file("/var/lib/x/fsb61.json"), JsonStorageCodec)
+        self.assertIsInstance(StorageCodecs.for_file("/var/lib/x/fsb61.bin"), BinaryStorageCodec)
+        self.assertIsInstance(StorageCodecs.for_file("/var/lib/x/fsb61"), YamlStorageCodec)
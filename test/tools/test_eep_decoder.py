@@ -0,0 +1,59 @@
+import unittest
+
+from enocean.protocol.constants import PACKET
+from enocean.protocol.packet import RadioPacket
+
+from src.common.eep import Eep
+from src.device.eltako_fud61.fud61_eep import Fud61Action, Fud61Command, Fud61Eep
+from src.device.rocker_switch.rocker_switch_tools import RockerSwitchTools, RockerAction, RockerPress, RockerButton
+from src.tools.eep_decoder import EepDecoders
+from src.tools.enocean_tools import EnoceanTools
+from test.setup_test import SetupTest
+
+
+class TestEepDecoders(unittest.TestCase):
+
+    def setUp(self):
+        SetupTest.set_dummy_sender_id()
+
+    def check_same_as_library(self, packet, eep):
+        compiled = EepDecoders.decode(packet, eep)
+        self.assertIsNotNone(compiled)
+        self.assertEqual(compiled, EnoceanTools._extract_props_by_library(packet, eep))
+        return compiled
+
+    def test_rocker(self):
+        for press, button in [(RockerPress.PRESS_SHORT, RockerButton.ROCK1), (RockerPress.PRESS_LONG, RockerButton.ROCK2),
+                              (RockerPress.RELEASE, None)]:
+            packet = RockerSwitchTools.create_packet(RockerAction(press=press, button=button))
+            props = self.check_same_as_library(packet, RockerSwitchTools.DEFAULT_EEP)
+            self.assertEqual(props, RockerSwitchTools.create_props(RockerAction(press=press, button=button)))
+
+    def test_4bs_with_command(self):
+        action = Fud61Action(command=Fud61Command.DIMMING, dim_state=33)
+        props, packet = Fud61Eep.create_props_and_packet(action)
+
+        eep = Fud61Eep.EEP.clone()
+        eep.command = Fud61Command.DIMMING.value
+        compiled = self.check_same_as_library(packet, eep)
+        self.assertEqual(compiled["EDIM"], 33)
+
+    def test_status_field(self):
+        eep = Eep(rorg=0xf6, func=0x10, type=0x00)
+        packet = RadioPacket(PACKET.RADIO, data=[0xf6, 0xe0, 0x01, 0x02, 0x03, 0x04, 0x30], optional=[3, 255, 255, 255, 255, 0x40, 0])
+        self.check_same_as_library(packet, eep)
+
+    def test_fallback(self):
+        # unknown profile
+        packet = RockerSwitchTools.create_packet(RockerAction(press=RockerPress.RELEASE))
+        self.assertIsNone(EepDecoders.decode(packet, Eep(rorg=0xf6, func=0x7f, type=0x7f)))
+
+        # not defined enum values (the library fails)
+        packet = RadioPacket(PACKET.RADIO, data=[0xa5, 0xff, 0, 0, 0, 1, 2, 3, 4, 0], optional=[3, 255, 255, 255, 255, 0x40, 0])
+        eep = Fud61Eep.EEP.clone()
+        eep.command = Fud61Command.DIMMING.value
+        self.assertIsNone(EepDecoders.decode(packet, eep))
+
+        # packet too short
+        packet = RadioPacket(PACKET.RADIO, data=[0xa5, 0x02, 1, 2, 3, 4, 0], optional=[3, 255, 255, 255, 255, 0x40, 0])
+        self.assertIsNone(EepDecoders.decode(packet, eep))
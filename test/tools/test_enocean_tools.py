@@ -1,10 +1,12 @@
 import unittest
+from unittest import mock
 
 import enocean.utils
 from enocean.protocol.constants import PACKET
 
 from src.common.eep import Eep
 from src.enocean_packet_factory import EnoceanPacketFactory
+from src.tools.eep_decoder import EepDecoders
 from src.tools.enocean_tools import EnoceanTools
 from src.tools.pickle_tools import PickleTools
 from test.setup_test import SetupTest
@@ -31,6 +33,19 @@ class TestEnoceanTools(unittest.TestCase):
 
         self.assertEqual(packet_out, packet_in)
 
+    def test_extract_props_cached(self):
+        props_in = {'R1': 1, 'EB': 1, 'R2': 0, 'SA': 0, 'T21': 1, 'NU': 1}
+        eep = Eep(rorg=0xf6, func=0x02, type=0x02)
+        packet = EnoceanPacketFactory.create_packet(eep=eep, learn=False, **props_in)
+
+        with mock.patch.object(EepDecoders, "decode", wraps=EepDecoders.decode) as decode:
+            props1 = EnoceanTools.extract_props(packet, eep)
+            props1["R1"] = 3  # callers get a copy
+            props2 = EnoceanTools.extract_props(packet, eep.clone())
+            self.assertEqual(decode.call_count, 1)
+
+        self.assertEqual(props2, props_in)
+
     def test_int_to_byte_list(self):
         value = 0x034567af
         byte_list = EnoceanTools.int_to_byte_list(value)